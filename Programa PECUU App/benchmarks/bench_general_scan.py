@@ -0,0 +1,158 @@
+"""
+Benchmark del pipeline de Escaneo General contra cámaras simuladas.
+
+Levanta miles de hosts en direcciones de loopback (abiertos, que rechazan y
+que nunca responden), una API de enlaces local que apunta a ellos, y mide el
+pipeline completo: obtención de enlaces, resolución y escaneo.
+
+Uso (desde la carpeta de la aplicación):
+
+    python -m benchmarks.bench_general_scan --open 1000 --refused 1000 --blackholed 200
+"""
+import argparse
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+import services.scan_engine as scan_engine
+from benchmarks.simulated_network import BENCH_PORTS, SimulatedNetwork
+from benchmarks.stub_api import StubApiServer
+from services.api_service import ApiService
+from services.scan_sharding import scan_urls_sharded_sync
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _raise_fd_limit(required: int):
+    """Sube el límite de descriptores de archivo hasta donde lo permita el sistema."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = required if hard == resource.RLIM_INFINITY else min(required, hard)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+def run_benchmark(open_hosts: int, refused_hosts: int, blackholed_hosts: int,
+                  concurrency: int = scan_engine.MAX_CONCURRENCY,
+                  timeout: float = scan_engine.CONNECT_TIMEOUT, processes: int = 1) -> Dict:
+    """
+    Ejecuta el pipeline de Escaneo General contra una red simulada.
+
+    Args:
+        open_hosts: Hosts con puertos abiertos.
+        refused_hosts: Hosts que rechazan todas las conexiones.
+        blackholed_hosts: Hosts que nunca responden.
+        concurrency: Conexiones simultáneas máximas del motor.
+        timeout: Tiempo máximo de espera por puerto en segundos.
+        processes: Procesos del escaneo repartido; 1 escanea en el proceso actual.
+
+    Returns:
+        Diccionario con hosts/segundo, latencias p50/p99 por host (ms),
+        memoria pico y número de resultados con estado inesperado. La latencia
+        de un host va desde que inicia su escaneo hasta que termina, incluyendo
+        la espera por lugares libres en el límite de concurrencia. Con varios
+        procesos la latencia por host no se mide (los escaneos corren en otros
+        procesos) y la memoria reportada es la del proceso coordinador.
+    """
+    # Cada host sin respuesta usa un listener y dos conexiones de relleno por puerto
+    _raise_fd_limit(blackholed_hosts * len(BENCH_PORTS) * 3 + open_hosts * 2 + concurrency + 1024)
+
+    network = SimulatedNetwork(open_hosts, refused_hosts, blackholed_hosts)
+    network.start()
+    links = [{"nombre": f"Simulado {i}", "ddns": ip} for i, ip in enumerate(network.hosts)]
+    api = StubApiServer(links)
+    api.start()
+
+    # Medir la latencia de cada host envolviendo el escaneo adaptativo del motor
+    latencies: List[float] = []
+    original_scan_host = scan_engine.scan_host_adaptive
+
+    async def _timed_scan_host(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await original_scan_host(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    original_base_url = ApiService.BASE_URL
+    ApiService.BASE_URL = api.base_url
+    scan_engine.scan_host_adaptive = _timed_scan_host
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        enlaces = ApiService.get_links() or []
+        urls = [enlace["ddns"] for enlace in enlaces if enlace.get("ddns")]
+        if processes == 1:
+            results = scan_engine.scan_urls_sync(urls, BENCH_PORTS, concurrency, timeout)
+        else:
+            results = scan_urls_sharded_sync(urls, BENCH_PORTS, processes or None, concurrency, timeout)
+        elapsed = time.perf_counter() - started
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        scan_engine.scan_host_adaptive = original_scan_host
+        ApiService.BASE_URL = original_base_url
+        api.stop()
+        network.stop()
+
+    esperado = network.expected_status()
+    inesperados = [item for item in results if esperado.get(item['url']) != item['status']]
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        max_rss *= 1024  # ru_maxrss se reporta en KiB en Linux y en bytes en macOS
+
+    return {
+        "hosts": len(results),
+        "open_hosts": open_hosts,
+        "refused_hosts": refused_hosts,
+        "blackholed_hosts": blackholed_hosts,
+        "concurrency": concurrency,
+        "processes": processes,
+        "elapsed_s": round(elapsed, 3),
+        "hosts_per_second": round(len(results) / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "latency_p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "latency_mean_ms": round(statistics.mean(latencies) * 1000, 1) if latencies else 0.0,
+        "peak_traced_memory_mb": round(peak_traced / 1024 / 1024, 2),
+        "max_rss_mb": round(max_rss / 1024 / 1024, 1),
+        "unexpected_results": len(inesperados),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_general_scan",
+        description="Benchmark del Escaneo General contra cámaras simuladas en loopback."
+    )
+    parser.add_argument("--open", type=int, default=1000, help="hosts con puertos abiertos")
+    parser.add_argument("--refused", type=int, default=1000, help="hosts que rechazan las conexiones")
+    parser.add_argument("--blackholed", type=int, default=200, help="hosts que nunca responden")
+    parser.add_argument("--concurrency", type=int, default=scan_engine.MAX_CONCURRENCY,
+                        help="conexiones simultáneas máximas del motor")
+    parser.add_argument("--timeout", type=float, default=scan_engine.CONNECT_TIMEOUT,
+                        help="tiempo máximo de espera por puerto en segundos")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="procesos del escaneo repartido; 0 usa uno por núcleo")
+    parser.add_argument("--json", action="store_true", help="imprimir el reporte como JSON")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.open, args.refused, args.blackholed, args.concurrency, args.timeout, args.processes)
+    if args.json:
+        print(json.dumps(report))
+    else:
+        for key, value in report.items():
+            print(f"{key:>24}: {value}")
+    return 1 if report["unexpected_results"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
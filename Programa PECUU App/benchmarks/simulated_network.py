@@ -0,0 +1,120 @@
+import asyncio
+import ipaddress
+import socket
+import threading
+from typing import Dict, List
+
+from services.scan_engine import PORT_LIST
+
+
+# Desplazamiento aplicado a PORT_LIST para no requerir privilegios (80 -> 20080, 554 -> 20554, ...)
+PORT_OFFSET = 20000
+BENCH_PORTS = [port + PORT_OFFSET for port in PORT_LIST]
+
+# Puertos que aceptan conexiones en un host "abierto" (equivalentes a 80 y 554)
+OPEN_HOST_PORTS = [80 + PORT_OFFSET, 554 + PORT_OFFSET]
+
+# Puertos que descarta un host "parcial" (equivalentes a 80-83); acepta OPEN_HOST_PORTS restantes (554)
+PARTIAL_DROPPED_PORTS = [port + PORT_OFFSET for port in (80, 81, 82, 83)]
+
+# Red de loopback donde se crean los hosts simulados (Linux enruta todo 127.0.0.0/8 a lo)
+SIMULATED_NETWORK = ipaddress.ip_network("127.64.0.0/10")
+
+
+class SimulatedNetwork:
+    """
+    Conjunto de cámaras simuladas sobre direcciones de loopback.
+
+    Crea cuatro tipos de host:
+
+    - abiertos: aceptan conexiones en OPEN_HOST_PORTS y rechazan el resto.
+    - rechazados: ningún puerto escucha, todas las conexiones reciben RST.
+    - sin respuesta: escuchan con la cola de aceptación llena, por lo que el
+      kernel descarta los SYN y cada conexión agota su tiempo de espera.
+    - parciales: módems que descartan PARTIAL_DROPPED_PORTS, aceptan el
+      equivalente de 554 y rechazan el resto.
+
+    En macOS es necesario crear antes los alias de loopback
+    (`ifconfig lo0 alias 127.64.0.x`); en Linux funcionan sin configuración.
+    """
+
+    def __init__(self, open_hosts: int, refused_hosts: int, blackholed_hosts: int, partial_hosts: int = 0):
+        """
+        Args:
+            open_hosts: Número de hosts con puertos abiertos.
+            refused_hosts: Número de hosts que rechazan todas las conexiones.
+            blackholed_hosts: Número de hosts que nunca responden.
+            partial_hosts: Número de hosts que descartan los puertos HTTP y aceptan RTSP.
+        """
+        direcciones = (str(ip) for ip in SIMULATED_NETWORK.hosts())
+        self.open_hosts = [next(direcciones) for _ in range(open_hosts)]
+        self.refused_hosts = [next(direcciones) for _ in range(refused_hosts)]
+        self.blackholed_hosts = [next(direcciones) for _ in range(blackholed_hosts)]
+        self.partial_hosts = [next(direcciones) for _ in range(partial_hosts)]
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="red-simulada", daemon=True)
+        self._servers: List[asyncio.AbstractServer] = []
+        self._sockets: List[socket.socket] = []
+
+    @property
+    def hosts(self) -> List[str]:
+        """Todas las direcciones simuladas."""
+        return self.open_hosts + self.refused_hosts + self.blackholed_hosts + self.partial_hosts
+
+    def expected_status(self) -> Dict[str, str]:
+        """Estado que el escaneo debe reportar para cada dirección simulada."""
+        esperado = {ip: 'success' for ip in self.open_hosts + self.refused_hosts + self.partial_hosts}
+        esperado.update({ip: 'unreachable' for ip in self.blackholed_hosts})
+        return esperado
+
+    def start(self):
+        """Levanta todos los hosts simulados."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_listeners(), self._loop).result()
+        for ip_addr in self.blackholed_hosts:
+            for port in BENCH_PORTS:
+                self._blackhole(ip_addr, port)
+        for ip_addr in self.partial_hosts:
+            for port in PARTIAL_DROPPED_PORTS:
+                self._blackhole(ip_addr, port)
+
+    def stop(self):
+        """Detiene los hosts simulados y libera los sockets."""
+        async def _close():
+            for server in self._servers:
+                server.close()
+            await asyncio.gather(*(server.wait_closed() for server in self._servers), return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        for sock in self._sockets:
+            sock.close()
+
+    async def _start_listeners(self):
+        async def _accept(reader, writer):
+            writer.close()
+
+        for ip_addr in self.open_hosts:
+            for port in OPEN_HOST_PORTS:
+                self._servers.append(await asyncio.start_server(_accept, ip_addr, port, reuse_address=True))
+        for ip_addr in self.partial_hosts:
+            for port in OPEN_HOST_PORTS:
+                if port not in PARTIAL_DROPPED_PORTS:
+                    self._servers.append(await asyncio.start_server(_accept, ip_addr, port, reuse_address=True))
+
+    def _blackhole(self, ip_addr: str, port: int):
+        """Crea un listener con la cola de aceptación llena para que el kernel descarte los SYN."""
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((ip_addr, port))
+        listener.listen(0)
+        self._sockets.append(listener)
+
+        for _ in range(2):
+            filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            filler.setblocking(False)
+            filler.connect_ex((ip_addr, port))
+            self._sockets.append(filler)
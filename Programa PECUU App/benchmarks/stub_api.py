@@ -0,0 +1,135 @@
+import hashlib
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Campos obligatorios por recurso; un registro sin ellos se rechaza
+REQUIRED_FIELDS = {"links": ("nombre", "ddns"), "activities": ("title",)}
+
+
+class StubApiServer:
+    """
+    Servidor HTTP local que imita la API de SGCC Backend.
+
+    Sirve `GET /links.json` y `GET /activities.json` con ETag (responde 304 a
+    If-None-Match vigente), y acepta altas con
+    `POST /links` y `POST /activities`, de modo que `ApiService` pueda apuntar a
+    él cambiando `ApiService.BASE_URL` por `server.base_url`. Con `bulk=True`
+    también acepta `POST /links/bulk` y `POST /activities/bulk`; si no, esas
+    rutas responden 404 como un backend sin endpoint masivo.
+    """
+
+    def __init__(self, links: List[Dict], host: str = "127.0.0.1", port: int = 0,
+                 activities: Optional[List[Dict]] = None, bulk: bool = False):
+        """
+        Args:
+            links: Enlaces a servir, con las llaves de la API ('nombre', 'ddns', ...).
+            host: Dirección donde escuchar.
+            port: Puerto donde escuchar (0 elige uno libre).
+            activities: Actividades a servir, con las llaves de la API ('title', 'active', ...).
+            bulk: Si es True, habilita los endpoints de creación masiva.
+        """
+        self.links = links
+        self.activities = list(activities or [])
+        self.bulk = bulk
+        self.requests = Counter()  # peticiones recibidas por (método, ruta)
+        self.connections = 0  # conexiones TCP aceptadas; menos que peticiones indica keep-alive
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, name="api-simulada", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """URL base equivalente a `ApiService.BASE_URL`."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/sgcc-backend/api"
+
+    def start(self):
+        """Inicia el servidor en un hilo de fondo."""
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el servidor."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _create(self, resource: str, record: Dict) -> Dict:
+        """Valida y guarda un registro; devuelve el registro creado o {'error': ...}."""
+        faltantes = [campo for campo in REQUIRED_FIELDS[resource] if not record.get(campo)]
+        if faltantes:
+            return {"error": f"faltan campos: {', '.join(faltantes)}"}
+        with self._lock:
+            creado = dict(record, id=self._next_id)
+            self._next_id += 1
+            (self.links if resource == "links" else self.activities).append(creado)
+        return creado
+
+    def _handler_class(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 mantiene la conexión abierta entre peticiones, como el backend real
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                stub.requests[("GET", path)] += 1
+                if path.endswith("/links.json"):
+                    self._send_json(200, stub.links, conditional=True)
+                elif path.endswith("/activities.json"):
+                    self._send_json(200, stub.activities, conditional=True)
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                path = self.path.split("?")[0]
+                stub.requests[("POST", path)] += 1
+                partes = path.rstrip("/").split("/")
+                body = self._read_json()
+
+                if partes[-1] in REQUIRED_FIELDS:
+                    creado = stub._create(partes[-1], body if isinstance(body, dict) else {})
+                    self._send_json(422 if "error" in creado else 201, creado)
+                elif partes[-1] == "bulk" and partes[-2] in REQUIRED_FIELDS and stub.bulk:
+                    registros = body.get(partes[-2], []) if isinstance(body, dict) else []
+                    self._send_json(200, [stub._create(partes[-2], registro) for registro in registros])
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    return json.loads(self.rfile.read(length) or b"null")
+                except ValueError:
+                    return None
+
+            def _send_json(self, status: int, data, conditional: bool = False):
+                body = json.dumps(data).encode("utf-8")
+                if conditional:
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if conditional:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return _Handler
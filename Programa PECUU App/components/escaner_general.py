@@ -1,14 +1,14 @@
-import socket
 import flet as ft
+import threading
 import time
 from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-import os
 from services.api_service import ApiService
-
-PORT_LIST = [80, 81, 82, 83, 84, 85, 86, 87, 88, 554, 1024, 1025, 1026, 1027, 1028, 1029]
+from services.scan_engine import PORT_LIST, MAX_CONCURRENCY, closed_port_states, scan_hosts_sync
+from services.scan_jobs import ScanJob
+from services.scan_history import SCAN_HISTORY, plan_delta_scan
+from services.scan_pipeline import create_activities_for_down_links, process_scan_results
+from services import scan_export
+from services.service_probe import format_services
 
 # Las URLs ahora se cargan dinámicamente desde la API
 # Este es un fallback en caso de que la API falle
@@ -17,52 +17,185 @@ PREDEFINED_URLS = []
 # Variable global para almacenar la ruta del último archivo Excel generado
 last_excel_file = None
 
-def scan_ports(ip_addr: str, results_column: ft.Column):
+# Segundos mínimos entre repintados de la página mientras llegan resultados
+REPAINT_INTERVAL = 0.5
+
+# Latencia mediana de conexión (ms) a partir de la cual un enlace activo se resalta como lento
+SLOW_LATENCY_MS = 500
+
+def scan_ports(ip_addr: str, results_column: ft.Column = None):
     """
-    Intenta establecer una conexión TCP con una dirección IP en la lista de puertos predefinidos.
+    Escanea la lista de puertos predefinidos en una dirección IP.
 
-    Utiliza un socket con un tiempo de espera de 3 segundos para determinar 
-    si el puerto está abierto o cerrado.
+    Delega en el motor asíncrono (services.scan_engine), que prueba todos los
+    puertos del host de forma concurrente con un tiempo de espera de 1 segundo.
 
     :param ip_addr: Dirección IP (v4) a escanear.
     :type ip_addr: str
-    :param results_column: Columna de Flet donde se podría mostrar un mensaje de error 
-                           de conexión (no de puerto cerrado).
+    :param results_column: Se conserva por compatibilidad; el motor no agrega controles.
     :type results_column: ft.Column
     :returns: Una tupla que contiene dos listas: puertos abiertos y puertos cerrados.
     :rtype: tuple[list[int], list[int]]
     """
-    open_ports = []
-    closed_ports = []
-    
-    for port in PORT_LIST:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            status = sock.connect_ex((ip_addr, port))
-            
-            if status == 0:
-                open_ports.append(port)
+    return scan_hosts_sync([ip_addr])[ip_addr]
+
+
+class RepaintThrottle:
+    """
+    Limita la frecuencia de llamadas a page.update() durante el escaneo.
+
+    Las solicitudes de repintado que llegan antes de `interval` segundos desde
+    el último repintado se acumulan y se aplican con un temporizador al
+    cumplirse el intervalo, de modo que las últimas tarjetas se pintan aunque
+    no lleguen más resultados, o antes al llamar a flush().
+    """
+    def __init__(self, page: ft.Page, interval: float = REPAINT_INTERVAL):
+        """
+        :param page: La página principal de Flet.
+        :type page: ft.Page
+        :param interval: Segundos mínimos entre dos repintados.
+        :type interval: float
+        """
+        self.page = page
+        self.interval = interval
+        self._last_update = 0.0
+        self._pending = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def request(self):
+        """Solicita un repintado; si no ha pasado el intervalo mínimo, se programa para cuando se cumpla."""
+        with self._lock:
+            elapsed = time.monotonic() - self._last_update
+            if elapsed >= self.interval:
+                self._update()
             else:
-                closed_ports.append(port)
-            sock.close()
-            
-        except socket.error as err:
-            results_column.controls.append(
-                ft.Icon(ft.Icons.ERROR, color=ft.Colors.ORANGE),
-                ft.Text(f"Puerto {port}: ERROR DE CONEXIÓN", color=ft.Colors.ORANGE, size=16)
+                self._pending = True
+                if self._timer is None:
+                    self._timer = threading.Timer(self.interval - elapsed, self._on_timer)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def flush(self):
+        """Aplica el repintado pendiente, si lo hay, sin esperar al temporizador."""
+        with self._lock:
+            if self._pending:
+                self._update()
+            elif self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            if self._pending:
+                self._update()
+
+    def _update(self):
+        # Se llama con el candado tomado
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.page.update()
+        self._last_update = time.monotonic()
+        self._pending = False
+
+
+def build_result_card(item: dict) -> ft.Container:
+    """
+    Construye la tarjeta de resultados de un DDNS escaneado.
+
+    :param item: Diccionario de resultado del escaneo de un DDNS.
+    :type item: dict
+    :returns: Contenedor de Flet con el detalle del resultado.
+    :rtype: ft.Container
+    """
+    if item['status'] == 'success':
+        # DDNS escaneado exitosamente
+        rechazados, filtrados = closed_port_states(item)
+        container_content = [
+            ft.Row([
+                ft.Icon(name=ft.Icons.PERM_SCAN_WIFI, 
+                       color=ft.Colors.GREEN_400 if item['open_ports'] else ft.Colors.RED_400),
+                ft.Text(f"{item['url']}", weight="bold", size=14, color=ft.Colors.GREY_800)
+            ]),
+            ft.Text(f"IP: {item['ip']}", size=12, color=ft.Colors.GREY_500),
+            ft.Text(f"Puertos abiertos: {', '.join(map(str, item['open_ports'])) if item['open_ports'] else 'Ninguno'}", 
+                   weight="bold", 
+                   color=ft.Colors.GREEN_600 if item['open_ports'] else ft.Colors.GREY_600,
+                   size=12),
+            ft.Text(f"Puertos rechazados: {', '.join(map(str, rechazados)) if rechazados else 'N/A'}", 
+                   size=12, color=ft.Colors.GREY_600),
+        ]
+        if filtrados:
+            container_content.append(
+                ft.Text(f"Puertos filtrados (sin respuesta): {', '.join(map(str, filtrados))}",
+                       size=12, color=ft.Colors.ORANGE_700)
+            )
+        if item.get('latency_ms'):
+            latency = item['latency_ms']
+            container_content.append(
+                ft.Text(f"Latencia: mín {latency['min']} ms · mediana {latency['median']} ms · máx {latency['max']} ms",
+                       size=12,
+                       color=ft.Colors.ORANGE_700 if latency['median'] >= SLOW_LATENCY_MS else ft.Colors.GREY_600)
             )
-            continue
+        if item.get('services'):
+            container_content.append(
+                ft.Text(f"Servicios: {format_services(item['services'])}", size=12, color=ft.Colors.BLUE_GREY_600)
+            )
+        bg_color = ft.Colors.GREEN_50 if item['open_ports'] else ft.Colors.GREY_100
+        border_color = ft.Colors.GREEN_200 if item['open_ports'] else ft.Colors.GREY_200
         
-    return open_ports, closed_ports
+    elif item['status'] == 'unreachable':
+        # Host resuelto pero sin respuesta en ningún puerto
+        container_content = [
+            ft.Row([
+                ft.Icon(name=ft.Icons.WIFI_OFF, color=ft.Colors.ORANGE_400),
+                ft.Text(f"{item['url']}", weight="bold", size=14, color=ft.Colors.GREY_800)
+            ]),
+            ft.Text(f"IP: {item['ip']}", size=12, color=ft.Colors.GREY_500),
+            ft.Text(f"Estado: {item['error']}", color=ft.Colors.ORANGE_700, size=12)
+        ]
+        bg_color = ft.Colors.ORANGE_50
+        border_color = ft.Colors.ORANGE_200
+
+    else:
+        # Error en el DDNS
+        container_content = [
+            ft.Row([
+                ft.Icon(name=ft.Icons.ERROR, color=ft.Colors.RED_400),
+                ft.Text(f"{item['url']}", weight="bold", size=14, color=ft.Colors.GREY_800)
+            ]),
+            ft.Text(f"Estado: {item['error']}", color=ft.Colors.RED_600, size=12)
+        ]
+        bg_color = ft.Colors.RED_50
+        border_color = ft.Colors.RED_200
+
+    if item.get('from_history'):
+        container_content.append(
+            ft.Text(f"Resultado previo del {item['scanned_at']} (no se volvió a escanear)", 
+                   size=11, italic=True, color=ft.Colors.GREY_500)
+        )
+
+    return ft.Container(
+        content=ft.Column(container_content),
+        padding=12,
+        margin=3,
+        bgcolor=bg_color,
+        border=ft.border.all(1, border_color),
+        border_radius=8,
+        width=500
+    )
 
 
-def create_activities_for_no_ports(scan_results: list, results_column: ft.Column, page: ft.Page):
+def create_activities_for_no_ports(scan_results: list, results_column: ft.Column = None, page: ft.Page = None):
     """
     Crea actividades automáticamente para los enlaces sin puertos abiertos.
 
     Después de completar el escaneo, esta función identifica los enlaces que no tienen
-    ningún puerto abierto y crea una actividad de seguimiento para cada uno.
+    ningún puerto abierto y crea una actividad de seguimiento para cada uno que no tenga
+    ya una actividad abierta. La lógica
+    vive en services.scan_pipeline para poder usarse sin interfaz gráfica.
 
     :param scan_results: Lista de resultados del escaneo.
     :type scan_results: list
@@ -71,154 +204,61 @@ def create_activities_for_no_ports(scan_results: list, results_column: ft.Column
     :param page: La página principal de Flet, utilizada para forzar las actualizaciones de UI.
     :type page: ft.Page
     """
-    # Filtrar los enlaces sin puertos abiertos y con estado exitoso
-    no_ports_links = [
-        item for item in scan_results 
-        if item['status'] == 'success' and not item['open_ports']
-    ]
-    
-    if not no_ports_links:
-        print("[INFO] No hay enlaces sin puertos abiertos para crear actividades")
-        return
-    
-    print(f"[INFO] Creando actividades para {len(no_ports_links)} enlaces sin puertos abiertos")
-    
-    # Crear una actividad por cada enlace sin puertos abiertos
-    for link in no_ports_links:
-        actividad_data = {
-            "titulo": f"Revisar: {link['nombre'] if 'nombre' in link else link['url']}",
-            "descripcion": f"El escaneo general detectó que el enlace {link['url']} (IP: {link['ip']}) no tiene ningún puerto abierto en la lista de puertos monitoreados.",
-            "fecha": datetime.now().strftime("%Y-%m-%d")
-        }
-        
-        try:
-            result = ApiService.create_activity(actividad_data)
-            if result["success"]:
-                print(f"[SUCCESS] Actividad creada para {link['url']}")
-            else:
-                print(f"[ERROR] No se pudo crear actividad para {link['url']}: {result['message']}")
-        except Exception as ex:
-            print(f"[ERROR] Excepción al crear actividad para {link['url']}: {str(ex)}")
-    
-    print("[INFO] Proceso de creación de actividades completado")
+    create_activities_for_down_links(scan_results)
 
 
-def export_scan_results_to_excel(scan_results: list) -> str:
+def export_scan_results_to_excel(scan_results: list, streaming: bool = True) -> str:
     """
     Exporta los resultados del escaneo a un archivo Excel.
 
     Crea un archivo Excel con los resultados del escaneo general, incluyendo
     información detallada sobre cada enlace escaneado, puertos abiertos/cerrados
-    y estado del escaneo.
+    y estado del escaneo. La escritura vive en services.scan_export; aquí solo
+    se recuerda la ruta del último archivo para el botón ABRIR EXCEL.
 
     :param scan_results: Lista de resultados del escaneo.
     :type scan_results: list
+    :param streaming: Si es True, escribe con una hoja de solo escritura.
+    :type streaming: bool
     :returns: Ruta del archivo Excel generado.
     :rtype: str
     """
     global last_excel_file
-    
-    try:
-        # Crear workbook y hoja
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Escaneo General"
-        
-        # Definir estilos
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        title_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
-        title_font = Font(bold=True, size=11)
-        success_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
-        error_fill = PatternFill(start_color="FCE4D6", end_color="FCE4D6", fill_type="solid")
-        border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Encabezados principales
-        headers = ["DDNS/URL", "IP", "Estado", "Puertos Abiertos", "Puertos Cerrados", "Total Puertos"]
-        ws.append(headers)
-        
-        # Aplicar estilo a los encabezados
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = border
-        
-        # Agregar datos del escaneo
-        row_num = 2
-        for item in scan_results:
-            if item['status'] == 'success':
-                estado = "✓ Exitoso"
-                fill = success_fill
-                puertos_abiertos = ', '.join(map(str, item['open_ports'])) if item['open_ports'] else "-"
-                puertos_cerrados = ', '.join(map(str, item['closed_ports'])) if item['closed_ports'] else "-"
-                total_puertos = len(item['closed_ports']) + len(item['open_ports'])
-            else:
-                estado = f"✗ {item['status']}: {item.get('error', 'Error desconocido')}"
-                fill = error_fill
-                puertos_abiertos = "-"
-                puertos_cerrados = "-"
-                total_puertos = 0
-            
-            row_data = [
-                item['url'],
-                item.get('ip', '-'),
-                estado,
-                puertos_abiertos,
-                puertos_cerrados,
-                total_puertos
-            ]
-            
-            ws.append(row_data)
-            
-            # Aplicar estilo a la fila
-            for cell in ws[row_num]:
-                cell.fill = fill
-                cell.border = border
-                cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
-            
-            row_num += 1
-        
-        # Ajustar ancho de columnas
-        column_widths = [25, 20, 30, 30, 30, 15]
-        for i, width in enumerate(column_widths, 1):
-            ws.column_dimensions[get_column_letter(i)].width = width
-        
-        # Crear carpeta de reportes si no existe
-        reports_folder = os.path.join(os.path.expanduser("~"), "Documents", "SGCC_Reportes")
-        if not os.path.exists(reports_folder):
-            os.makedirs(reports_folder)
-        
-        # Generar nombre del archivo con fecha y hora
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_path = os.path.join(reports_folder, f"escaneo_general_{timestamp}.xlsx")
-        
-        # Guardar el archivo
-        wb.save(file_path)
-        
-        # Guardar la ruta en la variable global
+
+    file_path = scan_export.export_scan_results_to_excel(scan_results, streaming)
+    if file_path:
         last_excel_file = file_path
-        
-        print(f"[SUCCESS] Archivo Excel generado: {file_path}")
-        return file_path
-        
-    except Exception as ex:
-        print(f"[ERROR] Error al generar Excel: {str(ex)}")
-        return None
+    return file_path
+
+
+def _reset_scan_controls(loading_row: ft.Row, scan_button: ft.FilledButton, cancel_button: ft.FilledButton = None):
+    """
+    Restaura los controles de escaneo a su estado inicial.
+
+    :param loading_row: Fila de Flet que contiene el indicador de carga y el texto de estado.
+    :type loading_row: ft.Row
+    :param scan_button: El botón de escaneo a habilitar nuevamente.
+    :type scan_button: ft.FilledButton
+    :param cancel_button: El botón de cancelación a ocultar.
+    :type cancel_button: ft.FilledButton
+    """
+    loading_row.visible = False
+    scan_button.disabled = False
+    scan_button.bgcolor = ft.Colors.INDIGO_700
+    scan_button.color = ft.Colors.WHITE
+    if cancel_button:
+        cancel_button.visible = False
+        cancel_button.disabled = True
+        cancel_button.on_click = None
 
 
-def scan_urls_handler(e, results_column: ft.Column, loading_row: ft.Row, scan_button: ft.FilledButton, page: ft.Page, download_button: ft.FilledButton = None):
+def scan_urls_handler(e, results_column: ft.Column, loading_row: ft.Row, scan_button: ft.FilledButton, page: ft.Page, download_button: ft.FilledButton = None, cancel_button: ft.FilledButton = None, delta_mode: bool = False, extra_formats: list = None, fingerprint: bool = False):
     """
     Manejador de eventos para iniciar el Escaneo General de DDNS desde la API.
 
-    Obtiene la lista de DDNS de la API y escanea solo esos enlaces.
-    Gestiona la UI (deshabilitación/habilitación del botón, visibilidad de carga) 
-    y la lógica de escaneo.
+    Prepara la UI y lanza el escaneo como un trabajo de fondo (ScanJob), de modo
+    que el clic regresa de inmediato y la aplicación sigue respondiendo. El botón
+    de cancelación queda ligado al trabajo en curso.
 
     :param e: Objeto de evento de Flet (el evento de clic del botón).
     :param results_column: Columna de Flet donde se mostrarán los resultados finales.
@@ -231,13 +271,73 @@ def scan_urls_handler(e, results_column: ft.Column, loading_row: ft.Row, scan_bu
     :type page: ft.Page
     :param download_button: El botón de descarga a habilitar cuando se genere el Excel.
     :type download_button: ft.FilledButton
+    :param cancel_button: El botón que cancela el trabajo de escaneo en curso.
+    :type cancel_button: ft.FilledButton
+    :param delta_mode: Si es True, solo se escanean los DDNS fallidos, nuevos o con
+                       resultado vencido; el resto reutiliza su último resultado.
+    :type delta_mode: bool
+    :param extra_formats: Formatos de exportación adicionales al Excel (ej. ['csv', 'jsonl']).
+    :type extra_formats: list
+    :param fingerprint: Si es True, identifica el servicio HTTP/RTSP de los puertos abiertos.
+    :type fingerprint: bool
+    :returns: El trabajo de escaneo lanzado.
+    :rtype: ScanJob
     """
     # --- Configuración Inicial de UI ---
     scan_button.disabled = True
     scan_button.bgcolor = ft.Colors.GREY_500
     scan_button.color = ft.Colors.GREY_600
+
+    job = ScanJob(PORT_LIST, MAX_CONCURRENCY, fingerprint=fingerprint)
+
+    if cancel_button:
+        def cancel_scan(ev):
+            job.cancel()
+            cancel_button.disabled = True
+            loading_row.controls[1].value = "Cancelando escaneo..."
+            page.update()
+
+        cancel_button.on_click = cancel_scan
+        cancel_button.disabled = False
+        cancel_button.visible = True
     page.update()
-    
+
+    threading.Thread(
+        target=_run_general_scan,
+        args=(job, results_column, loading_row, scan_button, page, download_button, cancel_button, delta_mode, extra_formats),
+        name="escaneo-general",
+        daemon=True
+    ).start()
+    return job
+
+
+def _run_general_scan(job: ScanJob, results_column: ft.Column, loading_row: ft.Row, scan_button: ft.FilledButton, page: ft.Page, download_button: ft.FilledButton = None, cancel_button: ft.FilledButton = None, delta_mode: bool = False, extra_formats: list = None):
+    """
+    Cuerpo del Escaneo General; se ejecuta en un hilo de fondo.
+
+    Obtiene la lista de DDNS de la API, la escanea con el trabajo recibido, crea
+    las actividades y exporta el Excel. Si el trabajo se cancela, exporta solo
+    los resultados parciales y omite la creación de actividades.
+
+    :param job: Trabajo de escaneo que ejecuta el pipeline y permite cancelarlo.
+    :type job: ScanJob
+    :param results_column: Columna de Flet donde se mostrarán los resultados finales.
+    :type results_column: ft.Column
+    :param loading_row: Fila de Flet que contiene el indicador de carga y el texto de estado.
+    :type loading_row: ft.Row
+    :param scan_button: El botón de escaneo a habilitar al terminar.
+    :type scan_button: ft.FilledButton
+    :param page: La página principal de Flet, utilizada para forzar las actualizaciones de UI.
+    :type page: ft.Page
+    :param download_button: El botón de descarga a habilitar cuando se genere el Excel.
+    :type download_button: ft.FilledButton
+    :param cancel_button: El botón de cancelación a ocultar al terminar.
+    :type cancel_button: ft.FilledButton
+    :param delta_mode: Si es True, reutiliza los resultados sanos y recientes del historial.
+    :type delta_mode: bool
+    :param extra_formats: Formatos de exportación adicionales al Excel.
+    :type extra_formats: list
+    """
     results_column.controls.clear()
 
     loading_indicator = loading_row.controls[0]
@@ -271,10 +371,7 @@ def scan_urls_handler(e, results_column: ft.Column, loading_row: ft.Row, scan_bu
                 width=500
             )
         )
-        loading_row.visible = False
-        scan_button.disabled = False
-        scan_button.bgcolor = ft.Colors.INDIGO_700
-        scan_button.color = ft.Colors.WHITE
+        _reset_scan_controls(loading_row, scan_button, cancel_button)
         page.update()
         return
     
@@ -299,78 +396,34 @@ def scan_urls_handler(e, results_column: ft.Column, loading_row: ft.Row, scan_bu
                 width=500
             )
         )
-        loading_row.visible = False
-        scan_button.disabled = False
-        scan_button.bgcolor = ft.Colors.INDIGO_700
-        scan_button.color = ft.Colors.WHITE
+        _reset_scan_controls(loading_row, scan_button, cancel_button)
         page.update()
         return
 
-    # Lista para almacenar los resultados del escaneo
-    scan_results = []
-    total_scanned = 0
-    
-    status_text.value = "Escaneando DDNS..."
-    page.update()
-    
-    # Escanear cada DDNS
-    for url in urls:
+    # En modo delta solo se escanean los DDNS fallidos, nuevos o vencidos
+    scan_targets = urls
+    reused = {}
+    if delta_mode:
         try:
-            ip_addr = socket.gethostbyname(url)
-            open_ports, closed_ports = scan_ports(ip_addr, results_column)
-            total_scanned += 1
-            
-            scan_results.append({
-                'url': url,
-                'ip': ip_addr,
-                'open_ports': open_ports,
-                'closed_ports': closed_ports,
-                'status': 'success'
-            })
-            
-            # Actualizar el contador durante el escaneo
-            status_text.value = f"Escaneando... {total_scanned}/{len(urls)}"
-            page.update()
-
-        except socket.gaierror:
-            total_scanned += 1
-            # Error al resolver DNS
-            scan_results.append({
-                'url': url,
-                'ip': 'No se pudo resolver',
-                'open_ports': [],
-                'closed_ports': [],
-                'status': 'dns_error',
-                'error': 'Error al resolver DNS'
-            })
-            status_text.value = f"Escaneando... {total_scanned}/{len(urls)}"
-            page.update()
-            continue
+            scan_targets, reused = plan_delta_scan(urls, SCAN_HISTORY)
+            print(f"[INFO] Escaneo delta: {len(scan_targets)} DDNS por escanear, {len(reused)} resultados reutilizados")
         except Exception as ex:
-            total_scanned += 1
-            scan_results.append({
-                'url': url,
-                'ip': 'Error',
-                'open_ports': [],
-                'closed_ports': [],
-                'status': 'error',
-                'error': str(ex)
-            })
-            status_text.value = f"Escaneando... {total_scanned}/{len(urls)}"
-            page.update()
-            continue
+            print(f"[ERROR] No se pudo consultar el historial, se escaneará todo: {str(ex)}")
+            scan_targets, reused = urls, {}
+
+    status_text.value = f"Escaneando... 0/{len(scan_targets)}"
 
-    # Limpiar los resultados anteriores
+    # Mostrar encabezado con estadísticas; las tarjetas se agregan debajo
+    # conforme termina cada DDNS
     results_column.controls.clear()
-    
-    # Mostrar encabezado con estadísticas
+    total_text = ft.Text(f"Total de DDNS escaneados: 0/{len(scan_targets)}", 
+                         size=16, weight="bold", color=ft.Colors.GREY_600)
     results_column.controls.append(
         ft.Container(
             content=ft.Column([
                 ft.Text("RESULTADOS DEL ESCANEO DE DDNS", 
                        size=20, weight="bold", color=ft.Colors.BLUE_800),
-                ft.Text(f"Total de DDNS escaneados: {total_scanned}", 
-                       size=16, weight="bold", color=ft.Colors.GREY_600),
+                total_text,
                 ft.Divider(height=2, color=ft.Colors.GREY_400)
             ]),
             padding=15,
@@ -380,93 +433,139 @@ def scan_urls_handler(e, results_column: ft.Column, loading_row: ft.Row, scan_bu
             width=500
         )
     )
-    
-    # Mostrar resultados detallados
-    if scan_results:
-        for item in scan_results:
-            if item['status'] == 'success':
-                # DDNS escaneado exitosamente
-                container_content = [
-                    ft.Row([
-                        ft.Icon(name=ft.Icons.PERM_SCAN_WIFI, 
-                               color=ft.Colors.GREEN_400 if item['open_ports'] else ft.Colors.RED_400),
-                        ft.Text(f"{item['url']}", weight="bold", size=14, color=ft.Colors.GREY_800)
-                    ]),
-                    ft.Text(f"IP: {item['ip']}", size=12, color=ft.Colors.GREY_500),
-                    ft.Text(f"Puertos abiertos: {', '.join(map(str, item['open_ports'])) if item['open_ports'] else 'Ninguno'}", 
-                           weight="bold", 
-                           color=ft.Colors.GREEN_600 if item['open_ports'] else ft.Colors.GREY_600,
-                           size=12),
-                    ft.Text(f"Puertos cerrados: {', '.join(map(str, item['closed_ports'])) if item['closed_ports'] else 'N/A'}", 
-                           size=12, color=ft.Colors.GREY_600),
-                ]
-                bg_color = ft.Colors.GREEN_50 if item['open_ports'] else ft.Colors.GREY_100
-                border_color = ft.Colors.GREEN_200 if item['open_ports'] else ft.Colors.GREY_200
-                
-            else:
-                # Error en el DDNS
-                container_content = [
-                    ft.Row([
-                        ft.Icon(name=ft.Icons.ERROR, color=ft.Colors.RED_400),
-                        ft.Text(f"{item['url']}", weight="bold", size=14, color=ft.Colors.GREY_800)
-                    ]),
-                    ft.Text(f"Estado: {item['error']}", color=ft.Colors.RED_600, size=12)
-                ]
-                bg_color = ft.Colors.RED_50
-                border_color = ft.Colors.RED_200
-
-            results_column.controls.append(ft.Container(
-                content=ft.Column(container_content),
-                padding=12,
-                margin=3,
-                bgcolor=bg_color,
-                border=ft.border.all(1, border_color),
-                border_radius=8,
-                width=500
-            ))
+    # Los resultados reutilizados se muestran de inmediato
+    for url in urls:
+        if url in reused:
+            results_column.controls.append(build_result_card(reused[url]))
+    page.update()
 
-    loading_row.visible = False
+    throttle = RepaintThrottle(page)
+
+    def on_result(item):
+        # Agregar la tarjeta del DDNS en cuanto termina y repintar con límite de frecuencia
+        done, total = job.progress
+        results_column.controls.append(build_result_card(item))
+        total_text.value = f"Total de DDNS escaneados: {done}/{total}"
+        status_text.value = f"Escaneando... {done}/{total}"
+        throttle.request()
 
-    # Crear actividades para enlaces sin puertos abiertos
-    create_activities_for_no_ports(scan_results, results_column, page)
+    job.on_result = on_result
+    started_at = datetime.now()
 
-    # Exportar resultados a Excel
-    excel_path = export_scan_results_to_excel(scan_results)
+    # Resolver y escanear todos los DDNS en un solo pipeline concurrente.
+    # Cada DDNS empieza a escanearse en cuanto se resuelve.
+    try:
+        fresh_results = job.run(scan_targets)
+    except Exception as ex:
+        print(f"[ERROR] Error en el motor de escaneo: {str(ex)}")
+        fresh_results = [{
+            'url': url,
+            'ip': 'Error',
+            'open_ports': [],
+            'closed_ports': [],
+            'status': 'error',
+            'error': str(ex)
+        } for url in scan_targets]
+        results_column.controls[1 + len(reused):] = [build_result_card(item) for item in fresh_results]
+
+    # Combinar resultados nuevos y reutilizados en el orden de la lista de enlaces
+    fresh_by_url = {item['url']: item for item in fresh_results}
+    scan_results = [fresh_by_url.get(url) or reused.get(url) for url in urls]
+    scan_results = [item for item in scan_results if item]
+
+    total_scanned = len(fresh_results)
+    if job.cancelled:
+        total_text.value = f"Total de DDNS escaneados: {total_scanned}/{len(scan_targets)} (cancelado)"
+    else:
+        total_text.value = f"Total de DDNS escaneados: {total_scanned}"
+    if reused:
+        total_text.value += f" (+{len(reused)} sin cambios)"
+    throttle.flush()
+
+    if cancel_button:
+        cancel_button.visible = False
+    loading_row.visible = False
+
+    # Guardar en el historial y crear actividades (solo los DDNS escaneados en esta ejecución)
+    process_scan_results(fresh_results, started_at, cancelled=job.cancelled)
 
     # Mensaje final
-    results_column.controls.append(
-        ft.Row(
-            [
-                ft.Icon(name=ft.Icons.CHECK_CIRCLE, color=ft.Colors.GREEN_700),
-                ft.Text("Escaneo completado.", weight="bold", color=ft.Colors.GREEN_700, size=18)
-            ],
-            alignment=ft.MainAxisAlignment.CENTER
+    if job.cancelled:
+        results_column.controls.append(
+            ft.Row(
+                [
+                    ft.Icon(name=ft.Icons.CANCEL, color=ft.Colors.ORANGE_700),
+                    ft.Text("Escaneo cancelado.", weight="bold", color=ft.Colors.ORANGE_700, size=18)
+                ],
+                alignment=ft.MainAxisAlignment.CENTER
+            )
         )
-    )
-    
-    # Agregar mensaje con la ruta del archivo Excel
-    if excel_path:
-        # Habilitar el botón de descarga
-        if download_button:
-            download_button.disabled = False
-            download_button.visible = True
-        
+    else:
         results_column.controls.append(
-            ft.Container(
-                content=ft.Column([
-                    ft.Icon(name=ft.Icons.FILE_DOWNLOAD, size=24, color=ft.Colors.GREEN_700),
-                    ft.Text("Reporte exportado:", weight="bold", color=ft.Colors.GREEN_700, size=12),
-                    ft.Text(excel_path, size=10, color=ft.Colors.BLUE_600)
-                ], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-                padding=12,
-                margin=10,
-                bgcolor=ft.Colors.GREEN_50,
-                border_radius=8,
-                width=500
+            ft.Row(
+                [
+                    ft.Icon(name=ft.Icons.CHECK_CIRCLE, color=ft.Colors.GREEN_700),
+                    ft.Text("Escaneo completado.", weight="bold", color=ft.Colors.GREEN_700, size=18)
+                ],
+                alignment=ft.MainAxisAlignment.CENTER
             )
         )
-    
-    scan_button.disabled = False
-    scan_button.bgcolor = ft.Colors.INDIGO_700
-    scan_button.color = ft.Colors.WHITE
-    page.update()
\ No newline at end of file
+
+    _reset_scan_controls(loading_row, scan_button, cancel_button)
+
+    # Exportar resultados en segundo plano (parciales si el escaneo se canceló).
+    # El botón ABRIR EXCEL se habilita cuando el archivo ya está escrito en disco.
+    if scan_results:
+        if download_button:
+            download_button.disabled = True
+        export_text = ft.Text("Generando reportes...", size=12, color=ft.Colors.GREY_600)
+        results_column.controls.append(export_text)
+        page.update()
+
+        formats = ["xlsx"] + [fmt for fmt in (extra_formats or []) if fmt != "xlsx"]
+
+        def on_exported(paths):
+            global last_excel_file
+
+            results_column.controls.remove(export_text)
+            excel_path = paths.get("xlsx")
+            if excel_path:
+                last_excel_file = excel_path
+
+                # Habilitar el botón de descarga
+                if download_button:
+                    download_button.disabled = False
+                    download_button.visible = True
+
+                # Agregar mensaje con la ruta del archivo Excel
+                results_column.controls.append(
+                    ft.Container(
+                        content=ft.Column([
+                            ft.Icon(name=ft.Icons.FILE_DOWNLOAD, size=24, color=ft.Colors.GREEN_700),
+                            ft.Text("Reporte exportado:", weight="bold", color=ft.Colors.GREEN_700, size=12),
+                            ft.Text(excel_path, size=10, color=ft.Colors.BLUE_600)
+                        ] + [
+                            ft.Text(path, size=10, color=ft.Colors.BLUE_600)
+                            for fmt, path in paths.items() if fmt != "xlsx" and path
+                        ], alignment=ft.MainAxisAlignment.CENTER, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                        padding=12,
+                        margin=10,
+                        bgcolor=ft.Colors.GREEN_50,
+                        border_radius=8,
+                        width=500
+                    )
+                )
+            else:
+                results_column.controls.append(
+                    ft.Text("No se pudo generar el reporte de Excel", size=12, color=ft.Colors.RED_600)
+                )
+            for fmt, path in paths.items():
+                if fmt != "xlsx" and not path:
+                    results_column.controls.append(
+                        ft.Text(f"No se pudo generar el reporte {fmt.upper()}", size=12, color=ft.Colors.RED_600)
+                    )
+            page.update()
+
+        scan_export.export_in_background(list(scan_results), on_exported, formats)
+    else:
+        page.update()
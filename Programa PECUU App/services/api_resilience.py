@@ -0,0 +1,204 @@
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")  # métodos que se pueden repetir sin duplicar registros
+RETRYABLE_STATUS = (502, 503, 504)  # respuestas de un backend o proxy temporalmente no disponible
+MAX_RETRIES = 2  # reintentos después del primer intento
+RETRY_BASE_DELAY = 0.5  # segundos; la espera máxima se duplica en cada reintento
+RETRY_MAX_DELAY = 4  # segundos; tope de la espera entre reintentos
+
+FAILURE_THRESHOLD = 3  # fallos consecutivos que abren el circuito
+RESET_TIMEOUT = 30  # segundos con el circuito abierto antes de dejar pasar una petición de prueba
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class BackendUnavailableError(requests.exceptions.ConnectionError):
+    """
+    El circuito está abierto: la petición se rechaza sin usar la red.
+
+    Hereda de ConnectionError para que los llamadores que ya manejan
+    `requests.exceptions.RequestException` la reporten como error de conexión.
+    """
+
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """
+    Espera antes de un reintento, con retroceso exponencial y variación aleatoria completa.
+
+    La variación evita que muchos hilos reintenten contra el backend al mismo tiempo.
+
+    Args:
+        attempt: Número de reintento, empezando en 0.
+        base: Espera máxima del primer reintento en segundos.
+        cap: Espera máxima de cualquier reintento en segundos.
+
+    Returns:
+        Segundos a esperar, entre 0 y min(cap, base * 2**attempt).
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Interruptor de circuito para un backend. Es seguro para usarse desde varios hilos.
+
+    Cerrado, las peticiones pasan. Tras `failure_threshold` fallos consecutivos
+    se abre y las peticiones se rechazan de inmediato. Pasados `reset_timeout`
+    segundos queda semiabierto y deja pasar una sola petición de prueba: si
+    funciona se cierra, si falla se abre de nuevo.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        """
+        Args:
+            failure_threshold: Fallos consecutivos que abren el circuito.
+            reset_timeout: Segundos abierto antes de la petición de prueba.
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Estado actual: 'closed', 'open' o 'half_open'."""
+        with self._lock:
+            if self._state == CIRCUIT_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return CIRCUIT_HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Indica si una petición puede ir al backend; en semiabierto, solo la primera."""
+        with self._lock:
+            if self._state == CIRCUIT_CLOSED:
+                return True
+            if self._state == CIRCUIT_OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = CIRCUIT_HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        """Registra una respuesta del backend y cierra el circuito."""
+        with self._lock:
+            if self._state != CIRCUIT_CLOSED:
+                print("[INFO] El backend respondió de nuevo; se cierra el circuito")
+            self._state = CIRCUIT_CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Registra un fallo del backend (error de conexión, tiempo agotado o respuesta 5xx)."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == CIRCUIT_OPEN:
+                return
+            if self._state == CIRCUIT_HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = CIRCUIT_OPEN
+                self._opened_at = time.monotonic()
+                fallos = f"{self._failures} fallo" + ("s" if self._failures != 1 else "")
+                print(f"[ERROR] Backend no disponible tras {fallos}; "
+                      f"se rechazarán peticiones durante {self.reset_timeout} s")
+
+    def reset(self):
+        """Cierra el circuito y olvida los fallos."""
+        with self._lock:
+            self._state = CIRCUIT_CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """Segundos que faltan para la petición de prueba (0 si el circuito no está abierto)."""
+        with self._lock:
+            if self._state != CIRCUIT_OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+
+def _empty_stats() -> Dict:
+    return {
+        "requests": 0, "failures": 0, "rejected": 0, "consecutive_failures": 0,
+        "last_latency_ms": None, "last_error": None, "last_success_at": None, "last_failure_at": None
+    }
+
+
+class EndpointHealth:
+    """Estadísticas de salud por endpoint ("GET links.json", "PUT links/{id}", ...). Segura entre hilos."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, ok: bool, latency: Optional[float] = None, error: Optional[str] = None):
+        """
+        Registra el resultado de una petición.
+
+        Args:
+            endpoint: Llave del endpoint (ver `endpoint_key`).
+            ok: True si el backend respondió sin error de servidor (un 4xx cuenta como respuesta).
+            latency: Segundos que tardó la petición, si llegó al backend.
+            error: Descripción del fallo.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, _empty_stats())
+            stats["requests"] += 1
+            if latency is not None:
+                stats["last_latency_ms"] = round(latency * 1000, 1)
+            if ok:
+                stats["consecutive_failures"] = 0
+                stats["last_success_at"] = time.time()
+            else:
+                stats["failures"] += 1
+                stats["consecutive_failures"] += 1
+                stats["last_error"] = error
+                stats["last_failure_at"] = time.time()
+
+    def record_rejected(self, endpoint: str):
+        """Registra una petición rechazada por el circuito abierto (no llegó al backend)."""
+        with self._lock:
+            self._stats.setdefault(endpoint, _empty_stats())["rejected"] += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copia de las estadísticas por endpoint."""
+        with self._lock:
+            return {endpoint: dict(stats) for endpoint, stats in self._stats.items()}
+
+    def clear(self):
+        """Elimina todas las estadísticas."""
+        with self._lock:
+            self._stats.clear()
+
+
+def endpoint_key(method: str, url: str, base_url: str) -> str:
+    """
+    Llave de salud de una petición: método y ruta con los identificadores generalizados.
+
+    Args:
+        method: Método HTTP.
+        url: URL completa de la petición.
+        base_url: URL base de la API.
+
+    Returns:
+        Texto como "GET links.json", "PUT activities/{id}" o "POST links/bulk".
+    """
+    path = url[len(base_url):] if url.startswith(base_url) else url
+    partes = [parte for parte in path.split("?")[0].split("/") if parte]
+    if len(partes) > 1:
+        partes = [partes[0], partes[1] if partes[1] == "bulk" else "{id}"]
+    return f"{method.upper()} {'/'.join(partes)}"
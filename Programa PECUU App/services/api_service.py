@@ -1,6 +1,14 @@
 import requests
 import json
-from typing import List, Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Callable, List, Dict, Optional
+
+from services import api_resilience
+from services.api_resilience import BackendUnavailableError, CircuitBreaker, EndpointHealth, backoff_delay, endpoint_key
+from services.link_catalog import LinkCatalog
 
 
 class ApiService:
@@ -10,44 +18,287 @@ class ApiService:
     
     BASE_URL = "https://aids.policiachihuahua.gob.mx/sgcc-backend/api"
     TIMEOUT = 10  # segundos
+    BATCH_WORKERS = 8  # peticiones simultáneas al crear registros en lote sin endpoint masivo
+    BULK_CHUNK_SIZE = 100  # registros por petición al endpoint masivo
+    POOL_SIZE = 16  # conexiones keep-alive conservadas hacia el backend (al menos BATCH_WORKERS)
+    
+    CACHE_TTL = 30  # segundos en que get_links/get_activities responden desde memoria sin revalidar
+    
+    # Sesión HTTP compartida por todos los métodos; se crea en la primera petición
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    
+    # Respuestas en caché por recurso ("links", "activities"): datos ya transformados,
+    # validadores (ETag, Last-Modified) y momento de la última validación
+    _cache: Dict[str, Dict] = {}
+    _cache_generation: Dict[str, int] = {"links": 0, "activities": 0}
+    _cache_lock = threading.Lock()
+    
+    # Un solo circuito para el backend (si se cae, se caen todos sus endpoints) y salud por endpoint
+    _circuit = CircuitBreaker()
+    _endpoint_health = EndpointHealth()
+    
+    # Soporte del endpoint masivo por recurso ("links", "activities"):
+    # None = no probado, True/False = resultado de la primera petición
+    _bulk_supported: Dict[str, Optional[bool]] = {"links": None, "activities": None}
+    
+    @staticmethod
+    def _get_session() -> requests.Session:
+        """
+        Obtiene la sesión HTTP compartida, creándola si no existe.
+        
+        La sesión conserva hasta POOL_SIZE conexiones keep-alive hacia el backend,
+        de modo que las peticiones consecutivas no repiten la conexión TCP ni el
+        saludo TLS. El pool de conexiones de la sesión es seguro entre hilos.
+        
+        Returns:
+            Sesión de requests configurada para la API
+        """
+        session = ApiService._session
+        if session is None:
+            with ApiService._session_lock:
+                session = ApiService._session
+                if session is None:
+                    session = requests.Session()
+                    session.verify = False
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=ApiService.POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    ApiService._session = session
+        return session
+    
+    @staticmethod
+    def configure_pool(pool_size: int):
+        """
+        Cambia el número de conexiones conservadas; la sesión se recrea en la siguiente petición.
+        
+        Args:
+            pool_size: Conexiones keep-alive máximas hacia el backend
+        """
+        with ApiService._session_lock:
+            ApiService.POOL_SIZE = max(1, pool_size)
+            session, ApiService._session = ApiService._session, None
+        if session is not None:
+            session.close()
+    
+    @staticmethod
+    def close_session():
+        """Cierra las conexiones abiertas de la sesión compartida (por ejemplo, al salir de la aplicación)."""
+        with ApiService._session_lock:
+            session, ApiService._session = ApiService._session, None
+        if session is not None:
+            session.close()
+    
+    @staticmethod
+    def _request(method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Realiza una petición con la sesión compartida y el TIMEOUT por defecto.
+        
+        Las peticiones idempotentes (GET, PUT, DELETE) se reintentan hasta
+        api_resilience.MAX_RETRIES veces, con espera exponencial aleatoria, si la
+        conexión falla o el backend responde 502/503/504. Un tiempo de espera
+        agotado no se reintenta. Los errores de conexión, los tiempos agotados y
+        las respuestas 5xx cuentan como fallos del backend; tras
+        api_resilience.FAILURE_THRESHOLD fallos seguidos se abre el circuito y,
+        mientras está abierto, las peticiones fallan de inmediato con
+        BackendUnavailableError en lugar de esperar TIMEOUT cada una.
+        
+        Args:
+            method: Método HTTP ("GET", "POST", "PUT", "DELETE")
+            url: URL completa del recurso
+            **kwargs: Argumentos adicionales de requests (json, headers, ...)
+        
+        Returns:
+            Respuesta HTTP
+        
+        Raises:
+            BackendUnavailableError: Si el circuito está abierto
+            requests.exceptions.RequestException: Si la petición falla
+        """
+        kwargs.setdefault("timeout", ApiService.TIMEOUT)
+        method = method.upper()
+        endpoint = endpoint_key(method, url, ApiService.BASE_URL)
+        attempts = 1 + (api_resilience.MAX_RETRIES if method in api_resilience.IDEMPOTENT_METHODS else 0)
+        
+        for attempt in range(attempts):
+            if not ApiService._circuit.allow_request():
+                ApiService._endpoint_health.record_rejected(endpoint)
+                raise BackendUnavailableError(
+                    f"Backend no disponible; se reintentará en {ApiService._circuit.retry_after():.0f} s"
+                )
+            
+            started = time.monotonic()
+            try:
+                response = ApiService._get_session().request(method, url, **kwargs)
+            except requests.exceptions.Timeout as e:
+                # Ya se esperó TIMEOUT completo: no se repite
+                ApiService._endpoint_health.record(endpoint, False, error=str(e))
+                ApiService._circuit.record_failure()
+                raise
+            except requests.exceptions.ConnectionError as e:
+                ApiService._endpoint_health.record(endpoint, False, error=str(e))
+                ApiService._circuit.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            except Exception as e:
+                # Cualquier otro error (ChunkedEncodingError, TooManyRedirects, ...) también
+                # cuenta como fallo; así se libera la petición de prueba del circuito semiabierto
+                ApiService._endpoint_health.record(endpoint, False, error=str(e) or type(e).__name__)
+                ApiService._circuit.record_failure()
+                raise
+            
+            elapsed = time.monotonic() - started
+            if response.status_code in api_resilience.RETRYABLE_STATUS:
+                ApiService._endpoint_health.record(endpoint, False, elapsed, f"HTTP {response.status_code}")
+                ApiService._circuit.record_failure()
+                if attempt == attempts - 1:
+                    return response
+                time.sleep(backoff_delay(attempt))
+                continue
+            
+            if response.status_code >= 500:
+                # Error del servidor que no vale la pena repetir
+                ApiService._endpoint_health.record(endpoint, False, elapsed, f"HTTP {response.status_code}")
+                ApiService._circuit.record_failure()
+                return response
+            
+            ApiService._endpoint_health.record(endpoint, True, elapsed)
+            ApiService._circuit.record_success()
+            return response
+    
+    @staticmethod
+    def health() -> Dict:
+        """
+        Estado de la conexión con el backend.
+        
+        Returns:
+            Diccionario con 'circuit' ('closed', 'open' o 'half_open'),
+            'retry_after' (segundos para volver a intentar si está abierto) y
+            'endpoints' ({"GET links.json": {requests, failures, rejected,
+            consecutive_failures, last_latency_ms, last_error, ...}})
+        """
+        return {
+            "circuit": ApiService._circuit.state,
+            "retry_after": round(ApiService._circuit.retry_after(), 1),
+            "endpoints": ApiService._endpoint_health.snapshot()
+        }
+    
+    @staticmethod
+    def invalidate_cache(resource: Optional[str] = None):
+        """
+        Descarta las respuestas en caché para que la siguiente consulta descargue de nuevo.
+        
+        Args:
+            resource: "links" o "activities"; si es None, se descartan ambos
+        """
+        with ApiService._cache_lock:
+            for name in [resource] if resource else list(ApiService._cache_generation):
+                ApiService._cache.pop(name, None)
+                ApiService._cache_generation[name] = ApiService._cache_generation.get(name, 0) + 1
+        if resource in (None, "links"):
+            LINK_CATALOG.mark_stale()
+    
+    @staticmethod
+    def _cache_entry(resource: str):
+        """
+        Consulta la caché de un recurso antes de pedirlo a la API.
+        
+        Args:
+            resource: Nombre del recurso en caché ("links" o "activities")
+        
+        Returns:
+            Tupla (entrada o None, generación actual, encabezados condicionales
+            con los validadores de la entrada)
+        """
+        with ApiService._cache_lock:
+            entry = ApiService._cache.get(resource)
+            generation = ApiService._cache_generation.get(resource, 0)
+        
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return entry, generation, headers
     
     @staticmethod
-    def get_links() -> Optional[List[Dict]]:
+    def _cache_is_fresh(entry: Optional[Dict], force_refresh: bool) -> bool:
+        """Indica si una entrada puede usarse sin revalidar (dentro de CACHE_TTL)."""
+        return bool(entry) and not force_refresh and time.monotonic() - entry["validated_at"] < ApiService.CACHE_TTL
+    
+    @staticmethod
+    def _cache_store(resource: str, generation: int, entry: Optional[Dict], data: List[Dict], response_headers):
+        """
+        Guarda una lista recién validada con los validadores de la respuesta.
+        
+        No guarda nada si la caché se invalidó durante la petición (la
+        generación cambió), porque la respuesta puede ser anterior al cambio.
+        """
+        with ApiService._cache_lock:
+            if ApiService._cache_generation.get(resource, 0) == generation:
+                ApiService._cache[resource] = {
+                    "data": data,
+                    "etag": response_headers.get("ETag") or (entry["etag"] if entry else None),
+                    "last_modified": response_headers.get("Last-Modified") or (entry["last_modified"] if entry else None),
+                    "validated_at": time.monotonic()
+                }
+    
+    @staticmethod
+    def _cached_get(resource: str, url: str, transform: Callable[[object], List[Dict]],
+                    force_refresh: bool = False) -> List[Dict]:
+        """
+        Consulta una lista de la API usando la caché con revalidación condicional.
+        
+        Dentro de CACHE_TTL responde desde memoria sin usar la red. Después, envía
+        If-None-Match / If-Modified-Since con los validadores guardados; si el
+        backend responde 304, reutiliza los datos ya transformados.
+        
+        Args:
+            resource: Nombre del recurso en caché ("links" o "activities")
+            url: URL completa de la lista
+            transform: Función que convierte el JSON de la API al formato de la aplicación
+            force_refresh: Si es True, revalida aunque no haya vencido CACHE_TTL
+        
+        Returns:
+            Copia de la lista transformada
+        
+        Raises:
+            requests.exceptions.RequestException: Si la petición falla
+        """
+        entry, generation, headers = ApiService._cache_entry(resource)
+        if ApiService._cache_is_fresh(entry, force_refresh):
+            return [dict(item) for item in entry["data"]]
+        
+        response = ApiService._request("GET", url, headers=headers)
+        if response.status_code == 304 and entry:
+            data = entry["data"]
+        else:
+            response.raise_for_status()
+            data = transform(response.json())
+        
+        ApiService._cache_store(resource, generation, entry, data, response.headers)
+        return [dict(item) for item in data]
+    
+    @staticmethod
+    def get_links(force_refresh: bool = False) -> Optional[List[Dict]]:
         """
         Obtiene la lista de enlaces desde la API.
         
+        La respuesta se guarda en caché (ver `_cached_get`); las altas, cambios y
+        bajas de enlaces hechas con este servicio la invalidan.
+        
+        Args:
+            force_refresh: Si es True, revalida con el backend aunque la caché esté vigente
+        
         Returns:
             Lista de diccionarios con los datos de los enlaces.
             Retorna None si hay error en la petición.
         """
         try:
             url = f"{ApiService.BASE_URL}/links.json"
-            response = requests.get(url, timeout=ApiService.TIMEOUT, verify=False)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Transformar los datos de la API al formato esperado por la aplicación
-            enlaces = []
-            if isinstance(data, list):
-                enlaces = data
-            elif isinstance(data, dict) and "links" in data:
-                enlaces = data["links"]
-            elif isinstance(data, dict) and "data" in data:
-                enlaces = data["data"]
-            
-            # Mapear los campos de la API a los campos esperados
-            enlaces_formateados = []
-            for enlace in enlaces:
-                enlace_formateado = {
-                    "nombre": enlace.get("nombre") or enlace.get("name") or "",
-                    "ddns": enlace.get("ddns") or enlace.get("host") or "",
-                    "puerto_http": enlace.get("puerto_http") or enlace.get("http_port") or "",
-                    "puerto_rtsp": enlace.get("puerto_rtsp") or enlace.get("rtsp_port") or "",
-                }
-                enlaces_formateados.append(enlace_formateado)
-            
-            return enlaces_formateados
+            return ApiService._cached_get("links", url, ApiService._format_links, force_refresh)
             
         except requests.exceptions.RequestException as e:
             print(f"Error al conectar con la API: {e}")
@@ -59,23 +310,83 @@ class ApiService:
             print(f"Error inesperado: {e}")
             return None
     
+    @staticmethod
+    def _format_links(data) -> List[Dict]:
+        """
+        Convierte la respuesta de `links.json` al formato de enlaces de la aplicación.
+        
+        Args:
+            data: JSON decodificado de la API
+        
+        Returns:
+            Lista de enlaces con las llaves id, nombre, ddns, puerto_http, puerto_rtsp, dvr_ip y dvr_mac
+        """
+        # Transformar los datos de la API al formato esperado por la aplicación
+        enlaces = []
+        if isinstance(data, list):
+            enlaces = data
+        elif isinstance(data, dict) and "links" in data:
+            enlaces = data["links"]
+        elif isinstance(data, dict) and "data" in data:
+            enlaces = data["data"]
+        
+        # Mapear los campos de la API a los campos esperados
+        enlaces_formateados = []
+        for enlace in enlaces:
+            enlace_formateado = {
+                "id": enlace.get("id"),
+                "nombre": enlace.get("nombre") or enlace.get("name") or "",
+                "ddns": enlace.get("ddns") or enlace.get("host") or "",
+                "puerto_http": enlace.get("puerto_http") or enlace.get("http_port") or "",
+                "puerto_rtsp": enlace.get("puerto_rtsp") or enlace.get("rtsp_port") or "",
+                "dvr_ip": enlace.get("dvr_ip") or "",
+                "dvr_mac": enlace.get("dvr_mac") or "",
+            }
+            enlaces_formateados.append(enlace_formateado)
+        
+        return enlaces_formateados
+    
     @staticmethod
     def get_link_by_name(nombre: str) -> Optional[Dict]:
         """
         Obtiene un enlace específico por su nombre.
         
+        Busca en el catálogo en memoria (LINK_CATALOG), que solo consulta la API
+        cuando está vencido o después de una alta, cambio o baja de enlaces.
+        
         Args:
             nombre: Nombre del enlace a buscar.
             
         Returns:
             Diccionario con los datos del enlace o None si no existe.
         """
-        enlaces = ApiService.get_links()
-        if enlaces:
-            for enlace in enlaces:
-                if enlace.get("nombre") == nombre:
-                    return enlace
-        return None
+        return LINK_CATALOG.by_name(nombre)
+    
+    @staticmethod
+    def _link_payload(enlace_data: Dict, nombre: Optional[str] = None) -> Dict:
+        """
+        Convierte los datos de un enlace al formato que espera la API.
+        
+        Args:
+            enlace_data: Diccionario con los datos del enlace (ver create_link)
+            nombre: Nombre a usar si enlace_data no trae uno
+        
+        Returns:
+            Diccionario con el cuerpo de la petición
+        """
+        payload = {
+            "nombre": enlace_data.get("nombre", nombre),
+            "ddns": enlace_data.get("ddns"),
+            "puerto_http": enlace_data.get("puerto_http", "80"),
+            "puerto_rtsp": enlace_data.get("puerto_rtsp", "554"),
+        }
+        
+        # Agregar campos opcionales si están presentes
+        for campo in ("wifi_nombre", "wifi_password", "modem_password", "dvr_ip", "dvr_mac"):
+            if enlace_data.get(campo):
+                payload[campo] = enlace_data.get(campo)
+        
+        return payload
     
     @staticmethod
     def create_link(enlace_data: Dict) -> Dict:
@@ -105,33 +416,16 @@ class ApiService:
         """
         try:
             # Preparar datos para la API
-            payload = {
-                "nombre": enlace_data.get("nombre"),
-                "ddns": enlace_data.get("ddns"),
-                "puerto_http": enlace_data.get("puerto_http", "80"),
-                "puerto_rtsp": enlace_data.get("puerto_rtsp", "554"),
-            }
-            
-            # Agregar campos opcionales si están presentes
-            if enlace_data.get("wifi_nombre"):
-                payload["wifi_nombre"] = enlace_data.get("wifi_nombre")
-            if enlace_data.get("wifi_password"):
-                payload["wifi_password"] = enlace_data.get("wifi_password")
-            if enlace_data.get("modem_password"):
-                payload["modem_password"] = enlace_data.get("modem_password")
-            if enlace_data.get("dvr_ip"):
-                payload["dvr_ip"] = enlace_data.get("dvr_ip")
-            if enlace_data.get("dvr_mac"):
-                payload["dvr_mac"] = enlace_data.get("dvr_mac")
+            payload = ApiService._link_payload(enlace_data)
             
             # Realizar petición POST
             url = f"{ApiService.BASE_URL}/links"
-            response = requests.post(
+            response = ApiService._request(
+                "POST",
                 url,
-                json=payload,
-                timeout=ApiService.TIMEOUT,
-                verify=False
+                json=payload
             )
+            ApiService.invalidate_cache("links")
             response.raise_for_status()
             
             result_data = response.json()
@@ -178,33 +472,16 @@ class ApiService:
         """
         try:
             # Preparar datos para la API
-            payload = {
-                "nombre": enlace_data.get("nombre", nombre),
-                "ddns": enlace_data.get("ddns"),
-                "puerto_http": enlace_data.get("puerto_http", "80"),
-                "puerto_rtsp": enlace_data.get("puerto_rtsp", "554"),
-            }
-            
-            # Agregar campos opcionales si están presentes
-            if enlace_data.get("wifi_nombre"):
-                payload["wifi_nombre"] = enlace_data.get("wifi_nombre")
-            if enlace_data.get("wifi_password"):
-                payload["wifi_password"] = enlace_data.get("wifi_password")
-            if enlace_data.get("modem_password"):
-                payload["modem_password"] = enlace_data.get("modem_password")
-            if enlace_data.get("dvr_ip"):
-                payload["dvr_ip"] = enlace_data.get("dvr_ip")
-            if enlace_data.get("dvr_mac"):
-                payload["dvr_mac"] = enlace_data.get("dvr_mac")
+            payload = ApiService._link_payload(enlace_data, nombre)
             
             # Realizar petición PUT
             url = f"{ApiService.BASE_URL}/links/{nombre}"
-            response = requests.put(
+            response = ApiService._request(
+                "PUT",
                 url,
-                json=payload,
-                timeout=ApiService.TIMEOUT,
-                verify=False
+                json=payload
             )
+            ApiService.invalidate_cache("links")
             response.raise_for_status()
             
             result_data = response.json()
@@ -243,11 +520,8 @@ class ApiService:
         """
         try:
             url = f"{ApiService.BASE_URL}/links/{nombre}"
-            response = requests.delete(
-                url,
-                timeout=ApiService.TIMEOUT,
-                verify=False
-            )
+            response = ApiService._request("DELETE", url)
+            ApiService.invalidate_cache("links")
             response.raise_for_status()
             
             return {
@@ -274,45 +548,23 @@ class ApiService:
     # ========== MÉTODOS PARA ACTIVIDADES ==========
     
     @staticmethod
-    def get_activities() -> Optional[List[Dict]]:
+    def get_activities(force_refresh: bool = False) -> Optional[List[Dict]]:
         """
         Obtiene la lista de actividades desde la API.
         
+        La respuesta se guarda en caché (ver `_cached_get`); las altas, cambios y
+        bajas de actividades hechas con este servicio la invalidan.
+        
+        Args:
+            force_refresh: Si es True, revalida con el backend aunque la caché esté vigente
+        
         Returns:
             Lista de diccionarios con los datos de las actividades.
             Retorna None si hay error en la petición.
         """
         try:
             url = f"{ApiService.BASE_URL}/activities.json"
-            response = requests.get(url, timeout=ApiService.TIMEOUT, verify=False)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Transformar los datos de la API al formato esperado
-            actividades = []
-            if isinstance(data, list):
-                actividades = data
-            elif isinstance(data, dict) and "activities" in data:
-                actividades = data["activities"]
-            elif isinstance(data, dict) and "data" in data:
-                actividades = data["data"]
-            
-            # Mapear los campos de la API a los campos esperados
-            actividades_formateadas = []
-            for actividad in actividades:
-                actividad_formateada = {
-                    "id": actividad.get("id"),
-                    "titulo": actividad.get("title", ""),
-                    "descripcion": actividad.get("description", ""),
-                    "usuario": actividad.get("user", {}).get("name", ""),
-                    "fecha": actividad.get("date", ""),
-                    "activa": actividad.get("active", True),
-                    "_api_id": actividad.get("id")  # ID para referencia interna
-                }
-                actividades_formateadas.append(actividad_formateada)
-            
-            return actividades_formateadas
+            return ApiService._cached_get("activities", url, ApiService._format_activities, force_refresh)
             
         except requests.exceptions.RequestException as e:
             print(f"Error al conectar con la API de actividades: {e}")
@@ -324,6 +576,67 @@ class ApiService:
             print(f"Error inesperado al obtener actividades: {e}")
             return None
     
+    @staticmethod
+    def _format_activities(data) -> List[Dict]:
+        """
+        Convierte la respuesta de `activities.json` al formato de actividades de la aplicación.
+        
+        Args:
+            data: JSON decodificado de la API
+        
+        Returns:
+            Lista de actividades con las llaves id, titulo, descripcion, usuario, fecha y activa
+        """
+        # Transformar los datos de la API al formato esperado
+        actividades = []
+        if isinstance(data, list):
+            actividades = data
+        elif isinstance(data, dict) and "activities" in data:
+            actividades = data["activities"]
+        elif isinstance(data, dict) and "data" in data:
+            actividades = data["data"]
+        
+        # Mapear los campos de la API a los campos esperados
+        actividades_formateadas = []
+        for actividad in actividades:
+            actividad_formateada = {
+                "id": actividad.get("id"),
+                "titulo": actividad.get("title", ""),
+                "descripcion": actividad.get("description", ""),
+                "usuario": actividad.get("user", {}).get("name", ""),
+                "fecha": actividad.get("date", ""),
+                "activa": actividad.get("active", True),
+                "_api_id": actividad.get("id")  # ID para referencia interna
+            }
+            actividades_formateadas.append(actividad_formateada)
+        
+        return actividades_formateadas
+    
+    @staticmethod
+    def _activity_payload(actividad_data: Dict) -> Dict:
+        """
+        Convierte los datos de una actividad al formato que espera la API.
+        
+        Args:
+            actividad_data: Diccionario con los datos de la actividad (ver create_activity)
+        
+        Returns:
+            Diccionario con el cuerpo de la petición
+        """
+        payload = {
+            "title": actividad_data.get("titulo"),
+            "description": actividad_data.get("descripcion", ""),
+            "date": actividad_data.get("fecha", ""),
+        }
+        
+        # Agregar campos opcionales
+        if actividad_data.get("link_id"):
+            payload["link_id"] = actividad_data.get("link_id")
+        if actividad_data.get("user_id"):
+            payload["user_id"] = actividad_data.get("user_id")
+        
+        return payload
+    
     @staticmethod
     def create_activity(actividad_data: Dict) -> Dict:
         """
@@ -344,27 +657,17 @@ class ApiService:
         """
         try:
             # Preparar datos para la API
-            payload = {
-                "title": actividad_data.get("titulo"),
-                "description": actividad_data.get("descripcion", ""),
-                "date": actividad_data.get("fecha", ""),
-            }
-            
-            # Agregar campos opcionales
-            if actividad_data.get("link_id"):
-                payload["link_id"] = actividad_data.get("link_id")
-            if actividad_data.get("user_id"):
-                payload["user_id"] = actividad_data.get("user_id")
+            payload = ApiService._activity_payload(actividad_data)
             
             print(f"[DEBUG] Payload para crear actividad: {json.dumps(payload, indent=2)}")
             
             url = f"{ApiService.BASE_URL}/activities"
-            response = requests.post(
+            response = ApiService._request(
+                "POST",
                 url,
-                json=payload,
-                timeout=ApiService.TIMEOUT,
-                verify=False
+                json=payload
             )
+            ApiService.invalidate_cache("activities")
             
             print(f"[DEBUG] Status Code: {response.status_code}")
             response.raise_for_status()
@@ -418,12 +721,12 @@ class ApiService:
             print(f"[DEBUG] Actualizando actividad {activity_id}: {json.dumps(payload, indent=2)}")
             
             url = f"{ApiService.BASE_URL}/activities/{activity_id}"
-            response = requests.put(
+            response = ApiService._request(
+                "PUT",
                 url,
-                json=payload,
-                timeout=ApiService.TIMEOUT,
-                verify=False
+                json=payload
             )
+            ApiService.invalidate_cache("activities")
             
             print(f"[DEBUG] Status Code: {response.status_code}")
             response.raise_for_status()
@@ -467,11 +770,8 @@ class ApiService:
         """
         try:
             url = f"{ApiService.BASE_URL}/activities/{activity_id}"
-            response = requests.delete(
-                url,
-                timeout=ApiService.TIMEOUT,
-                verify=False
-            )
+            response = ApiService._request("DELETE", url)
+            ApiService.invalidate_cache("activities")
             
             print(f"[DEBUG] Status Code: {response.status_code}")
             response.raise_for_status()
@@ -499,4 +799,200 @@ class ApiService:
                 "message": f"Error: {str(e)}",
                 "data": None
             }
+    
+    @staticmethod
+    def create_links_batch(enlaces_data: List[Dict]) -> List[Dict]:
+        """
+        Crea varios enlaces en la API.
+        
+        Usa el endpoint masivo `POST /links/bulk` si el backend lo soporta; si no,
+        crea los enlaces con peticiones simultáneas (ver BATCH_WORKERS).
+        
+        Args:
+            enlaces_data: Lista de diccionarios con los datos de cada enlace (ver create_link)
+        
+        Returns:
+            Lista con el resultado de cada enlace, en el mismo orden que enlaces_data,
+            con la misma estructura que create_link
+        """
+        return ApiService._create_batch(
+            "links", enlaces_data, ApiService._link_payload, ApiService.create_link, "Enlace creado exitosamente"
+        )
+    
+    @staticmethod
+    def create_activities_batch(actividades_data: List[Dict]) -> List[Dict]:
+        """
+        Crea varias actividades en la API.
+        
+        Usa el endpoint masivo `POST /activities/bulk` si el backend lo soporta; si no,
+        crea las actividades con peticiones simultáneas (ver BATCH_WORKERS).
+        
+        Args:
+            actividades_data: Lista de diccionarios con los datos de cada actividad (ver create_activity)
+        
+        Returns:
+            Lista con el resultado de cada actividad, en el mismo orden que actividades_data,
+            con la misma estructura que create_activity
+        """
+        return ApiService._create_batch(
+            "activities", actividades_data, ApiService._activity_payload, ApiService.create_activity,
+            "Actividad creada exitosamente"
+        )
+    
+    @staticmethod
+    def _create_batch(resource: str, records: List[Dict], to_payload: Callable[[Dict], Dict],
+                      create_one: Callable[[Dict], Dict], success_message: str) -> List[Dict]:
+        """
+        Crea registros en lote: endpoint masivo si existe, peticiones simultáneas si no.
+        
+        Args:
+            resource: Recurso de la API ("links" o "activities")
+            records: Registros a crear
+            to_payload: Función que convierte un registro al cuerpo de la API
+            create_one: Función que crea un solo registro (respaldo sin endpoint masivo)
+            success_message: Mensaje de los registros creados por el endpoint masivo
+        
+        Returns:
+            Lista de resultados por registro, en el orden de records
+        """
+        records = list(records)
+        if not records:
+            return []
+        
+        results: List[Optional[Dict]] = [None] * len(records)
+        pending = list(range(len(records)))
+        
+        if ApiService._bulk_supported.get(resource) is not False:
+            pending = []
+            for start in range(0, len(records), ApiService.BULK_CHUNK_SIZE):
+                chunk = list(range(start, min(start + ApiService.BULK_CHUNK_SIZE, len(records))))
+                chunk_results = None
+                if ApiService._bulk_supported.get(resource) is not False:
+                    chunk_results = ApiService._post_bulk(
+                        resource, [to_payload(records[i]) for i in chunk], success_message
+                    )
+                if chunk_results is None:
+                    # Sin endpoint masivo: este bloque y los siguientes se crean uno por uno
+                    pending = list(range(start, len(records)))
+                    break
+                for i, result in zip(chunk, chunk_results):
+                    results[i] = result
+        
+        if pending:
+            print(f"[INFO] Creando {len(pending)} registros de '{resource}' con peticiones individuales")
+            with ThreadPoolExecutor(max_workers=ApiService.BATCH_WORKERS, thread_name_prefix=f"api-{resource}") as executor:
+                for i, result in zip(pending, executor.map(create_one, [records[i] for i in pending])):
+                    results[i] = result
+        
+        return results
+    
+    @staticmethod
+    def _post_bulk(resource: str, payloads: List[Dict], success_message: str) -> Optional[List[Dict]]:
+        """
+        Envía un bloque de registros al endpoint masivo `POST /{resource}/bulk`.
+        
+        Returns:
+            Lista de resultados por registro, o None si se deben crear uno por uno
+            (ver `_bulk_outcome`)
+        """
+        try:
+            url = f"{ApiService.BASE_URL}/{resource}/bulk"
+            response = ApiService._request(
+                "POST",
+                url,
+                json={resource: payloads}
+            )
+            return ApiService._bulk_outcome(resource, response.status_code, response.json, len(payloads), success_message)
+            
+        except requests.exceptions.RequestException as e:
+            print(f"Error de conexión en la creación masiva de '{resource}': {e}")
+            return [{"success": False, "message": f"Error de conexión: {str(e)}", "data": None} for _ in payloads]
+        except Exception as e:
+            print(f"Error inesperado en la creación masiva de '{resource}': {e}")
+            return [{"success": False, "message": f"Error: {str(e)}", "data": None} for _ in payloads]
+    
+    @staticmethod
+    def _bulk_outcome(resource: str, status_code: int, read_json: Callable[[], object], count: int,
+                      success_message: str) -> Optional[List[Dict]]:
+        """
+        Interpreta la respuesta del endpoint masivo y actualiza `_bulk_supported`.
+        
+        Cualquier respuesta no 2xx a la primera petición (endpoint aún no
+        confirmado), o un 404/405/501 en cualquier momento, indica que el
+        endpoint no se puede usar: se regresa None para crear uno por uno. Una
+        respuesta 2xx confirma el endpoint solo si su cuerpo trae un resultado
+        por registro; si no se reconoce, el bloque se reporta como fallido y el
+        endpoint deja de usarse.
+        
+        Args:
+            resource: Recurso de la API ("links" o "activities")
+            status_code: Código HTTP de la respuesta
+            read_json: Función que decodifica el cuerpo de la respuesta
+            count: Número de registros enviados
+            success_message: Mensaje de los registros creados
+        
+        Returns:
+            Lista de `count` resultados, o None si se deben crear uno por uno
+        """
+        if not 200 <= status_code < 300:
+            if status_code in (404, 405, 501) or ApiService._bulk_supported.get(resource) is None:
+                print(f"[INFO] El endpoint masivo de '{resource}' respondió HTTP {status_code}; "
+                      f"se usarán peticiones individuales")
+                ApiService._bulk_supported[resource] = False
+                return None
+            ApiService.invalidate_cache(resource)
+            print(f"Error en la creación masiva de '{resource}': HTTP {status_code}")
+            return [{"success": False, "message": f"Error HTTP {status_code}", "data": None} for _ in range(count)]
+        
+        ApiService.invalidate_cache(resource)
+        try:
+            results = ApiService._bulk_results(resource, read_json(), count, success_message)
+        except ValueError:
+            results = None
+        if results is None:
+            print(f"[ERROR] Respuesta no reconocida del endpoint masivo de '{resource}'; "
+                  f"se dejará de usar y el bloque se reporta como fallido")
+            ApiService._bulk_supported[resource] = False
+            return [
+                {"success": False, "message": "Error: respuesta no reconocida del endpoint masivo", "data": None}
+                for _ in range(count)
+            ]
+        ApiService._bulk_supported[resource] = True
+        return results
+    
+    @staticmethod
+    def _bulk_results(resource: str, data, count: int, success_message: str) -> Optional[List[Dict]]:
+        """
+        Convierte la respuesta del endpoint masivo en un resultado por registro.
+        
+        El backend responde con una lista de objetos alineada con los registros
+        enviados; un elemento con la llave "error" o "errors" indica que ese
+        registro falló.
+        
+        Args:
+            resource: Recurso de la API ("links" o "activities")
+            data: JSON decodificado de la respuesta
+            count: Número de registros enviados
+            success_message: Mensaje de los registros creados
+        
+        Returns:
+            Lista de `count` resultados con la estructura de create_link/create_activity,
+            o None si la respuesta no tiene esa forma
+        """
+        if isinstance(data, dict):
+            data = data.get(resource, data.get("data"))
+        if not isinstance(data, list) or len(data) != count or not all(isinstance(item, dict) for item in data):
+            return None
+        
+        results = []
+        for item in data:
+            error = item.get("error") or item.get("errors")
+            if error:
+                results.append({"success": False, "message": f"Error: {error}", "data": None})
+            else:
+                results.append({"success": True, "message": success_message, "data": item})
+        return results
+
 
+# Catálogo de enlaces con índices por nombre, DDNS, IP y MAC del DVR, cargado desde la API
+LINK_CATALOG = LinkCatalog(lambda force_refresh: ApiService.get_links(force_refresh=force_refresh))
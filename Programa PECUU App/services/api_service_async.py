@@ -0,0 +1,356 @@
+import asyncio
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+from services import api_resilience
+from services.api_resilience import BackendUnavailableError, backoff_delay, endpoint_key
+from services.api_service import ApiService, LINK_CATALOG
+
+
+class AsyncApiService:
+    """
+    Variante asíncrona de `ApiService` para usarse dentro de un ciclo de eventos.
+
+    Expone los mismos métodos con los mismos valores de retorno (listas de
+    diccionarios o {"success", "message", "data"}), pero cada uno es una
+    corrutina, de modo que muchas peticiones pueden esperarse a la vez en un
+    solo hilo. Comparte con `ApiService` la URL base, el tiempo de espera, la
+    caché de listas, el catálogo de enlaces, el circuito del backend y la
+    salud por endpoint.
+
+    Usa un cliente httpx con un pool de conexiones keep-alive; el cliente
+    pertenece al ciclo de eventos donde se crea la instancia. Requiere el
+    paquete opcional httpx.
+
+    Uso:
+        async with AsyncApiService() as api:
+            enlaces, actividades = await asyncio.gather(api.get_links(), api.get_activities())
+    """
+
+    def __init__(self, pool_size: Optional[int] = None):
+        """
+        Args:
+            pool_size: Conexiones simultáneas máximas hacia el backend
+                (por defecto, ApiService.POOL_SIZE).
+
+        Raises:
+            RuntimeError: Si el paquete httpx no está instalado.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError("El cliente asíncrono de la API requiere el paquete 'httpx' (pip install httpx)")
+        self._httpx = httpx
+        pool_size = pool_size or ApiService.POOL_SIZE
+        self._client = httpx.AsyncClient(
+            verify=False,
+            timeout=ApiService.TIMEOUT,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    async def __aenter__(self) -> "AsyncApiService":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Cierra las conexiones del pool."""
+        await self._client.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs):
+        """Equivalente asíncrono de `ApiService._request`: reintentos de las peticiones idempotentes y circuito compartido."""
+        httpx = self._httpx
+        method = method.upper()
+        endpoint = endpoint_key(method, url, ApiService.BASE_URL)
+        attempts = 1 + (api_resilience.MAX_RETRIES if method in api_resilience.IDEMPOTENT_METHODS else 0)
+        circuit, health = ApiService._circuit, ApiService._endpoint_health
+
+        for attempt in range(attempts):
+            if not circuit.allow_request():
+                health.record_rejected(endpoint)
+                raise BackendUnavailableError(f"Backend no disponible; se reintentará en {circuit.retry_after():.0f} s")
+
+            started = time.monotonic()
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TimeoutException as e:
+                health.record(endpoint, False, error=str(e) or "Tiempo de espera agotado")
+                circuit.record_failure()
+                raise
+            except httpx.TransportError as e:
+                health.record(endpoint, False, error=str(e))
+                circuit.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            except BaseException as e:
+                # Incluye CancelledError y los errores de httpx fuera del transporte: si no se
+                # registran, la petición de prueba del circuito semiabierto (compartido con
+                # ApiService) queda ocupada para siempre
+                health.record(endpoint, False, error=str(e) or type(e).__name__)
+                circuit.record_failure()
+                raise
+
+            elapsed = time.monotonic() - started
+            if response.status_code in api_resilience.RETRYABLE_STATUS:
+                health.record(endpoint, False, elapsed, f"HTTP {response.status_code}")
+                circuit.record_failure()
+                if attempt == attempts - 1:
+                    return response
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code >= 500:
+                health.record(endpoint, False, elapsed, f"HTTP {response.status_code}")
+                circuit.record_failure()
+                return response
+
+            health.record(endpoint, True, elapsed)
+            circuit.record_success()
+            return response
+
+    async def _cached_get(self, resource: str, url: str, transform: Callable[[object], List[Dict]],
+                          force_refresh: bool = False) -> List[Dict]:
+        """Equivalente asíncrono de `ApiService._cached_get`, sobre la misma caché."""
+        entry, generation, headers = ApiService._cache_entry(resource)
+        if ApiService._cache_is_fresh(entry, force_refresh):
+            return [dict(item) for item in entry["data"]]
+
+        response = await self._request("GET", url, headers=headers)
+        if response.status_code == 304 and entry:
+            data = entry["data"]
+        else:
+            response.raise_for_status()
+            data = transform(response.json())
+
+        ApiService._cache_store(resource, generation, entry, data, response.headers)
+        return [dict(item) for item in data]
+
+    async def _send(self, method: str, url: str, resource: str, payload: Optional[Dict],
+                    success_message: str, error_context: str) -> Dict:
+        """
+        Envía un alta, cambio o baja y regresa el resultado con la estructura de `ApiService`.
+
+        Args:
+            method: Método HTTP ("POST", "PUT" o "DELETE")
+            url: URL completa del recurso
+            resource: Recurso cuya caché se invalida ("links" o "activities")
+            payload: Cuerpo JSON de la petición (None en las bajas)
+            success_message: Mensaje del resultado exitoso
+            error_context: Descripción de la operación para los mensajes de error
+        """
+        httpx = self._httpx
+        try:
+            if payload is None:
+                response = await self._request(method, url)
+            else:
+                response = await self._request(method, url, json=payload)
+            ApiService.invalidate_cache(resource)
+            response.raise_for_status()
+
+            return {
+                "success": True,
+                "message": success_message,
+                "data": response.json() if method != "DELETE" else None
+            }
+
+        except httpx.HTTPStatusError as e:
+            error_msg = f"Error HTTP {e.response.status_code}"
+            print(f"Error al {error_context}: {error_msg}")
+            return {"success": False, "message": error_msg, "data": None}
+        except (httpx.HTTPError, BackendUnavailableError) as e:
+            print(f"Error al {error_context}: {e}")
+            return {"success": False, "message": f"Error de conexión: {str(e)}", "data": None}
+        except json.JSONDecodeError as e:
+            print(f"Error al decodificar respuesta JSON: {e}")
+            return {"success": False, "message": f"Error al procesar respuesta: {str(e)}", "data": None}
+        except Exception as e:
+            print(f"Error inesperado al {error_context}: {e}")
+            return {"success": False, "message": f"Error inesperado: {str(e)}", "data": None}
+
+    # ========== MÉTODOS PARA ENLACES ==========
+
+    async def get_links(self, force_refresh: bool = False) -> Optional[List[Dict]]:
+        """
+        Obtiene la lista de enlaces desde la API (ver `ApiService.get_links`).
+
+        Returns:
+            Lista de diccionarios con los datos de los enlaces, o None si hay error.
+        """
+        try:
+            url = f"{ApiService.BASE_URL}/links.json"
+            return await self._cached_get("links", url, ApiService._format_links, force_refresh)
+        except (self._httpx.HTTPError, BackendUnavailableError) as e:
+            print(f"Error al conectar con la API: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"Error al decodificar JSON: {e}")
+            return None
+        except Exception as e:
+            print(f"Error inesperado: {e}")
+            return None
+
+    async def get_link_by_name(self, nombre: str) -> Optional[Dict]:
+        """
+        Obtiene un enlace específico por su nombre desde el catálogo en memoria.
+
+        Si el catálogo está vencido, se recarga de forma asíncrona antes de buscar.
+
+        Returns:
+            Diccionario con los datos del enlace o None si no existe.
+        """
+        if LINK_CATALOG.is_stale():
+            enlaces = await self.get_links()
+            if enlaces is None:
+                return None
+            LINK_CATALOG.load(enlaces)
+        return LINK_CATALOG.by_name(nombre)
+
+    async def create_link(self, enlace_data: Dict) -> Dict:
+        """Crea un nuevo enlace en la API (ver `ApiService.create_link`)."""
+        return await self._send(
+            "POST", f"{ApiService.BASE_URL}/links", "links", ApiService._link_payload(enlace_data),
+            "Enlace creado exitosamente", "crear enlace en la API"
+        )
+
+    async def update_link(self, nombre: str, enlace_data: Dict) -> Dict:
+        """Actualiza un enlace existente en la API (ver `ApiService.update_link`)."""
+        return await self._send(
+            "PUT", f"{ApiService.BASE_URL}/links/{nombre}", "links", ApiService._link_payload(enlace_data, nombre),
+            "Enlace actualizado exitosamente", "actualizar enlace en la API"
+        )
+
+    async def delete_link(self, nombre: str) -> Dict:
+        """Elimina un enlace de la API (ver `ApiService.delete_link`)."""
+        return await self._send(
+            "DELETE", f"{ApiService.BASE_URL}/links/{nombre}", "links", None,
+            "Enlace eliminado exitosamente", "eliminar enlace en la API"
+        )
+
+    # ========== MÉTODOS PARA ACTIVIDADES ==========
+
+    async def get_activities(self, force_refresh: bool = False) -> Optional[List[Dict]]:
+        """
+        Obtiene la lista de actividades desde la API (ver `ApiService.get_activities`).
+
+        Returns:
+            Lista de diccionarios con los datos de las actividades, o None si hay error.
+        """
+        try:
+            url = f"{ApiService.BASE_URL}/activities.json"
+            return await self._cached_get("activities", url, ApiService._format_activities, force_refresh)
+        except (self._httpx.HTTPError, BackendUnavailableError) as e:
+            print(f"Error al conectar con la API de actividades: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            print(f"Error al decodificar JSON de actividades: {e}")
+            return None
+        except Exception as e:
+            print(f"Error inesperado al obtener actividades: {e}")
+            return None
+
+    async def create_activity(self, actividad_data: Dict) -> Dict:
+        """Crea una nueva actividad en la API (ver `ApiService.create_activity`)."""
+        return await self._send(
+            "POST", f"{ApiService.BASE_URL}/activities", "activities", ApiService._activity_payload(actividad_data),
+            "Actividad creada exitosamente", "crear actividad"
+        )
+
+    async def update_activity(self, activity_id: int, actividad_data: Dict) -> Dict:
+        """Actualiza una actividad existente en la API (ver `ApiService.update_activity`)."""
+        payload = {
+            "title": actividad_data.get("titulo"),
+            "description": actividad_data.get("descripcion", ""),
+            "date": actividad_data.get("fecha", ""),
+        }
+        return await self._send(
+            "PUT", f"{ApiService.BASE_URL}/activities/{activity_id}", "activities", payload,
+            "Actividad actualizada exitosamente", "actualizar actividad"
+        )
+
+    async def delete_activity(self, activity_id: int) -> Dict:
+        """Elimina una actividad de la API (ver `ApiService.delete_activity`)."""
+        return await self._send(
+            "DELETE", f"{ApiService.BASE_URL}/activities/{activity_id}", "activities", None,
+            "Actividad eliminada exitosamente", "eliminar actividad"
+        )
+
+    # ========== CREACIÓN EN LOTE ==========
+
+    async def create_links_batch(self, enlaces_data: List[Dict]) -> List[Dict]:
+        """Crea varios enlaces en la API (ver `ApiService.create_links_batch`)."""
+        return await self._create_batch(
+            "links", enlaces_data, ApiService._link_payload, self.create_link, "Enlace creado exitosamente"
+        )
+
+    async def create_activities_batch(self, actividades_data: List[Dict]) -> List[Dict]:
+        """Crea varias actividades en la API (ver `ApiService.create_activities_batch`)."""
+        return await self._create_batch(
+            "activities", actividades_data, ApiService._activity_payload, self.create_activity,
+            "Actividad creada exitosamente"
+        )
+
+    async def _create_batch(self, resource: str, records: List[Dict], to_payload: Callable[[Dict], Dict],
+                            create_one: Callable, success_message: str) -> List[Dict]:
+        """
+        Crea registros en lote: endpoint masivo si existe; si no, hasta
+        BATCH_WORKERS peticiones individuales a la vez en el ciclo de eventos.
+
+        Returns:
+            Lista de resultados por registro, en el orden de records
+        """
+        records = list(records)
+        if not records:
+            return []
+
+        results: List[Optional[Dict]] = [None] * len(records)
+        pending = list(range(len(records)))
+
+        if ApiService._bulk_supported.get(resource) is not False:
+            pending = []
+            for start in range(0, len(records), ApiService.BULK_CHUNK_SIZE):
+                chunk = list(range(start, min(start + ApiService.BULK_CHUNK_SIZE, len(records))))
+                chunk_results = None
+                if ApiService._bulk_supported.get(resource) is not False:
+                    chunk_results = await self._post_bulk(resource, [to_payload(records[i]) for i in chunk], success_message)
+                if chunk_results is None:
+                    # Sin endpoint masivo: este bloque y los siguientes se crean uno por uno
+                    pending = list(range(start, len(records)))
+                    break
+                for i, result in zip(chunk, chunk_results):
+                    results[i] = result
+
+        if pending:
+            print(f"[INFO] Creando {len(pending)} registros de '{resource}' con peticiones individuales")
+            semaphore = asyncio.Semaphore(ApiService.BATCH_WORKERS)
+
+            async def _create(record):
+                async with semaphore:
+                    return await create_one(record)
+
+            for i, result in zip(pending, await asyncio.gather(*(_create(records[i]) for i in pending))):
+                results[i] = result
+
+        return results
+
+    async def _post_bulk(self, resource: str, payloads: List[Dict], success_message: str) -> Optional[List[Dict]]:
+        """
+        Envía un bloque de registros al endpoint masivo `POST /{resource}/bulk`.
+
+        Returns:
+            Lista de resultados por registro, o None si se deben crear uno por uno
+            (ver `ApiService._bulk_outcome`)
+        """
+        try:
+            response = await self._request("POST", f"{ApiService.BASE_URL}/{resource}/bulk", json={resource: payloads})
+            return ApiService._bulk_outcome(resource, response.status_code, response.json, len(payloads), success_message)
+
+        except (self._httpx.HTTPError, BackendUnavailableError) as e:
+            print(f"Error de conexión en la creación masiva de '{resource}': {e}")
+            return [{"success": False, "message": f"Error de conexión: {str(e)}", "data": None} for _ in payloads]
+        except Exception as e:
+            print(f"Error inesperado en la creación masiva de '{resource}': {e}")
+            return [{"success": False, "message": f"Error: {str(e)}", "data": None} for _ in payloads]
@@ -0,0 +1,134 @@
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+
+DNS_TTL = 300  # segundos que se conserva una resolución exitosa
+DNS_NEGATIVE_TTL = 60  # segundos que se conserva un fallo de resolución
+DNS_TIMEOUT = 5  # segundos máximos de espera por DDNS
+RESOLVER_WORKERS = 32  # hilos dedicados a resolver DDNS en paralelo
+
+
+class DnsCache:
+    """
+    Caché de resoluciones DNS con TTL, compartida entre escaneos.
+
+    Guarda tanto las resoluciones exitosas (positivas) como los fallos
+    (negativas) para no volver a consultar al resolvedor por un DDNS que
+    acaba de fallar. Es segura para usarse desde varios hilos.
+    """
+
+    def __init__(self, ttl: float = DNS_TTL, negative_ttl: float = DNS_NEGATIVE_TTL):
+        """
+        Args:
+            ttl: Segundos de vida de una resolución exitosa.
+            negative_ttl: Segundos de vida de un fallo de resolución.
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[str, Tuple[float, Optional[str], Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """
+        Busca un DDNS en la caché.
+
+        Returns:
+            Tupla (ip, error) si hay una entrada vigente, None si no existe o expiró.
+            En una entrada negativa `ip` es None y `error` describe el fallo.
+        """
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                return None
+            expires_at, ip_addr, error = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[host]
+                return None
+            return ip_addr, error
+
+    def set(self, host: str, ip_addr: str):
+        """Guarda una resolución exitosa."""
+        with self._lock:
+            self._entries[host] = (time.monotonic() + self.ttl, ip_addr, None)
+
+    def set_error(self, host: str, error: str):
+        """Guarda un fallo de resolución (entrada negativa)."""
+        with self._lock:
+            self._entries[host] = (time.monotonic() + self.negative_ttl, None, error)
+
+    def clear(self):
+        """Elimina todas las entradas de la caché."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Caché y pool compartidos por todos los escaneos de la aplicación
+DNS_CACHE = DnsCache()
+_executor = ThreadPoolExecutor(max_workers=RESOLVER_WORKERS, thread_name_prefix="dns")
+
+
+def _lookup(host: str) -> Tuple[Optional[str], Optional[str]]:
+    """Resuelve un DDNS de forma bloqueante. Se ejecuta en el pool de resolución."""
+    try:
+        return socket.gethostbyname(host), None
+    except socket.gaierror:
+        return None, "Error al resolver DNS"
+    except (UnicodeError, OSError) as ex:
+        return None, str(ex)
+
+
+async def resolve(host: str, cache: DnsCache = DNS_CACHE,
+                  timeout: float = DNS_TIMEOUT) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resuelve un DDNS usando la caché y el pool de hilos compartido.
+
+    El tiempo de espera empieza a contar cuando un hilo del pool toma la
+    consulta, no mientras espera turno detrás de otras: en un lote grande un
+    DDNS sano no se marca como fallo solo por haber quedado al final de la
+    cola. Un DDNS que no responde dentro de `timeout` se registra como fallo
+    sin esperar a que el resolvedor del sistema termine.
+
+    Args:
+        host: DDNS a resolver.
+        cache: Caché donde consultar y guardar el resultado.
+        timeout: Segundos máximos de espera una vez iniciada la consulta.
+
+    Returns:
+        Tupla (ip, error). Si la resolución falla, `ip` es None.
+    """
+    cached = cache.get(host)
+    if cached is not None:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    started = loop.create_future()
+
+    def _mark_started():
+        if not started.done():
+            started.set_result(None)
+
+    def _run() -> Tuple[Optional[str], Optional[str]]:
+        loop.call_soon_threadsafe(_mark_started)
+        return _lookup(host)
+
+    lookup = loop.run_in_executor(_executor, _run)
+    try:
+        # Sin límite mientras la consulta espera un hilo libre
+        await asyncio.wait({started, lookup}, return_when=asyncio.FIRST_COMPLETED)
+        ip_addr, error = await asyncio.wait_for(lookup, timeout)
+    except asyncio.TimeoutError:
+        ip_addr, error = None, "Tiempo de espera agotado al resolver DNS"
+    finally:
+        started.cancel()
+        if not lookup.done():
+            lookup.cancel()
+
+    if ip_addr:
+        cache.set(host, ip_addr)
+    else:
+        cache.set_error(host, error)
+    return ip_addr, error
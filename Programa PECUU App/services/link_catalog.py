@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+CATALOG_REFRESH_INTERVAL = 300  # segundos tras los que una búsqueda recarga el catálogo desde la API
+
+
+def normalize_ddns(ddns: Optional[str]) -> str:
+    """Normaliza un DDNS para compararlo: sin espacios, sin punto final y en minúsculas."""
+    return (ddns or "").strip().rstrip(".").lower()
+
+
+def normalize_mac(mac: Optional[str]) -> str:
+    """Normaliza una MAC a minúsculas separadas por ':' ("AA-BB-CC-DD-EE-FF" -> "aa:bb:cc:dd:ee:ff")."""
+    digitos = "".join(c for c in (mac or "").lower() if c in "0123456789abcdef")
+    if len(digitos) != 12:
+        return (mac or "").strip().lower()
+    return ":".join(digitos[i:i + 2] for i in range(0, 12, 2))
+
+
+class LinkCatalog:
+    """
+    Catálogo en memoria de los enlaces con índices por nombre, DDNS, IP y MAC del DVR.
+
+    Las búsquedas son consultas a diccionarios y no usan la red mientras el
+    catálogo esté vigente. Si nunca se cargó, se marcó como vencido o pasaron
+    más de `refresh_interval` segundos, la siguiente búsqueda lo recarga con
+    `fetch`. Es seguro para usarse desde varios hilos.
+    """
+
+    def __init__(self, fetch: Callable[[bool], Optional[List[Dict]]],
+                 refresh_interval: float = CATALOG_REFRESH_INTERVAL):
+        """
+        Args:
+            fetch: Función fetch(force_refresh) que regresa la lista de enlaces
+                (estructura de `ApiService.get_links()`) o None si falla.
+            refresh_interval: Segundos de vigencia del catálogo.
+        """
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self._links: List[Dict] = []
+        self._by_name: Dict[str, Dict] = {}
+        self._by_ddns: Dict[str, Dict] = {}
+        self._by_dvr_ip: Dict[str, Dict] = {}
+        self._by_dvr_mac: Dict[str, Dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def load(self, links: List[Dict]):
+        """
+        Reemplaza el contenido del catálogo y reconstruye los índices.
+
+        Si dos enlaces comparten una llave, el índice conserva el primero.
+
+        Args:
+            links: Enlaces con la estructura de `ApiService.get_links()`.
+        """
+        by_name, by_ddns, by_dvr_ip, by_dvr_mac = {}, {}, {}, {}
+        for enlace in links:
+            for index, key in (
+                (by_name, (enlace.get("nombre") or "").strip()),
+                (by_ddns, normalize_ddns(enlace.get("ddns"))),
+                (by_dvr_ip, (enlace.get("dvr_ip") or "").strip()),
+                (by_dvr_mac, normalize_mac(enlace.get("dvr_mac"))),
+            ):
+                if key:
+                    index.setdefault(key, enlace)
+        with self._lock:
+            self._links = list(links)
+            self._by_name, self._by_ddns = by_name, by_ddns
+            self._by_dvr_ip, self._by_dvr_mac = by_dvr_ip, by_dvr_mac
+            self._loaded_at = time.monotonic()
+
+    def refresh(self, force_refresh: bool = False) -> bool:
+        """
+        Recarga el catálogo con `fetch`.
+
+        Args:
+            force_refresh: Se pasa a `fetch` para revalidar aunque su caché esté vigente.
+
+        Returns:
+            True si se recargó; False si `fetch` falló (se conservan los datos anteriores).
+        """
+        with self._refresh_lock:
+            links = self.fetch(force_refresh)
+            if links is None:
+                print("[ERROR] No se pudo recargar el catálogo de enlaces; se conservan los datos anteriores")
+                return False
+            self.load(links)
+            return True
+
+    def mark_stale(self):
+        """Marca el catálogo como vencido; la siguiente búsqueda lo recarga."""
+        with self._lock:
+            self._loaded_at = None
+
+    def is_stale(self) -> bool:
+        """Indica si el catálogo nunca se cargó, se marcó como vencido o ya pasó su vigencia."""
+        with self._lock:
+            loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at >= self.refresh_interval
+
+    def _ensure_fresh(self):
+        if self.is_stale():
+            with self._refresh_lock:
+                # Otro hilo pudo recargarlo mientras se esperaba el candado
+                if self.is_stale():
+                    links = self.fetch(False)
+                    if links is not None:
+                        self.load(links)
+
+    def _lookup(self, index: str, key: str) -> Optional[Dict]:
+        self._ensure_fresh()
+        with self._lock:
+            enlace = getattr(self, index).get(key)
+        # Copia para que el llamador pueda modificarla sin alterar el catálogo
+        return dict(enlace) if enlace is not None else None
+
+    def links(self) -> List[Dict]:
+        """Copia de todos los enlaces del catálogo, en el orden de la API."""
+        self._ensure_fresh()
+        with self._lock:
+            return [dict(enlace) for enlace in self._links]
+
+    def by_name(self, nombre: str) -> Optional[Dict]:
+        """Enlace con el nombre exacto `nombre`, o None."""
+        return self._lookup("_by_name", (nombre or "").strip())
+
+    def by_ddns(self, ddns: str) -> Optional[Dict]:
+        """Enlace con el DDNS `ddns` (sin distinguir mayúsculas), o None."""
+        return self._lookup("_by_ddns", normalize_ddns(ddns))
+
+    def by_dvr_ip(self, dvr_ip: str) -> Optional[Dict]:
+        """Enlace cuyo DVR tiene la IP `dvr_ip`, o None."""
+        return self._lookup("_by_dvr_ip", (dvr_ip or "").strip())
+
+    def by_dvr_mac(self, dvr_mac: str) -> Optional[Dict]:
+        """Enlace cuyo DVR tiene la MAC `dvr_mac` (en cualquier formato), o None."""
+        return self._lookup("_by_dvr_mac", normalize_mac(dvr_mac))
@@ -0,0 +1,195 @@
+import asyncio
+import ipaddress
+import time
+from typing import Dict, Optional
+
+
+# Límites por defecto de conexiones nuevas por segundo (None = sin límite).
+# La ráfaga del host coincide con la primera ola del escaneo adaptativo (PROBE_WAVE).
+# Con HOST_RATE = 100 los 16 puertos de PORT_LIST salen en ~0.12 s: espaciados
+# para no saturar un módem, sin que el límite domine el tiempo de cada host.
+HOST_RATE = 100  # por IP de destino
+HOST_BURST = 4
+NETWORK_RATE = None  # por red /24 o dominio del proveedor DDNS
+NETWORK_BURST = 16
+GLOBAL_RATE = None  # en todo el escaneo
+GLOBAL_BURST = 256
+
+NETWORK_PREFIX = 24  # longitud del prefijo que agrupa IPs en una misma red
+
+# Parámetros de RateLimiter que se transmiten a otros procesos o máquinas (ver RateLimiter.limits)
+LIMIT_FIELDS = ("host_rate", "host_burst", "network_rate", "network_burst",
+                "global_rate", "global_burst", "group_by", "network_prefix")
+
+# Segundos niveles que forman parte del sufijo del proveedor (ej. "midominio.com.mx")
+_SECOND_LEVEL_SUFFIXES = {"com", "net", "org", "gob", "edu"}
+
+
+def provider_domain(host: Optional[str]) -> Optional[str]:
+    """
+    Dominio del proveedor de un DDNS ("camara1.ddns.net" -> "ddns.net").
+
+    Args:
+        host: DDNS o IP.
+
+    Returns:
+        Dominio registrado del proveedor, o None si `host` es una IP o no tiene dominio.
+    """
+    if not host:
+        return None
+    try:
+        ipaddress.ip_address(host)
+        return None
+    except ValueError:
+        pass
+    labels = host.strip(".").lower().split(".")
+    if len(labels) < 2:
+        return None
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class TokenBucket:
+    """
+    Cubeta de fichas para un ciclo de eventos de asyncio.
+
+    Cada `acquire` consume una ficha; si no hay, reserva la siguiente y espera
+    el tiempo que falta para generarla, de modo que los que esperan se
+    atienden en orden de llegada.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Args:
+            rate: Fichas generadas por segundo.
+            burst: Fichas máximas acumuladas (conexiones permitidas de golpe).
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Consume una ficha y regresa los segundos que hay que esperar para usarla."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        """Espera hasta que haya una ficha disponible y la consume."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Límite de conexiones nuevas por segundo por host, por red y global.
+
+    Evita que equipos frágiles (módems celulares) descarten SYN al recibir
+    todas las conexiones del escaneo a la vez, lo que se reportaría como
+    puertos cerrados. Las redes se agrupan por prefijo /NETWORK_PREFIX o, con
+    `group_by="domain"`, por el dominio del proveedor DDNS.
+    """
+
+    def __init__(self, host_rate: Optional[float] = HOST_RATE, host_burst: int = HOST_BURST,
+                 network_rate: Optional[float] = NETWORK_RATE, network_burst: int = NETWORK_BURST,
+                 global_rate: Optional[float] = GLOBAL_RATE, global_burst: int = GLOBAL_BURST,
+                 group_by: str = "network", network_prefix: int = NETWORK_PREFIX):
+        """
+        Args:
+            host_rate: Conexiones por segundo por IP de destino (None = sin límite).
+            host_burst: Conexiones de golpe permitidas por IP.
+            network_rate: Conexiones por segundo por red o dominio (None = sin límite).
+            network_burst: Conexiones de golpe permitidas por red o dominio.
+            global_rate: Conexiones por segundo en todo el escaneo (None = sin límite).
+            global_burst: Conexiones de golpe permitidas en todo el escaneo.
+            group_by: "network" agrupa por prefijo IP; "domain" por dominio del
+                proveedor DDNS (si el destino no tiene dominio, se usa el prefijo).
+            network_prefix: Longitud del prefijo IPv4 que define una red.
+        """
+        if group_by not in ("network", "domain"):
+            raise ValueError(f"group_by debe ser 'network' o 'domain', no {group_by!r}")
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.network_rate = network_rate
+        self.network_burst = network_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.group_by = group_by
+        self.network_prefix = network_prefix
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._network_buckets: Dict[str, TokenBucket] = {}
+        self._global_bucket = TokenBucket(global_rate, global_burst) if global_rate else None
+
+    def limits(self) -> Dict:
+        """Parámetros del límite, para recrearlo en otro proceso o máquina con `from_limits`."""
+        return {field: getattr(self, field) for field in LIMIT_FIELDS}
+
+    @classmethod
+    def from_limits(cls, limits: Dict) -> "RateLimiter":
+        """
+        Crea un límite a partir de los parámetros de `limits()`; ignora las llaves desconocidas.
+
+        Raises:
+            ValueError: Si `group_by` no es válido.
+        """
+        return cls(**{key: value for key, value in limits.items() if key in LIMIT_FIELDS})
+
+    def share(self, parts: int) -> "RateLimiter":
+        """
+        Parte del límite para uno de `parts` procesos o trabajadores que escanean a la vez.
+
+        Los límites por red y global se dividen entre `parts` para que la suma
+        de todos no supere el total. El límite por IP no se divide porque cada
+        DDNS se escanea en un solo proceso.
+
+        Args:
+            parts: Número de procesos o trabajadores que comparten el límite.
+
+        Returns:
+            Un RateLimiter nuevo, sin el estado de las cubetas de este.
+        """
+        parts = max(1, parts)
+        limits = self.limits()
+        for rate, burst in (("network_rate", "network_burst"), ("global_rate", "global_burst")):
+            if limits[rate]:
+                limits[rate] = limits[rate] / parts
+                limits[burst] = max(1, limits[burst] // parts)
+        return RateLimiter(**limits)
+
+    def network_key(self, ip_addr: str, domain: Optional[str] = None) -> str:
+        """Clave de la red de un destino: dominio del proveedor o prefijo IP."""
+        if self.group_by == "domain":
+            proveedor = provider_domain(domain)
+            if proveedor:
+                return proveedor
+        try:
+            return str(ipaddress.ip_network(f"{ip_addr}/{self.network_prefix}", strict=False))
+        except ValueError:
+            return ip_addr
+
+    async def acquire(self, ip_addr: str, domain: Optional[str] = None):
+        """
+        Espera hasta que se permita una conexión nueva hacia `ip_addr`.
+
+        Args:
+            ip_addr: IP de destino.
+            domain: DDNS que resolvió a `ip_addr`, para agrupar por proveedor.
+        """
+        if self.host_rate:
+            bucket = self._host_buckets.get(ip_addr)
+            if bucket is None:
+                bucket = self._host_buckets[ip_addr] = TokenBucket(self.host_rate, self.host_burst)
+            await bucket.acquire()
+        if self.network_rate:
+            key = self.network_key(ip_addr, domain)
+            bucket = self._network_buckets.get(key)
+            if bucket is None:
+                bucket = self._network_buckets[key] = TokenBucket(self.network_rate, self.network_burst)
+            await bucket.acquire()
+        if self._global_bucket is not None:
+            await self._global_bucket.acquire()
@@ -0,0 +1,152 @@
+"""
+Escaneo General sin interfaz gráfica.
+
+Ejecuta el mismo escaneo que el botón ESCANEAR contra la API de enlaces y
+escribe una línea JSON por DDNS en la salida estándar conforme termina cada
+uno. Los mensajes de registro se envían a la salida de error.
+
+Uso (desde la carpeta de la aplicación):
+
+    python -m services.scan_cli [--delta] [--no-activities] [--no-history] [--fingerprint] [--processes N] [--export csv jsonl]
+
+Códigos de salida:
+    0  todos los DDNS escaneados tienen al menos un puerto abierto
+    1  al menos un DDNS está caído (sin puertos abiertos, inalcanzable o con error)
+    2  no se pudo obtener la lista de enlaces o no hay DDNS para escanear
+    130  escaneo interrumpido
+"""
+import argparse
+import contextlib
+import json
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from services import rate_limit
+from services.api_service import ApiService
+from services.scan_export import EXPORT_FORMATS, export_scan_results
+from services.scan_engine import CONNECT_TIMEOUT, MAX_CONCURRENCY, PORT_LIST, scan_urls_sync
+from services.scan_history import SCAN_HISTORY, is_down, plan_delta_scan
+from services.scan_pipeline import process_scan_results
+from services.scan_sharding import scan_urls_sharded_sync
+
+
+EXIT_OK = 0
+EXIT_LINKS_DOWN = 1
+EXIT_NO_LINKS = 2
+EXIT_INTERRUPTED = 130
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m services.scan_cli",
+        description="Escaneo General de DDNS sin interfaz gráfica (salida en JSON Lines)."
+    )
+    parser.add_argument("--ddns", nargs="+", metavar="DDNS",
+                        help="DDNS a escanear; si se omite, se obtienen de la API de enlaces")
+    parser.add_argument("--delta", action="store_true",
+                        help="escanear solo DDNS fallidos, nuevos o con resultado vencido")
+    parser.add_argument("--no-activities", action="store_true",
+                        help="no crear actividades para los enlaces sin puertos abiertos")
+    parser.add_argument("--no-history", action="store_true",
+                        help="no guardar la ejecución en el historial ni crear actividades")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="identificar el servicio HTTP/RTSP de los puertos abiertos")
+    parser.add_argument("--export", nargs="+", choices=sorted(EXPORT_FORMATS), default=[], metavar="FORMATO",
+                        help=f"formatos de reporte a generar: {', '.join(sorted(EXPORT_FORMATS))}")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"conexiones simultáneas máximas por proceso (por defecto {MAX_CONCURRENCY})")
+    parser.add_argument("--host-rate", type=float, default=rate_limit.HOST_RATE,
+                        help=f"conexiones nuevas por segundo por IP; 0 sin límite (por defecto {rate_limit.HOST_RATE})")
+    parser.add_argument("--network-rate", type=float, default=rate_limit.NETWORK_RATE,
+                        help="conexiones nuevas por segundo por red /24 o dominio del proveedor; 0 sin límite (por defecto sin límite)")
+    parser.add_argument("--global-rate", type=float, default=rate_limit.GLOBAL_RATE,
+                        help="conexiones nuevas por segundo en todo el escaneo; 0 sin límite (por defecto sin límite)")
+    parser.add_argument("--group-by", choices=["network", "domain"], default="network",
+                        help="agrupar el límite por red /24 o por dominio del proveedor DDNS")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="procesos entre los que se reparte el escaneo; 0 usa uno por núcleo (por defecto 1). "
+                             "Los límites por red y global se dividen entre los procesos; el límite por IP "
+                             "se aplica en cada uno")
+    parser.add_argument("--timeout", type=float, default=CONNECT_TIMEOUT,
+                        help=f"tiempo máximo de espera por puerto en segundos (por defecto {CONNECT_TIMEOUT})")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada del escaneo sin interfaz.
+
+    Args:
+        argv: Argumentos de línea de comandos (por defecto, sys.argv[1:]).
+
+    Returns:
+        Código de salida del proceso.
+    """
+    args = _parse_args(argv)
+    out = sys.stdout
+
+    def emit(item):
+        out.write(json.dumps(item, ensure_ascii=False) + "\n")
+        out.flush()
+
+    # Todo lo que el resto del código imprime con print() va a stderr,
+    # para que stdout contenga únicamente JSON Lines
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.ddns:
+            urls = list(args.ddns)
+        else:
+            print("[INFO] Obteniendo enlaces desde la API...")
+            enlaces = ApiService.get_links()
+            if not enlaces:
+                print("[ERROR] No se pudieron obtener los enlaces desde la API")
+                return EXIT_NO_LINKS
+            urls = [enlace.get("ddns") for enlace in enlaces if enlace.get("ddns")]
+
+        if not urls:
+            print("[ERROR] No hay DDNS para escanear")
+            return EXIT_NO_LINKS
+
+        scan_targets = urls
+        if args.delta:
+            try:
+                scan_targets, reused = plan_delta_scan(urls, SCAN_HISTORY)
+                print(f"[INFO] Escaneo delta: {len(scan_targets)} DDNS por escanear, {len(reused)} resultados reutilizados")
+                for item in reused.values():
+                    emit(item)
+            except Exception as ex:
+                print(f"[ERROR] No se pudo consultar el historial, se escaneará todo: {str(ex)}")
+                scan_targets = urls
+
+        limiter = rate_limit.RateLimiter(
+            host_rate=args.host_rate or None, network_rate=args.network_rate or None,
+            global_rate=args.global_rate or None, group_by=args.group_by
+        )
+
+        print(f"[INFO] Escaneando {len(scan_targets)} DDNS...")
+        started_at = datetime.now()
+        try:
+            if args.processes == 1:
+                results = scan_urls_sync(scan_targets, PORT_LIST, args.concurrency, args.timeout, on_result=emit,
+                                         fingerprint=args.fingerprint, rate_limiter=limiter)
+            else:
+                results = scan_urls_sharded_sync(scan_targets, PORT_LIST, args.processes or None, args.concurrency,
+                                                 args.timeout, on_result=emit, fingerprint=args.fingerprint,
+                                                 rate_limiter=limiter)
+        except KeyboardInterrupt:
+            print("[INFO] Escaneo interrumpido")
+            return EXIT_INTERRUPTED
+
+        if not args.no_history:
+            process_scan_results(results, started_at, create_activities=not args.no_activities)
+
+        for fmt in args.export:
+            export_scan_results(results, fmt)
+
+        caidos = sum(1 for item in results if is_down(item))
+        print(f"[INFO] Escaneo completado: {len(results)} DDNS escaneados, {caidos} caídos")
+        return EXIT_LINKS_DOWN if caidos else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
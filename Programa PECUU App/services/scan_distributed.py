@@ -0,0 +1,569 @@
+"""
+Escaneo General distribuido entre varias máquinas.
+
+Un coordinador obtiene los enlaces, los divide en unidades de trabajo y las
+reparte entre trabajadores conectados por TCP. Cada trabajador escanea sus
+unidades desde su propia red (por ejemplo, una caja de escaneo en cada
+subestación) y devuelve los resultados. Si un trabajador se desconecta o deja
+de responder, su unidad se reasigna a otro. Al final el coordinador guarda
+todos los resultados como una sola ejecución.
+
+Protocolo: un objeto JSON por línea en ambos sentidos.
+
+    trabajador -> coordinador  {"type": "hello", "worker": nombre, "token": ...}
+    coordinador -> trabajador  {"type": "unit", "unit_id": n, "urls": [...], "ports": [...],
+                                "timeout": s, "fingerprint": bool, "rate_limits": {...}}
+    trabajador -> coordinador  {"type": "heartbeat", "unit_id": n}   (mientras escanea)
+    trabajador -> coordinador  {"type": "result", "unit_id": n, "results": [...]}
+    coordinador -> trabajador  {"type": "done"}
+
+Uso (desde la carpeta de la aplicación):
+
+    python -m services.scan_distributed coordinator --listen 0.0.0.0:7070 --token SECRETO
+    python -m services.scan_distributed worker --connect 10.0.0.5:7070 --token SECRETO
+
+Los límites de conexiones nuevas por segundo se definen en el coordinador:
+cada unidad lleva la parte que le toca al trabajador (los límites por red y
+global se dividen entre los trabajadores conectados, ver RateLimiter.share).
+
+Por defecto el coordinador escucha solo en 127.0.0.1. Para escuchar en otra
+dirección es obligatorio un token, porque las unidades contienen el
+inventario de DDNS y los resultados se guardan en el historial.
+
+Códigos de salida: los de `services.scan_cli`, y además 3 si un trabajador
+con --once no pudo conectar con el coordinador.
+"""
+import argparse
+import asyncio
+import contextlib
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import sys
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from services import rate_limit
+from services.rate_limit import RateLimiter
+from services.scan_engine import CONNECT_TIMEOUT, MAX_CONCURRENCY, PORT_LIST, scan_urls
+
+
+DEFAULT_PORT = 7070
+UNIT_SIZE = 100  # DDNS por unidad de trabajo
+HEARTBEAT_INTERVAL = 5  # segundos entre latidos de un trabajador ocupado
+WORKER_TIMEOUT = 30  # segundos sin mensajes tras los cuales un trabajador se da por muerto
+MAX_UNIT_ATTEMPTS = 3  # asignaciones de una unidad antes de reportarla con error
+RECONNECT_DELAY = 5  # segundos entre intentos de conexión de un trabajador
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024  # tamaño máximo de una línea del protocolo
+
+TOKEN_ENV_VAR = "SGCC_SCAN_TOKEN"
+
+DEFAULT_LISTEN_HOST = "127.0.0.1"
+RESULT_STATUSES = ("success", "unreachable", "dns_error", "error")  # estados válidos de un resultado
+
+EXIT_COORDINATOR_UNREACHABLE = 3  # el trabajador no pudo conectar con el coordinador
+
+
+async def _send(writer: asyncio.StreamWriter, message: Dict):
+    writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def _receive(reader: asyncio.StreamReader, timeout: Optional[float] = None) -> Optional[Dict]:
+    """Lee un mensaje; regresa None si la conexión se cerró."""
+    line = await asyncio.wait_for(reader.readline(), timeout)
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def _restore_result(item: Dict) -> Dict:
+    """Restaura los números de puerto que JSON convierte en texto al usarse como llaves."""
+    if isinstance(item.get('port_latency_ms'), dict):
+        item['port_latency_ms'] = {int(port): ms for port, ms in item['port_latency_ms'].items()}
+    return item
+
+
+def _is_loopback(host: str) -> bool:
+    """Indica si una dirección de escucha solo acepta conexiones de la propia máquina."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _validate_result(item, url: str):
+    """
+    Verifica la estructura de un resultado enviado por un trabajador.
+
+    Raises:
+        ValueError: Si el resultado no corresponde a `url` o no tiene la estructura de `scan_urls`.
+    """
+    if not isinstance(item, dict) or item.get('url') != url:
+        raise ValueError("resultados incompletos")
+    if item.get('status') not in RESULT_STATUSES:
+        raise ValueError(f"estado de resultado inválido: {item.get('status')!r}")
+    for key in ('open_ports', 'closed_ports', 'refused_ports', 'filtered_ports'):
+        ports = item.get(key, [])
+        if not isinstance(ports, list) or not all(isinstance(port, int) and not isinstance(port, bool) for port in ports):
+            raise ValueError(f"lista de puertos inválida en '{key}'")
+    if not isinstance(item.get('ip', '-'), (str, type(None))):
+        raise ValueError("IP inválida")
+
+
+def _unit_error_results(urls: List[str], error: str) -> List[Dict]:
+    return [
+        {'url': url, 'ip': '-', 'open_ports': [], 'closed_ports': [], 'status': 'error', 'error': error}
+        for url in urls
+    ]
+
+
+class ScanCoordinator:
+    """
+    Reparte un Escaneo General entre trabajadores conectados por TCP.
+
+    Las unidades se entregan a los trabajadores conforme se desocupan. Una
+    unidad cuyo trabajador se desconecta o pasa WORKER_TIMEOUT segundos sin
+    enviar mensajes vuelve a la cola; tras `max_attempts` asignaciones fallidas
+    sus DDNS se reportan con estado 'error'.
+    """
+
+    def __init__(self, host: str = DEFAULT_LISTEN_HOST, port: int = DEFAULT_PORT, token: Optional[str] = None,
+                 unit_size: int = UNIT_SIZE, ports: Optional[List[int]] = None,
+                 timeout: float = CONNECT_TIMEOUT, fingerprint: bool = False,
+                 worker_timeout: float = WORKER_TIMEOUT, max_attempts: int = MAX_UNIT_ATTEMPTS,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            host: Dirección donde escuchar. Una dirección que no sea de loopback
+                requiere `token`.
+            port: Puerto donde escuchar (0 elige uno libre, ver `address`).
+            token: Token compartido que deben presentar los trabajadores; None no
+                lo exige (solo se permite al escuchar en loopback).
+            unit_size: DDNS por unidad de trabajo.
+            ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+            timeout: Tiempo máximo de espera por puerto en segundos.
+            fingerprint: Si es True, los trabajadores identifican los servicios HTTP/RTSP.
+            worker_timeout: Segundos sin mensajes tras los cuales un trabajador se da por muerto.
+            max_attempts: Asignaciones de una unidad antes de reportarla con error.
+            rate_limiter: Límite de conexiones nuevas por segundo de todo el
+                escaneo. Cada unidad lleva `rate_limiter.share(n)`, con n los
+                trabajadores conectados al asignarla. Si es None, se usan los
+                límites por defecto.
+        """
+        self.host = host
+        self.port = port
+        self.token = token
+        self.unit_size = max(1, unit_size)
+        self.ports = ports if ports is not None else PORT_LIST
+        self.timeout = timeout
+        self.fingerprint = fingerprint
+        self.worker_timeout = worker_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+
+        self.units_by_worker: Dict[str, int] = {}  # unidades completadas por cada trabajador
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._units: Dict[int, Tuple[int, List[str]]] = {}
+        self._pending: Deque[int] = deque()
+        self._attempts: Dict[int, int] = {}
+        self._completed: Dict[int, List[Dict]] = {}
+        self._changed: Optional[asyncio.Condition] = None
+        self._on_result: Optional[Callable[[Dict], None]] = None
+        self._workers = 0  # trabajadores autenticados conectados
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """Dirección (host, puerto) donde escucha el coordinador, una vez iniciado."""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self):
+        """
+        Empieza a aceptar trabajadores. `run` lo llama si no se llamó antes.
+
+        Raises:
+            ValueError: Si se escucha fuera de loopback sin token.
+        """
+        if self._server is None:
+            if not self.token and not _is_loopback(self.host):
+                raise ValueError(f"Se requiere un token para escuchar en {self.host}; "
+                                 f"use --token o la variable de entorno {TOKEN_ENV_VAR}")
+            self._changed = asyncio.Condition()
+            self._server = await asyncio.start_server(
+                self._handle_worker, self.host, self.port, limit=MAX_MESSAGE_BYTES
+            )
+            host, port = self.address
+            print(f"[INFO] Coordinador escuchando en {host}:{port}")
+
+    async def run(self, urls: List[str], on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Reparte el escaneo de `urls` y espera a que todas las unidades terminen.
+
+        Args:
+            urls: DDNS a escanear.
+            on_result: Callback opcional invocado con cada resultado cuando
+                termina la unidad que lo contiene.
+
+        Returns:
+            Lista de diccionarios de resultado en el mismo orden que `urls`,
+            con la misma estructura que `scan_urls`.
+        """
+        urls = list(urls)
+        self._on_result = on_result
+        self._units = {
+            unit_id: (start, urls[start:start + self.unit_size])
+            for unit_id, start in enumerate(range(0, len(urls), self.unit_size))
+        }
+        self._pending = deque(self._units)
+        self._attempts = {unit_id: 0 for unit_id in self._units}
+        self._completed = {}
+
+        await self.start()
+        print(f"[INFO] Escaneo distribuido: {len(urls)} DDNS en {len(self._units)} unidades")
+        try:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self._completed) == len(self._units))
+        finally:
+            await self.stop()
+
+        results: List[Dict] = [None] * len(urls)
+        for unit_id, (start, _) in self._units.items():
+            unit_results = self._completed[unit_id]
+            results[start:start + len(unit_results)] = unit_results
+        return results
+
+    async def stop(self):
+        """Deja de aceptar trabajadores y avisa a los conectados que no hay más trabajo."""
+        if self._server is not None:
+            server, self._server = self._server, None
+            server.close()
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def _next_unit(self) -> Optional[int]:
+        """Espera una unidad pendiente; regresa None cuando ya no queda trabajo."""
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self._pending or len(self._completed) == len(self._units) or self._server is None
+            )
+            if self._pending:
+                return self._pending.popleft()
+            return None
+
+    async def _complete(self, unit_id: int, unit_results: List[Dict], worker: Optional[str]):
+        async with self._changed:
+            if unit_id in self._completed:
+                return
+            self._completed[unit_id] = unit_results
+            if worker:
+                self.units_by_worker[worker] = self.units_by_worker.get(worker, 0) + 1
+            self._changed.notify_all()
+        if self._on_result:
+            for result in unit_results:
+                self._on_result(result)
+
+    async def _requeue(self, unit_id: int, worker: str, reason: str):
+        self._attempts[unit_id] += 1
+        if self._attempts[unit_id] >= self.max_attempts:
+            print(f"[ERROR] La unidad {unit_id} falló {self._attempts[unit_id]} veces; se reporta con error")
+            _, urls = self._units[unit_id]
+            await self._complete(unit_id, _unit_error_results(urls, f"Escaneo distribuido fallido: {reason}"), None)
+            return
+        print(f"[INFO] Trabajador {worker}: {reason}; la unidad {unit_id} se reasigna")
+        async with self._changed:
+            self._pending.appendleft(unit_id)
+            self._changed.notify_all()
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        worker = f"{peer[0]}:{peer[1]}" if peer else "desconocido"
+        authenticated = False
+        try:
+            hello = await _receive(reader, self.worker_timeout)
+            if not hello or hello.get("type") != "hello":
+                return
+            if self.token is not None and not hmac.compare_digest(str(hello.get("token") or ""), self.token):
+                print(f"[ERROR] Trabajador {worker} rechazado: token inválido")
+                return
+            worker = f"{hello.get('worker') or worker} ({worker})"
+            print(f"[INFO] Trabajador conectado: {worker}")
+            authenticated = True
+            self._workers += 1
+
+            while True:
+                unit_id = await self._next_unit()
+                if unit_id is None:
+                    await _send(writer, {"type": "done"})
+                    return
+
+                _, urls = self._units[unit_id]
+                try:
+                    await _send(writer, {
+                        "type": "unit",
+                        "unit_id": unit_id,
+                        "urls": urls,
+                        "ports": self.ports,
+                        "timeout": self.timeout,
+                        "fingerprint": self.fingerprint,
+                        "rate_limits": self.rate_limiter.share(self._workers).limits()
+                    })
+                    while True:
+                        message = await _receive(reader, self.worker_timeout)
+                        if message is None:
+                            raise ConnectionResetError("conexión cerrada")
+                        if message.get("type") == "result" and message.get("unit_id") == unit_id:
+                            unit_results = message.get("results")
+                            if not isinstance(unit_results, list) or len(unit_results) != len(urls):
+                                raise ValueError("resultados incompletos")
+                            for item, url in zip(unit_results, urls):
+                                _validate_result(item, url)
+                            unit_results = [_restore_result(item) for item in unit_results]
+                            await self._complete(unit_id, unit_results, worker)
+                            break
+                except asyncio.TimeoutError:
+                    await self._requeue(unit_id, worker, f"sin respuesta en {self.worker_timeout} s")
+                    return
+                except (OSError, asyncio.IncompleteReadError, ValueError) as ex:
+                    await self._requeue(unit_id, worker, str(ex) or type(ex).__name__)
+                    return
+                except asyncio.CancelledError:
+                    await self._requeue(unit_id, worker, "coordinador detenido")
+                    raise
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            if authenticated:
+                self._workers -= 1
+            writer.close()
+
+
+def run_coordinator_sync(urls: List[str], on_result: Optional[Callable[[Dict], None]] = None,
+                         **coordinator_args) -> List[Dict]:
+    """
+    Versión síncrona de `ScanCoordinator.run`.
+
+    Args:
+        urls: DDNS a escanear.
+        on_result: Callback opcional invocado con cada resultado.
+        **coordinator_args: Argumentos de `ScanCoordinator`.
+
+    Returns:
+        Lista de diccionarios de resultado en el mismo orden que `urls`.
+    """
+    return asyncio.run(ScanCoordinator(**coordinator_args).run(urls, on_result))
+
+
+async def _scan_unit(writer: asyncio.StreamWriter, unit: Dict, concurrency: int) -> List[Dict]:
+    """Escanea una unidad enviando latidos al coordinador mientras trabaja."""
+    try:
+        limiter = RateLimiter.from_limits(unit.get("rate_limits") or {})
+    except (TypeError, ValueError) as ex:
+        print(f"[ERROR] Límites de conexión inválidos en la unidad ({str(ex)}); se usan los de por defecto")
+        limiter = RateLimiter()
+    scan = asyncio.ensure_future(scan_urls(
+        unit["urls"], unit.get("ports"), concurrency, unit.get("timeout", CONNECT_TIMEOUT),
+        fingerprint=unit.get("fingerprint", False), rate_limiter=limiter
+    ))
+    try:
+        while not scan.done():
+            await asyncio.wait({scan}, timeout=HEARTBEAT_INTERVAL)
+            if not scan.done():
+                await _send(writer, {"type": "heartbeat", "unit_id": unit["unit_id"]})
+        return scan.result()
+    finally:
+        scan.cancel()
+
+
+async def run_worker(host: str, port: int = DEFAULT_PORT, name: Optional[str] = None,
+                     token: Optional[str] = None, concurrency: int = MAX_CONCURRENCY,
+                     once: bool = False, reconnect_delay: float = RECONNECT_DELAY) -> int:
+    """
+    Conecta con un coordinador y escanea las unidades que reciba.
+
+    Args:
+        host: Dirección del coordinador.
+        port: Puerto del coordinador.
+        name: Nombre del trabajador en los registros (por defecto, el de la máquina).
+        token: Token compartido del coordinador.
+        concurrency: Conexiones simultáneas máximas de este trabajador.
+        once: Si es True, termina al acabar una ejecución o si no puede conectar.
+            Si es False, vuelve a conectarse para las siguientes ejecuciones.
+        reconnect_delay: Segundos entre intentos de conexión.
+
+    Returns:
+        Número de unidades escaneadas.
+    """
+    name = name or socket.gethostname()
+    scanned = 0
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_MESSAGE_BYTES)
+        except OSError as ex:
+            if once:
+                raise
+            print(f"[INFO] Coordinador {host}:{port} no disponible ({ex.strerror or str(ex)}), reintentando...")
+            await asyncio.sleep(reconnect_delay)
+            continue
+
+        try:
+            await _send(writer, {"type": "hello", "worker": name, "token": token})
+            while True:
+                message = await _receive(reader)
+                if message is None or message.get("type") == "done":
+                    break
+                if message.get("type") != "unit":
+                    continue
+                print(f"[INFO] Escaneando unidad {message['unit_id']} ({len(message['urls'])} DDNS)")
+                results = await _scan_unit(writer, message, concurrency)
+                await _send(writer, {"type": "result", "unit_id": message["unit_id"], "results": results})
+                scanned += 1
+        except (OSError, asyncio.IncompleteReadError, ValueError) as ex:
+            print(f"[ERROR] Conexión con el coordinador perdida: {str(ex)}")
+        finally:
+            writer.close()
+
+        if once:
+            return scanned
+        await asyncio.sleep(reconnect_delay)
+
+
+def _parse_address(value: str, default_host: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    from services.scan_export import EXPORT_FORMATS
+
+    parser = argparse.ArgumentParser(
+        prog="python -m services.scan_distributed",
+        description="Escaneo General distribuido entre un coordinador y varios trabajadores."
+    )
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV_VAR),
+                        help=f"token compartido (por defecto, la variable de entorno {TOKEN_ENV_VAR})")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+
+    coordinator = subparsers.add_parser("coordinator", help="repartir el escaneo de los enlaces de la API")
+    coordinator.add_argument("--listen", default=f"{DEFAULT_LISTEN_HOST}:{DEFAULT_PORT}", metavar="HOST:PUERTO",
+                             help=f"dirección donde escuchar (por defecto {DEFAULT_LISTEN_HOST}:{DEFAULT_PORT}); "
+                                  f"fuera de loopback requiere --token")
+    coordinator.add_argument("--unit-size", type=int, default=UNIT_SIZE, help="DDNS por unidad de trabajo")
+    coordinator.add_argument("--timeout", type=float, default=CONNECT_TIMEOUT,
+                             help="tiempo máximo de espera por puerto en segundos")
+    coordinator.add_argument("--fingerprint", action="store_true",
+                             help="identificar el servicio HTTP/RTSP de los puertos abiertos")
+    coordinator.add_argument("--no-activities", action="store_true",
+                             help="no crear actividades para los enlaces sin puertos abiertos")
+    coordinator.add_argument("--no-history", action="store_true",
+                             help="no guardar la ejecución en el historial ni crear actividades")
+    coordinator.add_argument("--export", nargs="+", choices=sorted(EXPORT_FORMATS), default=[], metavar="FORMATO")
+    coordinator.add_argument("--host-rate", type=float, default=rate_limit.HOST_RATE,
+                             help=f"conexiones nuevas por segundo por IP en cada trabajador; 0 sin límite "
+                                  f"(por defecto {rate_limit.HOST_RATE})")
+    coordinator.add_argument("--network-rate", type=float, default=rate_limit.NETWORK_RATE,
+                             help="conexiones nuevas por segundo por red /24 o dominio del proveedor, "
+                                  "repartidas entre los trabajadores; 0 sin límite (por defecto sin límite)")
+    coordinator.add_argument("--global-rate", type=float, default=rate_limit.GLOBAL_RATE,
+                             help="conexiones nuevas por segundo en todo el escaneo, repartidas entre "
+                                  "los trabajadores; 0 sin límite (por defecto sin límite)")
+    coordinator.add_argument("--group-by", choices=["network", "domain"], default="network",
+                             help="agrupar el límite por red /24 o por dominio del proveedor DDNS")
+
+    worker = subparsers.add_parser("worker", help="escanear las unidades que envíe un coordinador")
+    worker.add_argument("--connect", required=True, metavar="HOST:PUERTO")
+    worker.add_argument("--name", help="nombre del trabajador (por defecto, el de la máquina)")
+    worker.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"conexiones simultáneas máximas (por defecto {MAX_CONCURRENCY})")
+    worker.add_argument("--once", action="store_true", help="terminar al acabar una ejecución")
+    args = parser.parse_args(argv)
+
+    if args.role == "coordinator" and not args.token:
+        host, _ = _parse_address(args.listen, DEFAULT_LISTEN_HOST)
+        if not _is_loopback(host):
+            parser.error(f"se requiere --token (o {TOKEN_ENV_VAR}) para escuchar en {host}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada del coordinador y de los trabajadores.
+
+    El coordinador escribe una línea JSON por DDNS en la salida estándar y usa
+    los mismos códigos de salida que `services.scan_cli`.
+
+    Args:
+        argv: Argumentos de línea de comandos (por defecto, sys.argv[1:]).
+
+    Returns:
+        Código de salida del proceso.
+    """
+    from services.scan_cli import EXIT_INTERRUPTED, EXIT_LINKS_DOWN, EXIT_NO_LINKS, EXIT_OK
+
+    args = _parse_args(argv)
+
+    if args.role == "worker":
+        host, port = _parse_address(args.connect, "127.0.0.1")
+        try:
+            asyncio.run(run_worker(host, port, args.name, args.token, args.concurrency, args.once))
+        except KeyboardInterrupt:
+            return EXIT_INTERRUPTED
+        except OSError as ex:
+            print(f"[ERROR] No se pudo conectar con el coordinador: {str(ex)}")
+            return EXIT_COORDINATOR_UNREACHABLE
+        return EXIT_OK
+
+    from services.api_service import ApiService
+    from services.scan_export import export_scan_results
+    from services.scan_history import is_down
+    from services.scan_pipeline import process_scan_results
+
+    out = sys.stdout
+
+    def emit(item):
+        out.write(json.dumps(item, ensure_ascii=False) + "\n")
+        out.flush()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        enlaces = ApiService.get_links()
+        if not enlaces:
+            print("[ERROR] No se pudieron obtener los enlaces desde la API")
+            return EXIT_NO_LINKS
+        urls = [enlace.get("ddns") for enlace in enlaces if enlace.get("ddns")]
+        if not urls:
+            print("[ERROR] No hay DDNS para escanear")
+            return EXIT_NO_LINKS
+
+        host, port = _parse_address(args.listen, DEFAULT_LISTEN_HOST)
+        started_at = datetime.now()
+        try:
+            results = run_coordinator_sync(
+                urls, emit, host=host, port=port, token=args.token, unit_size=args.unit_size,
+                timeout=args.timeout, fingerprint=args.fingerprint,
+                rate_limiter=RateLimiter(
+                    host_rate=args.host_rate or None, network_rate=args.network_rate or None,
+                    global_rate=args.global_rate or None, group_by=args.group_by
+                )
+            )
+        except KeyboardInterrupt:
+            print("[INFO] Escaneo distribuido interrumpido")
+            return EXIT_INTERRUPTED
+
+        if not args.no_history:
+            process_scan_results(results, started_at, create_activities=not args.no_activities)
+        for fmt in args.export:
+            export_scan_results(results, fmt)
+
+        caidos = sum(1 for item in results if is_down(item))
+        print(f"[INFO] Escaneo distribuido completado: {len(results)} DDNS escaneados, {caidos} caídos")
+        return EXIT_LINKS_DOWN if caidos else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
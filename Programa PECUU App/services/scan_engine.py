@@ -0,0 +1,449 @@
+import asyncio
+import errno
+import socket
+import statistics
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.dns_resolver import DNS_CACHE, DnsCache, resolve
+from services.rate_limit import RateLimiter
+from services.service_probe import fingerprint_host
+
+
+# Puertos monitoreados en cada DDNS (HTTP de DVR/módem, RTSP y puertos de servicio)
+PORT_LIST = [80, 81, 82, 83, 84, 85, 86, 87, 88, 554, 1024, 1025, 1026, 1027, 1028, 1029]
+
+CONNECT_TIMEOUT = 1  # segundos por intento de conexión
+MAX_CONCURRENCY = 256  # conexiones simultáneas máximas en todo el escaneo
+
+# Tiempos de espera adaptativos por host
+PROBE_WAVE = 4  # puertos de la primera ola, usados para medir el RTT del host (ver first_wave)
+RTT_MULTIPLIER = 4  # el tiempo de espera del host es este múltiplo de su RTT
+MIN_CONNECT_TIMEOUT = 0.2  # segundos; piso del tiempo de espera adaptativo
+FILTERED_RETRY_TIMEOUT = 2  # segundos; segundo intento de los puertos que no respondieron
+
+# Estados de un intento de conexión
+PORT_OPEN = "open"
+PORT_CLOSED = "closed"
+PORT_TIMEOUT = "timeout"
+HOST_UNREACHABLE = "unreachable"
+
+_UNREACHABLE_ERRNOS = {errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EHOSTDOWN}
+
+
+async def _connect(ip_addr: str, port: int, semaphore: asyncio.Semaphore,
+                   timeout: float, limiter: Optional[RateLimiter] = None,
+                   domain: Optional[str] = None) -> Tuple[str, float]:
+    """
+    Realiza un intento de conexión TCP y clasifica la respuesta.
+
+    Si se indica `limiter`, primero espera a que el límite de conexiones por
+    segundo lo permita; esa espera no ocupa un lugar del semáforo ni cuenta
+    en el tiempo transcurrido.
+
+    Returns:
+        Tupla (estado, segundos transcurridos). El estado es PORT_OPEN si el
+        puerto aceptó la conexión, PORT_CLOSED si el host respondió rechazándola,
+        HOST_UNREACHABLE si la red reportó que el host no es alcanzable y
+        PORT_TIMEOUT si no hubo respuesta dentro de `timeout`.
+    """
+    if limiter is not None:
+        await limiter.acquire(ip_addr, domain)
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip_addr, port)), timeout)
+            return PORT_OPEN, time.monotonic() - started
+        except ConnectionRefusedError:
+            return PORT_CLOSED, time.monotonic() - started
+        except asyncio.TimeoutError:
+            return PORT_TIMEOUT, time.monotonic() - started
+        except OSError as ex:
+            if ex.errno in _UNREACHABLE_ERRNOS:
+                return HOST_UNREACHABLE, time.monotonic() - started
+            return PORT_TIMEOUT, time.monotonic() - started
+        finally:
+            sock.close()
+
+
+async def probe_port(ip_addr: str, port: int, semaphore: asyncio.Semaphore,
+                     timeout: float = CONNECT_TIMEOUT) -> bool:
+    """
+    Intenta establecer una conexión TCP sin bloquear el ciclo de eventos.
+
+    Args:
+        ip_addr: Dirección IP (v4) a probar.
+        port: Puerto TCP a probar.
+        semaphore: Semáforo compartido que limita las conexiones simultáneas.
+        timeout: Tiempo máximo de espera del intento en segundos.
+
+    Returns:
+        True si el puerto aceptó la conexión, False en cualquier otro caso.
+    """
+    estado, _ = await _connect(ip_addr, port, semaphore, timeout)
+    return estado == PORT_OPEN
+
+
+def adaptive_timeout(rtts: List[float]) -> float:
+    """
+    Calcula el tiempo de espera por puerto de un host a partir de sus RTT medidos.
+
+    Args:
+        rtts: Tiempos de respuesta (segundos) de los puertos que contestaron.
+
+    Returns:
+        RTT_MULTIPLIER veces el mayor RTT, acotado entre MIN_CONNECT_TIMEOUT y
+        CONNECT_TIMEOUT. Sin mediciones regresa CONNECT_TIMEOUT.
+    """
+    if not rtts:
+        return CONNECT_TIMEOUT
+    return max(MIN_CONNECT_TIMEOUT, min(CONNECT_TIMEOUT, max(rtts) * RTT_MULTIPLIER))
+
+
+def latency_summary(port_latency_ms: Dict[int, float]) -> Optional[Dict[str, float]]:
+    """
+    Resume las latencias de conexión de un host.
+
+    Args:
+        port_latency_ms: Latencia de conexión en milisegundos por puerto.
+
+    Returns:
+        Diccionario con 'min', 'median' y 'max' en milisegundos, o None si no hay mediciones.
+    """
+    if not port_latency_ms:
+        return None
+    valores = list(port_latency_ms.values())
+    return {
+        'min': round(min(valores), 1),
+        'median': round(statistics.median(valores), 1),
+        'max': round(max(valores), 1)
+    }
+
+
+def closed_port_states(item: Dict) -> Tuple[List[int], List[int]]:
+    """
+    Divide los puertos no abiertos de un resultado en rechazados y filtrados.
+
+    Los resultados guardados antes de distinguir ambos estados solo tienen
+    'closed_ports'; en ese caso todos se reportan como rechazados.
+
+    Args:
+        item: Diccionario de resultado del escaneo de un DDNS.
+
+    Returns:
+        Tupla (puertos rechazados, puertos filtrados).
+    """
+    if 'refused_ports' in item or 'filtered_ports' in item:
+        return list(item.get('refused_ports', [])), list(item.get('filtered_ports', []))
+    return list(item.get('closed_ports', [])), []
+
+
+def first_wave(ports: List[int], size: int = PROBE_WAVE) -> List[int]:
+    """
+    Elige los puertos de la primera ola repartidos entre los grupos de puertos.
+
+    Un grupo es una serie de puertos consecutivos (80-88, 554, 1024-1029). Se
+    toma el primer puerto de cada grupo y, si sobra lugar, el siguiente de
+    cada uno, de modo que un módem que descarta los puertos HTTP pero reenvía
+    RTSP o el puerto del DVR responde desde la primera ola.
+
+    Args:
+        ports: Puertos a escanear.
+        size: Número de puertos de la ola.
+
+    Returns:
+        Los puertos de la ola, en el orden en que se eligieron.
+    """
+    grupos: List[List[int]] = []
+    for port in ports:
+        if grupos and port == grupos[-1][-1] + 1:
+            grupos[-1].append(port)
+        else:
+            grupos.append([port])
+
+    ola: List[int] = []
+    nivel = 0
+    while len(ola) < min(size, len(ports)):
+        for grupo in grupos:
+            if nivel < len(grupo) and len(ola) < size:
+                ola.append(grupo[nivel])
+        nivel += 1
+    return ola
+
+
+async def scan_host_adaptive(ip_addr: str, semaphore: asyncio.Semaphore,
+                             ports: Optional[List[int]] = None,
+                             timeout: float = CONNECT_TIMEOUT,
+                             limiter: Optional[RateLimiter] = None,
+                             domain: Optional[str] = None,
+                             retry_timeout: Optional[float] = FILTERED_RETRY_TIMEOUT) -> Dict:
+    """
+    Escanea un host ajustando el tiempo de espera a su latencia.
+
+    Primero prueba PROBE_WAVE puertos repartidos entre los grupos de puertos
+    (ver `first_wave`) con el tiempo de espera completo, y el resto se escanea
+    con un tiempo de espera derivado del RTT medido en esa primera ola. Si
+    ningún puerto de la primera ola responde (ni aceptando ni rechazando la
+    conexión), el resto se prueba con el tiempo de espera completo y el host
+    solo se considera inalcanzable si tampoco responde ninguno de ellos.
+
+    Los puertos que rechazaron la conexión (RST) son definitivos. Los que no
+    respondieron quedan como filtrados y, si `retry_timeout` no es None, se
+    vuelven a probar una sola vez con ese tiempo de espera más largo.
+
+    Args:
+        ip_addr: Dirección IP (v4) a escanear.
+        semaphore: Semáforo compartido que limita las conexiones simultáneas.
+        ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+        timeout: Tiempo máximo de espera de la primera ola en segundos.
+        limiter: Límite opcional de conexiones nuevas por segundo.
+        domain: DDNS del host, para agrupar el límite por proveedor.
+        retry_timeout: Tiempo de espera del reintento de los puertos filtrados
+            (None = sin reintento).
+
+    Returns:
+        Diccionario con las llaves 'reachable' (bool), 'open_ports',
+        'refused_ports', 'filtered_ports', 'closed_ports' (rechazados más
+        filtrados), 'timeout' (tiempo de espera usado en la segunda ola) y
+        'port_latency_ms' ({puerto: milisegundos} de los puertos que aceptaron
+        o rechazaron la conexión). Un host inalcanzable regresa las listas vacías.
+    """
+    ports = ports if ports is not None else PORT_LIST
+    wave = first_wave(ports, PROBE_WAVE)
+    rest = [port for port in ports if port not in wave]
+
+    respuestas = await asyncio.gather(*(_connect(ip_addr, port, semaphore, timeout, limiter, domain) for port in wave))
+    mediciones = dict(zip(wave, respuestas))
+    rtts = [elapsed for estado, elapsed in respuestas if estado in (PORT_OPEN, PORT_CLOSED)]
+
+    # Sin RTT medido, el resto se prueba con el tiempo de espera completo
+    host_timeout = min(timeout, adaptive_timeout(rtts)) if rtts else timeout
+    if rest:
+        respuestas = await asyncio.gather(*(_connect(ip_addr, port, semaphore, host_timeout, limiter, domain) for port in rest))
+        mediciones.update(zip(rest, respuestas))
+
+    if not any(estado in (PORT_OPEN, PORT_CLOSED) for estado, _ in mediciones.values()):
+        return {
+            'reachable': False, 'open_ports': [], 'refused_ports': [], 'filtered_ports': [],
+            'closed_ports': [], 'timeout': timeout, 'port_latency_ms': {}
+        }
+
+    # Solo los puertos sin respuesta son ambiguos; un RST no se vuelve a probar
+    filtrados = [port for port in ports if mediciones[port][0] not in (PORT_OPEN, PORT_CLOSED)]
+    if filtrados and retry_timeout is not None:
+        retry = max(retry_timeout, timeout)
+        respuestas = await asyncio.gather(*(_connect(ip_addr, port, semaphore, retry, limiter, domain) for port in filtrados))
+        mediciones.update(zip(filtrados, respuestas))
+
+    return {
+        'reachable': True,
+        'open_ports': [port for port in ports if mediciones[port][0] == PORT_OPEN],
+        'refused_ports': [port for port in ports if mediciones[port][0] == PORT_CLOSED],
+        'filtered_ports': [port for port in ports if mediciones[port][0] not in (PORT_OPEN, PORT_CLOSED)],
+        'closed_ports': [port for port in ports if mediciones[port][0] != PORT_OPEN],
+        'timeout': host_timeout,
+        'port_latency_ms': {
+            port: round(elapsed * 1000, 1)
+            for port, (estado, elapsed) in mediciones.items()
+            if estado in (PORT_OPEN, PORT_CLOSED)
+        }
+    }
+
+
+async def scan_host(ip_addr: str, semaphore: asyncio.Semaphore,
+                    ports: Optional[List[int]] = None,
+                    timeout: float = CONNECT_TIMEOUT,
+                    limiter: Optional[RateLimiter] = None) -> Tuple[List[int], List[int]]:
+    """
+    Escanea todos los puertos de un host de forma concurrente.
+
+    Usa `scan_host_adaptive`; si el host resulta inalcanzable, todos los
+    puertos se reportan como cerrados.
+
+    Args:
+        ip_addr: Dirección IP (v4) a escanear.
+        semaphore: Semáforo compartido que limita las conexiones simultáneas.
+        ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+        timeout: Tiempo máximo de espera por puerto en segundos.
+        limiter: Límite opcional de conexiones nuevas por segundo.
+
+    Returns:
+        Tupla (puertos abiertos, puertos cerrados), ambas en el orden de `ports`.
+    """
+    ports = ports if ports is not None else PORT_LIST
+    resultado = await scan_host_adaptive(ip_addr, semaphore, ports, timeout, limiter)
+    if not resultado['reachable']:
+        return [], list(ports)
+    return resultado['open_ports'], resultado['closed_ports']
+
+
+async def scan_hosts(hosts: Iterable[str], ports: Optional[List[int]] = None,
+                     concurrency: int = MAX_CONCURRENCY, timeout: float = CONNECT_TIMEOUT,
+                     on_result: Optional[Callable[[str, List[int], List[int]], None]] = None,
+                     rate_limiter: Optional[RateLimiter] = None
+                     ) -> Dict[str, Tuple[List[int], List[int]]]:
+    """
+    Escanea todas las combinaciones host×puerto bajo un límite global de concurrencia.
+
+    Args:
+        hosts: Direcciones IP a escanear. Las repetidas se escanean una sola vez.
+        ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+        concurrency: Número máximo de conexiones abiertas al mismo tiempo.
+        timeout: Tiempo máximo de espera por puerto en segundos.
+        on_result: Callback opcional invocado como on_result(ip, abiertos, cerrados)
+            en cuanto termina cada host.
+        rate_limiter: Límite de conexiones nuevas por segundo. Si es None, se
+            usan los límites por defecto de services.rate_limit.
+
+    Returns:
+        Diccionario {ip: (puertos abiertos, puertos cerrados)}.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+    unique_hosts = list(dict.fromkeys(hosts))
+    resultados = {}
+
+    async def _scan(ip_addr):
+        open_ports, closed_ports = await scan_host(ip_addr, semaphore, ports, timeout, limiter)
+        resultados[ip_addr] = (open_ports, closed_ports)
+        if on_result:
+            on_result(ip_addr, open_ports, closed_ports)
+
+    await asyncio.gather(*(_scan(ip_addr) for ip_addr in unique_hosts))
+    return resultados
+
+
+def scan_hosts_sync(hosts: Iterable[str], ports: Optional[List[int]] = None,
+                    concurrency: int = MAX_CONCURRENCY, timeout: float = CONNECT_TIMEOUT,
+                    on_result: Optional[Callable[[str, List[int], List[int]], None]] = None
+                    ) -> Dict[str, Tuple[List[int], List[int]]]:
+    """
+    Versión síncrona de `scan_hosts` para código que no corre en un ciclo de eventos
+    (por ejemplo, los manejadores de eventos de Flet).
+
+    Returns:
+        Diccionario {ip: (puertos abiertos, puertos cerrados)}.
+    """
+    return asyncio.run(scan_hosts(hosts, ports, concurrency, timeout, on_result))
+
+
+async def scan_urls(urls: List[str], ports: Optional[List[int]] = None,
+                    concurrency: int = MAX_CONCURRENCY, timeout: float = CONNECT_TIMEOUT,
+                    on_result: Optional[Callable[[Dict], None]] = None,
+                    cache: DnsCache = DNS_CACHE, fingerprint: bool = False,
+                    rate_limiter: Optional[RateLimiter] = None) -> List[Dict]:
+    """
+    Resuelve y escanea una lista de DDNS como un solo pipeline.
+
+    Cada DDNS se resuelve en el pool de resolución y su escaneo comienza en
+    cuanto tiene IP, sin esperar al resto de la lista. Los DDNS que apuntan a
+    la misma IP comparten un único escaneo.
+
+    Con `fingerprint=True`, los puertos abiertos HTTP y RTSP de cada host se
+    sondean en una segunda etapa (ver services.service_probe) para registrar
+    la línea de estado y el encabezado Server del servicio.
+
+    Args:
+        urls: DDNS a escanear.
+        ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+        concurrency: Número máximo de conexiones abiertas al mismo tiempo.
+        timeout: Tiempo máximo de espera por puerto en segundos.
+        on_result: Callback opcional invocado con el diccionario de resultado
+            de cada DDNS en cuanto termina.
+        cache: Caché DNS a utilizar (por defecto la compartida por la aplicación).
+        fingerprint: Si es True, identifica los servicios HTTP/RTSP de los puertos abiertos.
+        rate_limiter: Límite de conexiones nuevas por segundo por host, red y
+            global. Si es None, se usan los límites por defecto de services.rate_limit.
+
+    Returns:
+        Lista de diccionarios de resultado en el mismo orden que `urls`, con las
+        llaves 'url', 'ip', 'open_ports', 'closed_ports', 'status' y, en caso de
+        fallo, 'error'. El estado 'unreachable' (ningún puerto respondió) se
+        distingue de 'success' con todos los puertos cerrados. Los resultados
+        exitosos dividen 'closed_ports' en 'refused_ports' (RST) y
+        'filtered_ports' (sin respuesta tras el reintento), e incluyen
+        'port_latency_ms' ({puerto: ms}) y 'latency_ms' (ver `latency_summary`);
+        con `fingerprint=True`, también 'services'.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+    host_scans: Dict[str, asyncio.Task] = {}
+
+    async def _scan_host(ip_addr, domain):
+        host = await scan_host_adaptive(ip_addr, semaphore, ports, timeout, limiter, domain)
+        if fingerprint and host['reachable']:
+            host['services'] = await fingerprint_host(ip_addr, host['open_ports'], semaphore,
+                                                      limiter=limiter, domain=domain)
+        return host
+
+    async def _scan_url(url):
+        ip_addr, error = await resolve(url, cache)
+        if ip_addr is None:
+            result = {
+                'url': url,
+                'ip': 'No se pudo resolver',
+                'open_ports': [],
+                'closed_ports': [],
+                'status': 'dns_error',
+                'error': error
+            }
+        else:
+            if ip_addr not in host_scans:
+                host_scans[ip_addr] = asyncio.ensure_future(_scan_host(ip_addr, url))
+            try:
+                host = await host_scans[ip_addr]
+                if host['reachable']:
+                    result = {
+                        'url': url,
+                        'ip': ip_addr,
+                        'open_ports': list(host['open_ports']),
+                        'closed_ports': list(host['closed_ports']),
+                        'refused_ports': list(host['refused_ports']),
+                        'filtered_ports': list(host['filtered_ports']),
+                        'status': 'success',
+                        'port_latency_ms': dict(host['port_latency_ms']),
+                        'latency_ms': latency_summary(host['port_latency_ms'])
+                    }
+                    if 'services' in host:
+                        result['services'] = [dict(service) for service in host['services']]
+                else:
+                    result = {
+                        'url': url,
+                        'ip': ip_addr,
+                        'open_ports': [],
+                        'closed_ports': [],
+                        'status': 'unreachable',
+                        'error': 'Host inalcanzable (sin respuesta en ningún puerto)'
+                    }
+            except Exception as ex:
+                result = {
+                    'url': url,
+                    'ip': ip_addr,
+                    'open_ports': [],
+                    'closed_ports': [],
+                    'status': 'error',
+                    'error': str(ex)
+                }
+
+        if on_result:
+            on_result(result)
+        return result
+
+    return list(await asyncio.gather(*(_scan_url(url) for url in urls)))
+
+
+def scan_urls_sync(urls: List[str], ports: Optional[List[int]] = None,
+                   concurrency: int = MAX_CONCURRENCY, timeout: float = CONNECT_TIMEOUT,
+                   on_result: Optional[Callable[[Dict], None]] = None,
+                   cache: DnsCache = DNS_CACHE, fingerprint: bool = False,
+                   rate_limiter: Optional[RateLimiter] = None) -> List[Dict]:
+    """
+    Versión síncrona de `scan_urls` para los manejadores de eventos de Flet.
+
+    Returns:
+        Lista de diccionarios de resultado en el mismo orden que `urls`.
+    """
+    return asyncio.run(scan_urls(urls, ports, concurrency, timeout, on_result, cache, fingerprint, rate_limiter))
@@ -0,0 +1,385 @@
+import csv
+import importlib.util
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from services.scan_engine import closed_port_states
+from services.service_probe import format_services
+
+
+REPORTS_FOLDER = os.path.join(os.path.expanduser("~"), "Documents", "SGCC_Reportes")
+
+EXCEL_HEADERS = ["DDNS/URL", "IP", "Estado", "Puertos Abiertos", "Puertos Rechazados", "Puertos Filtrados",
+                 "Total Puertos", "Latencia Mín (ms)", "Latencia Mediana (ms)", "Latencia Máx (ms)", "Servicios"]
+EXCEL_COLUMN_WIDTHS = [25, 20, 30, 30, 30, 30, 15, 18, 22, 18, 50]
+
+# Campos de los formatos legibles por máquina (ver scan_result_record)
+EXPORT_FIELDS = ["ddns", "ip", "estado", "error", "puertos_abiertos", "puertos_rechazados", "puertos_filtrados",
+                 "total_puertos", "latencia_min_ms", "latencia_mediana_ms", "latencia_max_ms", "servicios"]
+
+# Campos de cada servicio identificado en la columna 'servicios' (ver services.service_probe)
+SERVICE_FIELDS = ["port", "protocol", "status_line", "status_code", "server", "error"]
+
+
+def report_path(extension: str, prefix: str = "escaneo_general") -> str:
+    """
+    Genera la ruta de un nuevo reporte con fecha y hora en la carpeta de reportes.
+
+    Args:
+        extension: Extensión del archivo sin punto (ej. 'xlsx').
+        prefix: Prefijo del nombre del archivo.
+
+    Returns:
+        Ruta absoluta del archivo. La carpeta se crea si no existe.
+    """
+    if not os.path.exists(REPORTS_FOLDER):
+        os.makedirs(REPORTS_FOLDER)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(REPORTS_FOLDER, f"{prefix}_{timestamp}.{extension}")
+
+
+def scan_result_row(item: Dict) -> Tuple[list, bool]:
+    """
+    Convierte un resultado de escaneo en la fila que se escribe en el reporte.
+
+    Args:
+        item: Diccionario de resultado del escaneo de un DDNS.
+
+    Returns:
+        Tupla (valores de la fila en el orden de EXCEL_HEADERS, True si el escaneo fue exitoso).
+    """
+    if item['status'] == 'success':
+        estado = "✓ Exitoso"
+        puertos_abiertos = ', '.join(map(str, item['open_ports'])) if item['open_ports'] else "-"
+        rechazados, filtrados = closed_port_states(item)
+        puertos_rechazados = ', '.join(map(str, rechazados)) if rechazados else "-"
+        puertos_filtrados = ', '.join(map(str, filtrados)) if filtrados else "-"
+        total_puertos = len(item['closed_ports']) + len(item['open_ports'])
+        exitoso = True
+    elif item['status'] == 'unreachable':
+        estado = "✗ Inalcanzable"
+        puertos_abiertos = "-"
+        puertos_rechazados = "-"
+        puertos_filtrados = "-"
+        total_puertos = 0
+        exitoso = False
+    else:
+        estado = f"✗ {item['status']}: {item.get('error', 'Error desconocido')}"
+        puertos_abiertos = "-"
+        puertos_rechazados = "-"
+        puertos_filtrados = "-"
+        total_puertos = 0
+        exitoso = False
+
+    latency = item.get('latency_ms') or {}
+
+    return [
+        item['url'],
+        item.get('ip', '-'),
+        estado,
+        puertos_abiertos,
+        puertos_rechazados,
+        puertos_filtrados,
+        total_puertos,
+        latency.get('min'),
+        latency.get('median'),
+        latency.get('max'),
+        format_services(item.get('services'))
+    ], exitoso
+
+
+def scan_result_record(item: Dict) -> Dict:
+    """
+    Convierte un resultado de escaneo en un registro con valores crudos para CSV, JSON Lines y Parquet.
+
+    A diferencia de `scan_result_row`, que da el texto del reporte de Excel, el
+    estado es el código del escaneo ('success', 'unreachable', 'dns_error',
+    'error'), los puertos son listas de enteros y los datos que no existen
+    (por ejemplo, los puertos de un DDNS inalcanzable) son None.
+
+    Args:
+        item: Diccionario de resultado del escaneo de un DDNS.
+
+    Returns:
+        Diccionario con las llaves de EXPORT_FIELDS.
+    """
+    latency = item.get('latency_ms') or {}
+    record = {
+        "ddns": item['url'],
+        "ip": item.get('ip'),
+        "estado": item['status'],
+        "error": item.get('error'),
+        "puertos_abiertos": None,
+        "puertos_rechazados": None,
+        "puertos_filtrados": None,
+        "total_puertos": None,
+        "latencia_min_ms": latency.get('min'),
+        "latencia_mediana_ms": latency.get('median'),
+        "latencia_max_ms": latency.get('max'),
+        "servicios": None,
+    }
+    if item['status'] == 'success':
+        rechazados, filtrados = closed_port_states(item)
+        record["puertos_abiertos"] = [int(port) for port in item['open_ports']]
+        record["puertos_rechazados"] = [int(port) for port in rechazados]
+        record["puertos_filtrados"] = [int(port) for port in filtrados]
+        record["total_puertos"] = len(item['open_ports']) + len(item['closed_ports'])
+        if item.get('services') is not None:
+            record["servicios"] = [
+                {field: service.get(field) for field in SERVICE_FIELDS} for service in item['services']
+            ]
+    return record
+
+
+def _border() -> Border:
+    return Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+
+def _named_styles() -> Dict[str, NamedStyle]:
+    """Estilos con nombre del reporte; se registran una vez por libro y las celdas los referencian."""
+    header = NamedStyle(name="escaneo_encabezado")
+    header.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header.font = Font(bold=True, color="FFFFFF", size=12)
+    header.alignment = Alignment(horizontal="center", vertical="center")
+    header.border = _border()
+
+    success = NamedStyle(name="escaneo_exitoso")
+    success.fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
+    success.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    success.border = _border()
+
+    error = NamedStyle(name="escaneo_error")
+    error.fill = PatternFill(start_color="FCE4D6", end_color="FCE4D6", fill_type="solid")
+    error.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    error.border = _border()
+
+    return {"header": header, "success": success, "error": error}
+
+
+def _save_streaming(scan_results: List[Dict], file_path: str):
+    """Escribe el reporte con una hoja de solo escritura; las filas no se conservan en memoria."""
+    wb = Workbook(write_only=True)
+    styles = _named_styles()
+    for style in styles.values():
+        wb.add_named_style(style)
+
+    ws = wb.create_sheet("Escaneo General")
+    for i, width in enumerate(EXCEL_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+
+    def _row(values, style_name):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style_name
+            cells.append(cell)
+        return cells
+
+    ws.append(_row(EXCEL_HEADERS, styles["header"].name))
+    for item in scan_results:
+        values, exitoso = scan_result_row(item)
+        ws.append(_row(values, styles["success" if exitoso else "error"].name))
+
+    wb.save(file_path)
+
+
+def _save_in_memory(scan_results: List[Dict], file_path: str):
+    """Escribe el reporte con una hoja normal, aplicando los estilos celda por celda."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Escaneo General"
+
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    success_fill = PatternFill(start_color="E2EFDA", end_color="E2EFDA", fill_type="solid")
+    error_fill = PatternFill(start_color="FCE4D6", end_color="FCE4D6", fill_type="solid")
+    border = _border()
+
+    ws.append(EXCEL_HEADERS)
+    for cell in ws[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = border
+
+    row_num = 2
+    for item in scan_results:
+        values, exitoso = scan_result_row(item)
+        ws.append(values)
+        for cell in ws[row_num]:
+            cell.fill = success_fill if exitoso else error_fill
+            cell.border = border
+            cell.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+        row_num += 1
+
+    for i, width in enumerate(EXCEL_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+
+    wb.save(file_path)
+
+
+def export_scan_results_to_excel(scan_results: List[Dict], streaming: bool = True,
+                                 file_path: Optional[str] = None) -> Optional[str]:
+    """
+    Exporta los resultados del escaneo a un archivo Excel.
+
+    Args:
+        scan_results: Lista de resultados del escaneo.
+        streaming: Si es True (por defecto), usa una hoja de solo escritura con
+            estilos con nombre compartidos, de modo que la memoria no crece con
+            el número de filas. Si es False, construye la hoja completa en memoria.
+        file_path: Ruta del archivo; por defecto se genera en REPORTS_FOLDER.
+
+    Returns:
+        Ruta del archivo Excel generado, o None si hubo un error.
+    """
+    try:
+        file_path = file_path or report_path("xlsx")
+        if streaming:
+            _save_streaming(scan_results, file_path)
+        else:
+            _save_in_memory(scan_results, file_path)
+        print(f"[SUCCESS] Archivo Excel generado: {file_path}")
+        return file_path
+    except Exception as ex:
+        print(f"[ERROR] Error al generar Excel: {str(ex)}")
+        return None
+
+
+def _csv_value(value):
+    """Valor de una celda CSV: las listas como JSON y None como celda vacía."""
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _save_csv(scan_results: List[Dict], file_path: str):
+    """Escribe un CSV fila por fila, con encabezado EXPORT_FIELDS. Las listas se escriben como JSON."""
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_FIELDS)
+        for item in scan_results:
+            record = scan_result_record(item)
+            writer.writerow([_csv_value(record[field]) for field in EXPORT_FIELDS])
+
+
+def _save_jsonl(scan_results: List[Dict], file_path: str):
+    """Escribe un objeto JSON por línea con las llaves EXPORT_FIELDS."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        for item in scan_results:
+            f.write(json.dumps(scan_result_record(item), ensure_ascii=False) + "\n")
+
+
+def parquet_available() -> bool:
+    """Indica si está instalado el paquete opcional pyarrow que requiere la exportación a Parquet."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _save_parquet(scan_results: List[Dict], file_path: str):
+    """Escribe un archivo Parquet comprimido con zstd. Requiere el paquete opcional pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("La exportación a Parquet requiere el paquete 'pyarrow' (pip install pyarrow)")
+
+    ports = pa.list_(pa.int32())
+    service = pa.struct([
+        ("port", pa.int32()), ("protocol", pa.string()), ("status_line", pa.string()),
+        ("status_code", pa.int32()), ("server", pa.string()), ("error", pa.string()),
+    ])
+    schema = pa.schema([
+        ("ddns", pa.string()), ("ip", pa.string()), ("estado", pa.string()), ("error", pa.string()),
+        ("puertos_abiertos", ports), ("puertos_rechazados", ports), ("puertos_filtrados", ports),
+        ("total_puertos", pa.int32()), ("latencia_min_ms", pa.float64()), ("latencia_mediana_ms", pa.float64()),
+        ("latencia_max_ms", pa.float64()), ("servicios", pa.list_(service)),
+    ])
+    records = [scan_result_record(item) for item in scan_results]
+    pq.write_table(pa.Table.from_pylist(records, schema=schema), file_path, compression="zstd")
+
+
+# Formatos de exportación disponibles: nombre -> (extensión, función de escritura)
+EXPORT_FORMATS: Dict[str, Tuple[str, Callable[[List[Dict], str], None]]] = {
+    "xlsx": ("xlsx", _save_streaming),
+    "csv": ("csv", _save_csv),
+    "jsonl": ("jsonl", _save_jsonl),
+    "parquet": ("parquet", _save_parquet),
+}
+
+
+def register_export_format(name: str, extension: str, writer: Callable[[List[Dict], str], None]):
+    """
+    Registra un formato de exportación adicional.
+
+    Args:
+        name: Nombre del formato (ej. 'csv').
+        extension: Extensión de archivo sin punto.
+        writer: Función writer(scan_results, file_path) que escribe el archivo.
+    """
+    EXPORT_FORMATS[name] = (extension, writer)
+
+
+def export_scan_results(scan_results: List[Dict], fmt: str = "xlsx",
+                        file_path: Optional[str] = None) -> Optional[str]:
+    """
+    Exporta los resultados del escaneo en uno de los formatos de EXPORT_FORMATS.
+
+    Args:
+        scan_results: Lista de resultados del escaneo.
+        fmt: Nombre del formato ('xlsx', 'csv', 'jsonl' o 'parquet').
+        file_path: Ruta del archivo; por defecto se genera en REPORTS_FOLDER.
+
+    Returns:
+        Ruta del archivo generado, o None si hubo un error.
+    """
+    if fmt not in EXPORT_FORMATS:
+        print(f"[ERROR] Formato de exportación desconocido: {fmt}")
+        return None
+
+    extension, writer = EXPORT_FORMATS[fmt]
+    try:
+        file_path = file_path or report_path(extension)
+        writer(scan_results, file_path)
+        print(f"[SUCCESS] Reporte {fmt} generado: {file_path}")
+        return file_path
+    except Exception as ex:
+        print(f"[ERROR] Error al generar reporte {fmt}: {str(ex)}")
+        return None
+
+
+def export_in_background(scan_results: List[Dict],
+                         on_done: Callable[[Dict[str, Optional[str]]], None],
+                         formats: Iterable[str] = ("xlsx",)) -> threading.Thread:
+    """
+    Exporta los resultados en uno o varios formatos en un hilo de fondo.
+
+    Args:
+        scan_results: Lista de resultados del escaneo. No debe modificarse mientras se exporta.
+        on_done: Callback invocado con {formato: ruta o None} una vez que todos
+            los archivos quedaron escritos en disco.
+        formats: Formatos a generar (ver EXPORT_FORMATS).
+
+    Returns:
+        El hilo de la exportación.
+    """
+    formats = list(formats)
+
+    def _target():
+        on_done({fmt: export_scan_results(scan_results, fmt) for fmt in formats})
+
+    thread = threading.Thread(target=_target, name="exportacion-reportes", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,402 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Tuple, Union
+
+
+HISTORY_DB_PATH = os.path.join(os.path.expanduser("~"), "Documents", "SGCC_Reportes", "historial_escaneos.db")
+
+DELTA_MAX_AGE = 3600  # segundos tras los cuales un resultado sano se vuelve a escanear en modo delta
+LOOKUP_BATCH_SIZE = 500  # DDNS por consulta `IN (...)`; por debajo del límite de parámetros de SQLite
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    total_hosts INTEGER NOT NULL,
+    cancelled INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS host_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES scan_runs(id) ON DELETE CASCADE,
+    scanned_at TEXT NOT NULL,
+    ddns TEXT NOT NULL,
+    ip TEXT,
+    status TEXT NOT NULL,
+    open_ports TEXT NOT NULL,
+    closed_ports TEXT NOT NULL,
+    error TEXT,
+    is_down INTEGER NOT NULL,
+    services TEXT,
+    port_latency_ms TEXT,
+    latency_min_ms REAL,
+    latency_median_ms REAL,
+    latency_max_ms REAL,
+    refused_ports TEXT,
+    filtered_ports TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_host_results_ddns ON host_results (ddns, scanned_at);
+CREATE INDEX IF NOT EXISTS idx_host_results_ip ON host_results (ip, scanned_at);
+CREATE INDEX IF NOT EXISTS idx_host_results_scanned_at ON host_results (scanned_at);
+CREATE INDEX IF NOT EXISTS idx_host_results_run ON host_results (run_id);
+"""
+
+# Columnas agregadas después de la primera versión del esquema: (tabla, columna, tipo).
+# Se agregan con ALTER TABLE a las bases de datos creadas antes de existir.
+_ADDED_COLUMNS = [
+    ("host_results", "services", "TEXT"),
+    ("host_results", "port_latency_ms", "TEXT"),
+    ("host_results", "latency_min_ms", "REAL"),
+    ("host_results", "latency_median_ms", "REAL"),
+    ("host_results", "latency_max_ms", "REAL"),
+    ("host_results", "refused_ports", "TEXT"),
+    ("host_results", "filtered_ports", "TEXT"),
+]
+
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def is_down(item: Dict) -> bool:
+    """Indica si un resultado de escaneo representa un enlace caído (sin puertos abiertos o con error)."""
+    return item.get('status') != 'success' or not item.get('open_ports')
+
+
+def _format_timestamp(value: Union[datetime, str, None]) -> str:
+    if value is None:
+        return datetime.now().strftime(_TIMESTAMP_FORMAT)
+    if isinstance(value, datetime):
+        return value.strftime(_TIMESTAMP_FORMAT)
+    return value
+
+
+def _add_missing_columns(conn: sqlite3.Connection):
+    """Agrega a una base de datos existente las columnas de _ADDED_COLUMNS que le falten."""
+    for table, column, column_type in _ADDED_COLUMNS:
+        existentes = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existentes:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+class ScanHistory:
+    """
+    Historial persistente de escaneos en una base de datos SQLite embebida.
+
+    Cada ejecución del Escaneo General se guarda en la tabla `scan_runs` y el
+    resultado de cada DDNS en `host_results`, indexada por DDNS, IP y fecha,
+    para consultar el historial de un enlace sin abrir los reportes de Excel.
+    La base de datos se crea al primer uso; cada operación abre su propia
+    conexión, por lo que la clase puede usarse desde cualquier hilo.
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB_PATH):
+        """
+        Args:
+            db_path: Ruta del archivo SQLite.
+        """
+        self.db_path = db_path
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión y crea el esquema la primera vez."""
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    folder = os.path.dirname(self.db_path)
+                    if folder and not os.path.exists(folder):
+                        os.makedirs(folder)
+                    conn = sqlite3.connect(self.db_path)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                        _add_missing_columns(conn)
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    self._initialized = True
+
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def save_run(self, scan_results: List[Dict], started_at: Union[datetime, str, None] = None,
+                 finished_at: Union[datetime, str, None] = None, cancelled: bool = False) -> int:
+        """
+        Guarda una ejecución de escaneo y el resultado de cada DDNS.
+
+        Args:
+            scan_results: Lista de resultados con la estructura de `scan_urls`.
+            started_at: Fecha de inicio del escaneo (por defecto, ahora).
+            finished_at: Fecha de fin del escaneo (por defecto, ahora).
+            cancelled: True si el escaneo se canceló y los resultados son parciales.
+
+        Returns:
+            ID de la ejecución guardada.
+        """
+        finished = _format_timestamp(finished_at)
+        started = _format_timestamp(started_at) if started_at is not None else finished
+
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO scan_runs (started_at, finished_at, total_hosts, cancelled) VALUES (?, ?, ?, ?)",
+                    (started, finished, len(scan_results), int(cancelled))
+                )
+                run_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO host_results (run_id, scanned_at, ddns, ip, status, open_ports, closed_ports, error, is_down, services, "
+                    "port_latency_ms, latency_min_ms, latency_median_ms, latency_max_ms, refused_ports, filtered_ports) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            run_id,
+                            _format_timestamp(item.get('scanned_at', finished)),
+                            item['url'],
+                            item.get('ip'),
+                            item['status'],
+                            json.dumps(item.get('open_ports', [])),
+                            json.dumps(item.get('closed_ports', [])),
+                            item.get('error'),
+                            int(is_down(item)),
+                            json.dumps(item['services']) if 'services' in item else None,
+                            json.dumps(item['port_latency_ms']) if 'port_latency_ms' in item else None
+                        ) + _latency_columns(item) + (
+                            json.dumps(item['refused_ports']) if 'refused_ports' in item else None,
+                            json.dumps(item['filtered_ports']) if 'filtered_ports' in item else None
+                        )
+                        for item in scan_results
+                    ]
+                )
+            return run_id
+        finally:
+            conn.close()
+
+    def last_results(self, ddns: str, limit: int = 10) -> List[Dict]:
+        """
+        Obtiene los últimos resultados de un enlace, del más reciente al más antiguo.
+
+        Args:
+            ddns: DDNS del enlace.
+            limit: Número máximo de resultados.
+
+        Returns:
+            Lista de diccionarios de resultado (misma estructura que `scan_urls`
+            más 'run_id' y 'scanned_at').
+        """
+        return self._query(
+            "SELECT * FROM host_results WHERE ddns = ? ORDER BY scanned_at DESC, id DESC LIMIT ?",
+            (ddns, limit)
+        )
+
+    def last_results_by_ip(self, ip_addr: str, limit: int = 10) -> List[Dict]:
+        """
+        Obtiene los últimos resultados registrados para una IP.
+
+        Args:
+            ip_addr: Dirección IP resuelta.
+            limit: Número máximo de resultados.
+
+        Returns:
+            Lista de diccionarios de resultado, del más reciente al más antiguo.
+        """
+        return self._query(
+            "SELECT * FROM host_results WHERE ip = ? ORDER BY scanned_at DESC, id DESC LIMIT ?",
+            (ip_addr, limit)
+        )
+
+    def links_down_since(self, since: Union[datetime, str]) -> List[Dict]:
+        """
+        Obtiene los enlaces que estuvieron caídos a partir de una fecha.
+
+        Args:
+            since: Fecha a partir de la cual buscar (datetime o 'YYYY-MM-DD[ HH:MM:SS]').
+
+        Returns:
+            Lista con un diccionario por DDNS: 'ddns', 'ip', 'status' y 'error'
+            de su caída más reciente, 'last_down_at' y 'down_count' (número de
+            escaneos en los que estuvo caído), ordenada por la caída más reciente.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT h.ddns, h.ip, h.status, h.error, h.scanned_at AS last_down_at, agg.down_count "
+                "FROM host_results h "
+                "JOIN (SELECT ddns, MAX(id) AS last_id, COUNT(*) AS down_count FROM host_results "
+                "      WHERE is_down = 1 AND scanned_at >= ? GROUP BY ddns) agg "
+                "ON h.id = agg.last_id "
+                "ORDER BY h.scanned_at DESC",
+                (_format_timestamp(since),)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def slow_links_since(self, since: Union[datetime, str], min_median_ms: float) -> List[Dict]:
+        """
+        Obtiene los enlaces activos pero lentos a partir de una fecha.
+
+        Sirve como alerta temprana de módems celulares que empiezan a fallar:
+        el enlace sigue respondiendo, pero con una latencia de conexión alta.
+
+        Args:
+            since: Fecha a partir de la cual buscar (datetime o 'YYYY-MM-DD[ HH:MM:SS]').
+            min_median_ms: Latencia mediana mínima (ms) para considerar lento un escaneo.
+
+        Returns:
+            Lista con un diccionario por DDNS: 'ddns', 'ip', 'slow_count' (escaneos
+            lentos), 'avg_median_ms' y 'worst_max_ms', del más lento al menos lento.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT ddns, MAX(ip) AS ip, COUNT(*) AS slow_count, "
+                "ROUND(AVG(latency_median_ms), 1) AS avg_median_ms, MAX(latency_max_ms) AS worst_max_ms "
+                "FROM host_results "
+                "WHERE is_down = 0 AND scanned_at >= ? AND latency_median_ms >= ? "
+                "GROUP BY ddns ORDER BY avg_median_ms DESC",
+                (_format_timestamp(since), min_median_ms)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def latest_results(self, ddns_list: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Obtiene el resultado más reciente de cada DDNS de una lista.
+
+        Los DDNS se consultan en lotes de LOOKUP_BATCH_SIZE con `WHERE ddns IN (...)`,
+        de modo que solo se leen las filas de los DDNS pedidos.
+
+        Args:
+            ddns_list: DDNS a consultar.
+
+        Returns:
+            Diccionario {ddns: resultado}. Los DDNS sin historial no aparecen.
+        """
+        wanted = list(dict.fromkeys(ddns_list))
+        if not wanted:
+            return {}
+        conn = self._connect()
+        try:
+            latest = {}
+            for start in range(0, len(wanted), LOOKUP_BATCH_SIZE):
+                batch = wanted[start:start + LOOKUP_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                rows = conn.execute(
+                    "SELECT h.* FROM host_results h "
+                    "JOIN (SELECT MAX(id) AS last_id FROM host_results "
+                    f"WHERE ddns IN ({placeholders}) GROUP BY ddns) last ON h.id = last.last_id",
+                    batch
+                ).fetchall()
+                for row in rows:
+                    result = _row_to_result(row)
+                    latest[result['url']] = result
+            return latest
+        finally:
+            conn.close()
+
+    def recent_runs(self, limit: int = 20) -> List[Dict]:
+        """
+        Obtiene las últimas ejecuciones de escaneo.
+
+        Args:
+            limit: Número máximo de ejecuciones.
+
+        Returns:
+            Lista de diccionarios con los datos de cada ejecución.
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM scan_runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params: tuple) -> List[Dict]:
+        conn = self._connect()
+        try:
+            return [_row_to_result(row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+
+def _row_to_result(row: sqlite3.Row) -> Dict:
+    """Convierte una fila de `host_results` a la estructura de resultado del escaneo."""
+    result = {
+        'url': row['ddns'],
+        'ip': row['ip'],
+        'open_ports': json.loads(row['open_ports']),
+        'closed_ports': json.loads(row['closed_ports']),
+        'status': row['status'],
+        'run_id': row['run_id'],
+        'scanned_at': row['scanned_at']
+    }
+    if row['error']:
+        result['error'] = row['error']
+    if row['refused_ports'] is not None:
+        result['refused_ports'] = json.loads(row['refused_ports'])
+    if row['filtered_ports'] is not None:
+        result['filtered_ports'] = json.loads(row['filtered_ports'])
+    if row['services'] is not None:
+        result['services'] = json.loads(row['services'])
+    if row['port_latency_ms'] is not None:
+        # JSON guarda las llaves como texto; se restauran los números de puerto
+        result['port_latency_ms'] = {int(port): ms for port, ms in json.loads(row['port_latency_ms']).items()}
+    if row['latency_median_ms'] is not None:
+        result['latency_ms'] = {
+            'min': row['latency_min_ms'],
+            'median': row['latency_median_ms'],
+            'max': row['latency_max_ms']
+        }
+    return result
+
+
+def _latency_columns(item: Dict) -> Tuple:
+    """Valores de latency_min_ms, latency_median_ms y latency_max_ms de un resultado."""
+    latency = item.get('latency_ms')
+    if not latency:
+        return None, None, None
+    return latency['min'], latency['median'], latency['max']
+
+
+def plan_delta_scan(urls: List[str], history: "ScanHistory",
+                    max_age: float = DELTA_MAX_AGE) -> Tuple[List[str], Dict[str, Dict]]:
+    """
+    Decide qué DDNS deben volver a escanearse en modo delta.
+
+    Se vuelven a escanear los DDNS sin historial (nuevos en la lista de enlaces),
+    los que estaban caídos en su último escaneo y aquellos cuyo último escaneo
+    tiene más de `max_age` segundos. Para el resto se reutiliza el resultado previo.
+
+    Args:
+        urls: DDNS de la lista de enlaces actual.
+        history: Historial de escaneos a consultar.
+        max_age: Antigüedad máxima en segundos de un resultado reutilizable.
+
+    Returns:
+        Tupla (DDNS a escanear, {ddns: resultado previo reutilizado}). Los
+        resultados reutilizados llevan la llave 'from_history' en True.
+    """
+    latest = history.latest_results(urls)
+    oldest_allowed = _format_timestamp(datetime.now() - timedelta(seconds=max_age))
+
+    to_scan = []
+    reused = {}
+    for url in urls:
+        previous = latest.get(url)
+        if previous is None or is_down(previous) or previous['scanned_at'] < oldest_allowed:
+            to_scan.append(url)
+        else:
+            reused[url] = dict(previous, from_history=True)
+    return to_scan, reused
+
+
+# Historial compartido por la aplicación
+SCAN_HISTORY = ScanHistory()
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.rate_limit import RateLimiter
+from services.scan_engine import CONNECT_TIMEOUT, MAX_CONCURRENCY, scan_urls
+from services.scan_sharding import scan_urls_sharded
+
+
+class ScanJob:
+    """
+    Trabajo de escaneo que corre fuera del hilo de la interfaz.
+
+    Cada trabajo ejecuta el pipeline de `scan_urls` en su propio ciclo de
+    eventos y expone el progreso, los resultados parciales y la cancelación
+    para que la vista pueda abortar un barrido sin detener la aplicación.
+    """
+
+    def __init__(self, ports: Optional[List[int]] = None,
+                 concurrency: int = MAX_CONCURRENCY, timeout: float = CONNECT_TIMEOUT,
+                 on_result: Optional[Callable[[Dict], None]] = None, fingerprint: bool = False,
+                 processes: int = 1, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+            concurrency: Número máximo de conexiones abiertas al mismo tiempo.
+            timeout: Tiempo máximo de espera por puerto en segundos.
+            on_result: Callback opcional invocado con el resultado de cada DDNS
+                en cuanto termina (se ejecuta en el hilo del trabajo).
+            fingerprint: Si es True, identifica los servicios HTTP/RTSP de los puertos abiertos.
+            processes: Procesos entre los que se reparte el escaneo (ver
+                `scan_urls_sharded`). 1 escanea en el proceso actual; 0 usa uno por núcleo.
+                Con varios procesos, `concurrency` es el límite de cada uno.
+            rate_limiter: Límite de conexiones nuevas por segundo. Si es None, se
+                usan los límites por defecto de services.rate_limit.
+        """
+        self.ports = ports
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.on_result = on_result
+        self.fingerprint = fingerprint
+        self.processes = processes
+        self.rate_limiter = rate_limiter
+
+        self.urls: List[str] = []
+        self._results: Dict[str, Dict] = {}
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def progress(self) -> Tuple[int, int]:
+        """Tupla (DDNS terminados, DDNS totales)."""
+        with self._lock:
+            return len(self._results), len(self.urls)
+
+    @property
+    def cancelled(self) -> bool:
+        """True si se solicitó la cancelación del trabajo."""
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        """True si el trabajo terminó, ya sea completo o cancelado."""
+        return self._done_event.is_set()
+
+    def results(self) -> List[Dict]:
+        """
+        Resultados obtenidos hasta el momento, en el orden de la lista de DDNS.
+
+        Si el trabajo fue cancelado, contiene solo los DDNS que alcanzaron a terminar.
+        """
+        with self._lock:
+            return [self._results[url] for url in self.urls if url in self._results]
+
+    def cancel(self):
+        """Solicita la cancelación del trabajo. Es seguro llamarlo desde cualquier hilo."""
+        self._cancel_event.set()
+        with self._lock:
+            loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+
+    def run(self, urls: List[str]) -> List[Dict]:
+        """
+        Ejecuta el escaneo en el hilo actual hasta que termina o se cancela.
+
+        Args:
+            urls: DDNS a escanear.
+
+        Returns:
+            Resultados en el orden de `urls` (parciales si se canceló).
+        """
+        with self._lock:
+            self.urls = list(urls)
+            self._results = {}
+
+        try:
+            if self.cancelled:
+                return self.results()
+
+            loop = asyncio.new_event_loop()
+            try:
+                if self.processes == 1:
+                    scan = scan_urls(
+                        self.urls, self.ports, self.concurrency, self.timeout, self._handle_result,
+                        fingerprint=self.fingerprint, rate_limiter=self.rate_limiter
+                    )
+                else:
+                    scan = scan_urls_sharded(
+                        self.urls, self.ports, self.processes or None, self.concurrency, self.timeout,
+                        self._handle_result, fingerprint=self.fingerprint, rate_limiter=self.rate_limiter
+                    )
+                task = loop.create_task(scan)
+                with self._lock:
+                    self._loop, self._task = loop, task
+                # Una cancelación que llegó antes de registrar la tarea
+                if self.cancelled:
+                    task.cancel()
+
+                try:
+                    loop.run_until_complete(task)
+                except asyncio.CancelledError:
+                    print("[INFO] Escaneo cancelado por el usuario")
+            finally:
+                with self._lock:
+                    self._loop, self._task = None, None
+                _cancel_pending_tasks(loop)
+                loop.close()
+
+            return self.results()
+        finally:
+            self._done_event.set()
+
+    def start(self, urls: List[str],
+              on_finish: Optional[Callable[["ScanJob"], None]] = None) -> threading.Thread:
+        """
+        Ejecuta el escaneo en un hilo de fondo.
+
+        Args:
+            urls: DDNS a escanear.
+            on_finish: Callback opcional invocado con el trabajo al terminar o cancelarse.
+
+        Returns:
+            El hilo donde corre el trabajo.
+        """
+        def _target():
+            self.run(urls)
+            if on_finish:
+                on_finish(self)
+
+        self._thread = threading.Thread(target=_target, name="scan-job", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que el trabajo termine. Retorna True si terminó dentro del tiempo."""
+        return self._done_event.wait(timeout)
+
+    def _handle_result(self, item: Dict):
+        with self._lock:
+            self._results[item['url']] = item
+        if self.on_result:
+            self.on_result(item)
+
+
+def _cancel_pending_tasks(loop: asyncio.AbstractEventLoop):
+    """Cancela y espera las tareas que quedaron pendientes en el ciclo de eventos."""
+    pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
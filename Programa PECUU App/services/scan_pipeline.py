@@ -0,0 +1,143 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from services.api_service import LINK_CATALOG, ApiService
+from services.scan_engine import closed_port_states
+from services.scan_history import SCAN_HISTORY
+
+
+def open_activity_titles(activities: Optional[List[Dict]]) -> Set[str]:
+    """
+    Índice de los títulos de las actividades activas.
+
+    Args:
+        activities: Actividades con la estructura de `ApiService.get_activities()`.
+
+    Returns:
+        Conjunto de títulos (sin espacios al inicio ni al final) de las actividades activas.
+    """
+    return {
+        (actividad.get("titulo") or "").strip()
+        for actividad in activities or []
+        if actividad.get("activa", True)
+    }
+
+
+def _activity_for(link: Dict) -> Dict:
+    """
+    Construye los datos de la actividad de seguimiento de un enlace sin puertos abiertos.
+
+    El nombre y el ID del enlace se resuelven con `LINK_CATALOG.by_ddns`; si el
+    DDNS no está en el catálogo, el título usa el DDNS.
+    """
+    enlace = LINK_CATALOG.by_ddns(link['url']) or {}
+    if link['status'] == 'unreachable':
+        descripcion = f"El escaneo general detectó que el enlace {link['url']} (IP: {link['ip']}) es inalcanzable: no respondió en ninguno de los puertos monitoreados."
+    else:
+        rechazados, filtrados = closed_port_states(link)
+        descripcion = f"El escaneo general detectó que el enlace {link['url']} (IP: {link['ip']}) no tiene ningún puerto abierto en la lista de puertos monitoreados."
+        if rechazados:
+            descripcion += f" Rechazaron la conexión: {', '.join(map(str, rechazados))} (el equipo responde pero el servicio no está activo)."
+        if filtrados:
+            descripcion += f" Sin respuesta tras reintentar: {', '.join(map(str, filtrados))} (posible firewall o pérdida de paquetes)."
+    actividad = {
+        "titulo": f"Revisar: {enlace.get('nombre') or link['url']}",
+        "descripcion": descripcion,
+        "fecha": datetime.now().strftime("%Y-%m-%d")
+    }
+    if enlace.get("id"):
+        actividad["link_id"] = enlace["id"]
+    return actividad
+
+
+def create_activities_for_down_links(scan_results: List[Dict]) -> Dict[str, int]:
+    """
+    Crea una actividad de seguimiento por cada enlace sin puertos abiertos.
+
+    Antes de crear, consulta las actividades existentes y omite los enlaces que
+    ya tienen una actividad "Revisar: ..." activa con su nombre o su DDNS. Las
+    actividades restantes se crean en lote con `ApiService.create_activities_batch`.
+
+    Args:
+        scan_results: Lista de resultados con la estructura de `scan_urls`.
+
+    Returns:
+        Diccionario con el número de actividades 'creadas', 'omitidas' (duplicadas) y 'fallidas'.
+    """
+    resumen = {"creadas": 0, "omitidas": 0, "fallidas": 0}
+
+    # Filtrar los enlaces sin puertos abiertos: los que respondieron con todos
+    # los puertos cerrados y los que no respondieron en absoluto (inalcanzables)
+    no_ports_links = [
+        item for item in scan_results
+        if item['status'] in ('success', 'unreachable') and not item['open_ports']
+    ]
+
+    if not no_ports_links:
+        print("[INFO] No hay enlaces sin puertos abiertos para crear actividades")
+        return resumen
+
+    # Índice local de actividades abiertas; si no se puede obtener, se crean todas.
+    # Se revalida con la API (una petición condicional) para ver las creadas por otros usuarios
+    actividades = ApiService.get_activities(force_refresh=True)
+    if actividades is None:
+        print("[ERROR] No se pudieron obtener las actividades existentes; no se omitirán duplicados")
+    titulos_abiertos = open_activity_titles(actividades)
+
+    pendientes = []
+    for link in no_ports_links:
+        actividad_data = _activity_for(link)
+        # Las actividades anteriores pueden estar tituladas con el DDNS
+        if actividad_data["titulo"] in titulos_abiertos or f"Revisar: {link['url']}" in titulos_abiertos:
+            resumen["omitidas"] += 1
+            continue
+        # También evita duplicados dentro del mismo escaneo
+        titulos_abiertos.add(actividad_data["titulo"])
+        pendientes.append((link, actividad_data))
+
+    if resumen["omitidas"]:
+        print(f"[INFO] {resumen['omitidas']} enlaces ya tienen una actividad abierta, se omiten")
+
+    if pendientes:
+        print(f"[INFO] Creando actividades para {len(pendientes)} enlaces sin puertos abiertos")
+        resultados = ApiService.create_activities_batch([actividad_data for _, actividad_data in pendientes])
+        for (link, _), result in zip(pendientes, resultados):
+            if result["success"]:
+                resumen["creadas"] += 1
+            else:
+                resumen["fallidas"] += 1
+                print(f"[ERROR] No se pudo crear actividad para {link['url']}: {result['message']}")
+
+    print(f"[INFO] Proceso de creación de actividades completado: {resumen['creadas']} creadas, "
+          f"{resumen['omitidas']} omitidas, {resumen['fallidas']} fallidas")
+    return resumen
+
+
+def process_scan_results(scan_results: List[Dict], started_at: datetime = None, cancelled: bool = False,
+                         create_activities: bool = True):
+    """
+    Procesa los resultados de un escaneo: los guarda en el historial y crea las
+    actividades de los enlaces sin puertos abiertos.
+
+    Es el camino común de resultados para el escaneo manual, el monitoreo
+    continuo (ScanScheduler) y el escaneo sin interfaz (scan_cli).
+
+    Args:
+        scan_results: Lista de resultados de los DDNS escaneados en esta ejecución.
+        started_at: Fecha de inicio del escaneo.
+        cancelled: True si el escaneo se canceló; en ese caso no se crean actividades.
+        create_activities: Si es False, solo se guarda el historial.
+    """
+    if not scan_results:
+        return
+
+    # Guardar la ejecución en el historial de escaneos
+    try:
+        run_id = SCAN_HISTORY.save_run(scan_results, started_at, datetime.now(), cancelled=cancelled)
+        print(f"[INFO] Escaneo guardado en el historial (ejecución {run_id})")
+    except Exception as ex:
+        print(f"[ERROR] No se pudo guardar el historial de escaneo: {str(ex)}")
+
+    # Crear actividades para enlaces sin puertos abiertos (solo si el escaneo terminó)
+    if create_activities and not cancelled:
+        create_activities_for_down_links(scan_results)
@@ -0,0 +1,271 @@
+import heapq
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from services.api_service import ApiService
+from services.scan_engine import CONNECT_TIMEOUT, MAX_CONCURRENCY, PORT_LIST
+from services.scan_history import is_down
+from services.scan_jobs import ScanJob
+from services.scan_pipeline import open_activity_titles
+
+
+# Intervalos entre escaneos de un mismo DDNS, en segundos
+STABLE_INTERVAL = 900  # enlaces sanos
+FAILED_INTERVAL = 120  # enlaces que fallaron en su último escaneo
+OPEN_ACTIVITY_INTERVAL = 300  # enlaces con una actividad abierta
+SCHEDULE_JITTER = 0.1  # variación aleatoria (±10 %) para no escanear todo en el mismo instante
+LINKS_REFRESH_INTERVAL = 600  # cada cuánto se recarga la lista de enlaces y actividades
+MAX_BATCH_SIZE = 500  # DDNS máximos por ciclo de escaneo
+
+# Prioridad dentro de la cola cuando varios DDNS vencen al mismo tiempo
+PRIORITY_FAILED = 0
+PRIORITY_OPEN_ACTIVITY = 1
+PRIORITY_STABLE = 2
+
+
+def ddns_with_open_activities(activities: Optional[List[Dict]], links: List[Dict]) -> Set[str]:
+    """
+    Obtiene los DDNS que tienen una actividad abierta de tipo "Revisar: ...".
+
+    Args:
+        activities: Actividades con la estructura de `ApiService.get_activities()`.
+        links: Enlaces con la estructura de `ApiService.get_links()`.
+
+    Returns:
+        Conjunto de DDNS cuyo nombre o DDNS aparece en el título de una actividad activa.
+    """
+    titulos = open_activity_titles(activities)
+    if not titulos:
+        return set()
+
+    resultado = set()
+    for enlace in links:
+        ddns = enlace.get("ddns")
+        if not ddns:
+            continue
+        if f"Revisar: {ddns}" in titulos or (enlace.get("nombre") and f"Revisar: {enlace['nombre']}" in titulos):
+            resultado.add(ddns)
+    return resultado
+
+
+class ScanScheduler:
+    """
+    Servicio de monitoreo continuo que ejecuta el Escaneo General en segundo plano.
+
+    Cada DDNS vive en una cola de prioridad ordenada por su próximo escaneo.
+    Los enlaces que fallaron y los que tienen una actividad abierta se vuelven a
+    escanear con más frecuencia que los estables. En cada ciclo se escanean los
+    DDNS vencidos con un `ScanJob` y los resultados se entregan a `on_results`,
+    que los procesa por el mismo camino que el escaneo manual.
+    """
+
+    def __init__(self, on_results: Callable[[List[Dict], datetime, bool], None],
+                 load_links: Callable[[], Optional[List[Dict]]] = ApiService.get_links,
+                 load_activities: Callable[[], Optional[List[Dict]]] = ApiService.get_activities,
+                 stable_interval: float = STABLE_INTERVAL,
+                 failed_interval: float = FAILED_INTERVAL,
+                 open_activity_interval: float = OPEN_ACTIVITY_INTERVAL,
+                 jitter: float = SCHEDULE_JITTER,
+                 refresh_interval: float = LINKS_REFRESH_INTERVAL,
+                 batch_size: int = MAX_BATCH_SIZE,
+                 ports: Optional[List[int]] = None,
+                 concurrency: int = MAX_CONCURRENCY,
+                 timeout: float = CONNECT_TIMEOUT):
+        """
+        Args:
+            on_results: Callback invocado como on_results(resultados, inicio, cancelado)
+                al terminar cada ciclo (se ejecuta en el hilo del planificador).
+                `cancelado` es True si `stop()` interrumpió el ciclo y los
+                resultados son parciales.
+            load_links: Función que obtiene la lista de enlaces.
+            load_activities: Función que obtiene la lista de actividades.
+            stable_interval: Segundos entre escaneos de un enlace sano.
+            failed_interval: Segundos entre escaneos de un enlace caído.
+            open_activity_interval: Segundos entre escaneos de un enlace con actividad abierta.
+            jitter: Fracción de variación aleatoria aplicada a cada intervalo.
+            refresh_interval: Segundos entre recargas de enlaces y actividades.
+            batch_size: Número máximo de DDNS por ciclo.
+            ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+            concurrency: Número máximo de conexiones abiertas al mismo tiempo.
+            timeout: Tiempo máximo de espera por puerto en segundos.
+        """
+        self.on_results = on_results
+        self.load_links = load_links
+        self.load_activities = load_activities
+        self.stable_interval = stable_interval
+        self.failed_interval = failed_interval
+        self.open_activity_interval = open_activity_interval
+        self.jitter = jitter
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.ports = ports if ports is not None else PORT_LIST
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+        self._queue: List[tuple] = []
+        self._known: Set[str] = set()
+        self._failed: Set[str] = set()
+        self._open_activity: Set[str] = set()
+        self._seq = 0
+        self._next_refresh = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._current_job: Optional[ScanJob] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """True si el planificador está activo."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self) -> int:
+        """Número de DDNS en la cola de prioridad."""
+        with self._lock:
+            return len(self._queue)
+
+    def start(self):
+        """
+        Inicia el planificador en un hilo de fondo. No hace nada si ya está activo.
+
+        Si un `stop()` anterior sigue terminando su ciclo, espera a que ese
+        hilo salga antes de iniciar uno nuevo, de modo que al regresar siempre
+        queda un ciclo de monitoreo activo.
+        """
+        if self.running:
+            if not self._stop_event.is_set():
+                return
+            self._thread.join()
+        self._stop_event.clear()
+        self._next_refresh = 0.0
+        self._thread = threading.Thread(target=self._run, name="escaneo-programado", daemon=True)
+        self._thread.start()
+        print("[INFO] Monitoreo continuo iniciado")
+
+    def stop(self, wait: bool = False):
+        """
+        Detiene el planificador y cancela el ciclo de escaneo en curso.
+
+        Args:
+            wait: Si es True, espera a que el hilo termine.
+        """
+        self._stop_event.set()
+        job = self._current_job
+        if job is not None:
+            job.cancel()
+        if wait and self._thread is not None:
+            self._thread.join()
+        print("[INFO] Monitoreo continuo detenido")
+
+    def _interval_for(self, ddns: str) -> float:
+        if ddns in self._failed:
+            base = self.failed_interval
+        elif ddns in self._open_activity:
+            base = self.open_activity_interval
+        else:
+            base = self.stable_interval
+        return base * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _priority_for(self, ddns: str) -> int:
+        if ddns in self._failed:
+            return PRIORITY_FAILED
+        if ddns in self._open_activity:
+            return PRIORITY_OPEN_ACTIVITY
+        return PRIORITY_STABLE
+
+    def _push(self, ddns: str, due: float):
+        self._seq += 1
+        heapq.heappush(self._queue, (due, self._priority_for(ddns), self._seq, ddns))
+
+    def _refresh(self):
+        """Recarga enlaces y actividades; agrega los DDNS nuevos a la cola y descarta los eliminados."""
+        enlaces = self.load_links()
+        if enlaces is None:
+            print("[ERROR] Monitoreo continuo: no se pudieron obtener los enlaces")
+            return
+
+        ddns_actuales = {enlace.get("ddns") for enlace in enlaces if enlace.get("ddns")}
+        try:
+            open_activity = ddns_with_open_activities(self.load_activities(), enlaces)
+        except Exception as ex:
+            print(f"[ERROR] Monitoreo continuo: no se pudieron obtener las actividades: {str(ex)}")
+            open_activity = self._open_activity
+
+        with self._lock:
+            self._open_activity = open_activity & ddns_actuales
+            self._failed &= ddns_actuales
+            now = time.monotonic()
+            # Los DDNS nuevos se escanean de inmediato; se reconstruye la cola sin los eliminados
+            self._queue = [entry for entry in self._queue if entry[3] in ddns_actuales]
+            heapq.heapify(self._queue)
+            for ddns in sorted(ddns_actuales - self._known):
+                self._push(ddns, now)
+            self._known = ddns_actuales
+
+    def _pop_due(self) -> List[str]:
+        """Saca de la cola los DDNS vencidos, hasta `batch_size`."""
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now and len(due) < self.batch_size:
+                due.append(heapq.heappop(self._queue)[3])
+        return due
+
+    def _seconds_until_next(self) -> float:
+        with self._lock:
+            next_due = self._queue[0][0] if self._queue else float("inf")
+        return max(0.0, min(next_due, self._next_refresh) - time.monotonic())
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if time.monotonic() >= self._next_refresh:
+                try:
+                    self._refresh()
+                except Exception as ex:
+                    print(f"[ERROR] Monitoreo continuo: error al recargar enlaces: {str(ex)}")
+                self._next_refresh = time.monotonic() + self.refresh_interval
+
+            due = self._pop_due()
+            if due:
+                self._scan_batch(due)
+                continue
+
+            self._stop_event.wait(self._seconds_until_next())
+
+    def _scan_batch(self, urls: List[str]):
+        """Escanea un lote de DDNS vencidos y los vuelve a encolar según su resultado."""
+        started_at = datetime.now()
+        job = ScanJob(self.ports, self.concurrency, self.timeout)
+        self._current_job = job
+        # Un stop() que llegó antes de registrar el trabajo
+        if self._stop_event.is_set():
+            job.cancel()
+        try:
+            results = job.run(urls)
+        finally:
+            self._current_job = None
+
+        print(f"[INFO] Monitoreo continuo: {len(results)} DDNS escaneados, "
+              f"{sum(1 for item in results if is_down(item))} caídos")
+
+        scanned = {item['url'] for item in results}
+        with self._lock:
+            now = time.monotonic()
+            for item in results:
+                if is_down(item):
+                    self._failed.add(item['url'])
+                else:
+                    self._failed.discard(item['url'])
+            for url in urls:
+                if url in self._known:
+                    # Los DDNS no escaneados (ciclo cancelado) se reintentan de inmediato
+                    self._push(url, now + self._interval_for(url) if url in scanned else now)
+
+        if results:
+            try:
+                self.on_results(results, started_at, job.cancelled)
+            except Exception as ex:
+                print(f"[ERROR] Monitoreo continuo: error al procesar resultados: {str(ex)}")
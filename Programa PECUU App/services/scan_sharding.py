@@ -0,0 +1,155 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.rate_limit import RateLimiter
+from services.scan_engine import CONNECT_TIMEOUT, MAX_CONCURRENCY, scan_urls_sync
+
+
+SHARD_SIZE = 250  # DDNS por fragmento; fragmentos pequeños reparten mejor la carga y reportan progreso antes
+
+
+def default_processes() -> int:
+    """Número de procesos por defecto: uno por núcleo disponible."""
+    return os.cpu_count() or 1
+
+
+def _init_worker():
+    """Sube el límite de descriptores de archivo del proceso hasta el máximo permitido."""
+    try:
+        import resource
+    except ImportError:  # Windows no tiene el módulo resource
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _scan_shard(start: int, urls: List[str], ports: Optional[List[int]], concurrency: int,
+                timeout: float, fingerprint: bool,
+                rate_limiter: Optional[RateLimiter]) -> Tuple[int, List[Dict]]:
+    """Escanea un fragmento en un proceso del pool con su propio ciclo de eventos y caché DNS."""
+    return start, scan_urls_sync(urls, ports, concurrency, timeout, fingerprint=fingerprint,
+                                 rate_limiter=rate_limiter)
+
+
+def _shard_error_results(urls: List[str], error: str) -> List[Dict]:
+    return [
+        {
+            'url': url,
+            'ip': '-',
+            'open_ports': [],
+            'closed_ports': [],
+            'status': 'error',
+            'error': error
+        }
+        for url in urls
+    ]
+
+
+async def scan_urls_sharded(urls: List[str], ports: Optional[List[int]] = None,
+                            processes: Optional[int] = None, concurrency: int = MAX_CONCURRENCY,
+                            timeout: float = CONNECT_TIMEOUT,
+                            on_result: Optional[Callable[[Dict], None]] = None,
+                            fingerprint: bool = False, shard_size: int = SHARD_SIZE,
+                            rate_limiter: Optional[RateLimiter] = None) -> List[Dict]:
+    """
+    Escanea una lista de DDNS repartida en un pool de procesos.
+
+    Los DDNS repetidos se escanean una sola vez. La lista sin repetidos se
+    divide en fragmentos de `shard_size` DDNS que se reparten entre
+    `processes` procesos. Cada proceso ejecuta `scan_urls` con su propio
+    límite de `concurrency` conexiones, por lo que el total de conexiones
+    simultáneas es hasta processes × concurrency. Los resultados se combinan
+    en el orden de `urls` y con la misma estructura que `scan_urls`.
+
+    Args:
+        urls: DDNS a escanear.
+        ports: Lista de puertos a escanear. Si es None, usa PORT_LIST.
+        processes: Número de procesos. Si es None, uno por núcleo.
+        concurrency: Conexiones simultáneas máximas por proceso.
+        timeout: Tiempo máximo de espera por puerto en segundos.
+        on_result: Callback opcional invocado una vez por DDNS distinto cuando
+            termina el fragmento que lo contiene.
+        fingerprint: Si es True, identifica los servicios HTTP/RTSP de los puertos abiertos.
+        shard_size: DDNS por fragmento.
+        rate_limiter: Límite de conexiones nuevas por segundo de todo el
+            escaneo. Cada fragmento recibe `rate_limiter.share(processes)`:
+            los límites por red y global se dividen entre los procesos para
+            que su suma no supere el total, y el límite por IP se aplica igual
+            en cada proceso. Si es None, se usan los límites por defecto.
+
+    Returns:
+        Lista de diccionarios de resultado en el mismo orden que `urls`, con
+        un resultado por cada posición (también las repetidas). Si un proceso
+        falla, los DDNS de su fragmento se reportan con estado 'error'.
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+
+    # Los repetidos ocuparían dos veces la concurrencia y el límite por IP
+    unique_urls = list(dict.fromkeys(urls))
+    shard_size = max(1, shard_size)
+    shards = [(start, unique_urls[start:start + shard_size])
+              for start in range(0, len(unique_urls), shard_size)]
+    processes = max(1, min(processes or default_processes(), len(shards)))
+    results: List[Optional[Dict]] = [None] * len(unique_urls)
+    shard_limiter = (rate_limiter if rate_limiter is not None else RateLimiter()).share(processes)
+
+    loop = asyncio.get_running_loop()
+    # "spawn" evita heredar los hilos de la interfaz en procesos creados con fork
+    executor = ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    )
+
+    async def _run_shard(start, shard):
+        try:
+            return await loop.run_in_executor(
+                executor, _scan_shard, start, shard, ports, concurrency, timeout, fingerprint, shard_limiter
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            print(f"[ERROR] Falló el fragmento de escaneo {start}-{start + len(shard) - 1}: {str(ex)}")
+            return start, _shard_error_results(shard, f"Error en el proceso de escaneo: {str(ex)}")
+
+    print(f"[INFO] Escaneo repartido: {len(unique_urls)} DDNS en {len(shards)} fragmentos y {processes} procesos")
+    try:
+        for completed in asyncio.as_completed([_run_shard(start, shard) for start, shard in shards]):
+            start, shard_results = await completed
+            results[start:start + len(shard_results)] = shard_results
+            if on_result:
+                for result in shard_results:
+                    on_result(result)
+    finally:
+        # Al cancelar, los fragmentos en espera se descartan; los que ya corren terminan solos
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if len(unique_urls) == len(urls):
+        return results
+    by_url = dict(zip(unique_urls, results))
+    return [dict(by_url[url]) for url in urls]
+
+
+def scan_urls_sharded_sync(urls: List[str], ports: Optional[List[int]] = None,
+                           processes: Optional[int] = None, concurrency: int = MAX_CONCURRENCY,
+                           timeout: float = CONNECT_TIMEOUT,
+                           on_result: Optional[Callable[[Dict], None]] = None,
+                           fingerprint: bool = False, shard_size: int = SHARD_SIZE,
+                           rate_limiter: Optional[RateLimiter] = None) -> List[Dict]:
+    """
+    Versión síncrona de `scan_urls_sharded`.
+
+    Returns:
+        Lista de diccionarios de resultado en el mismo orden que `urls`.
+    """
+    return asyncio.run(scan_urls_sharded(urls, ports, processes, concurrency, timeout, on_result,
+                                         fingerprint, shard_size, rate_limiter))
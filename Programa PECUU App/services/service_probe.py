@@ -0,0 +1,201 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from services.rate_limit import RateLimiter
+
+
+# Puertos donde se identifica el servicio y protocolo que se usa en cada uno
+HTTP_PORTS = [80, 81, 82, 83, 84, 85, 86, 87, 88]
+RTSP_PORTS = [554]
+
+PROBE_TIMEOUT = 2  # segundos para conectar, enviar y leer la respuesta completa
+PROBE_MAX_BYTES = 4096  # bytes máximos leídos por sondeo; solo interesan los encabezados
+MAX_FIELD_LENGTH = 120  # caracteres máximos guardados de la línea de estado y del banner
+
+USER_AGENT = "SGCC-Escaner/1.0"
+
+
+def probe_protocol(port: int) -> Optional[str]:
+    """
+    Protocolo con el que se sondea un puerto.
+
+    Args:
+        port: Puerto TCP.
+
+    Returns:
+        'http', 'rtsp' o None si el puerto no se sondea.
+    """
+    if port in HTTP_PORTS:
+        return "http"
+    if port in RTSP_PORTS:
+        return "rtsp"
+    return None
+
+
+def _build_request(protocol: str, ip_addr: str, port: int) -> bytes:
+    if protocol == "rtsp":
+        request = (
+            f"OPTIONS rtsp://{ip_addr}:{port}/ RTSP/1.0\r\n"
+            f"CSeq: 1\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            f"\r\n"
+        )
+    else:
+        request = (
+            f"HEAD / HTTP/1.0\r\n"
+            f"Host: {ip_addr}:{port}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            f"Connection: close\r\n"
+            f"\r\n"
+        )
+    return request.encode("ascii")
+
+
+async def _read_headers(reader: asyncio.StreamReader, max_bytes: int) -> bytes:
+    """Lee hasta el fin de los encabezados, el cierre de la conexión o `max_bytes`."""
+    data = b""
+    while len(data) < max_bytes and b"\r\n\r\n" not in data:
+        chunk = await reader.read(max_bytes - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data[:max_bytes]
+
+
+def parse_response(data: bytes) -> Dict:
+    """
+    Extrae la línea de estado y el encabezado Server de una respuesta HTTP/RTSP.
+
+    Args:
+        data: Bytes recibidos (al menos el inicio de los encabezados).
+
+    Returns:
+        Diccionario con 'status_line', 'status_code' (int o None) y 'server' (str o None).
+    """
+    text = data.split(b"\r\n\r\n", 1)[0].decode("latin-1", errors="replace")
+    lines = text.splitlines()
+    status_line = lines[0].strip()[:MAX_FIELD_LENGTH] if lines else ""
+
+    status_code = None
+    partes = status_line.split(None, 2)
+    if len(partes) >= 2 and partes[0].upper().startswith(("HTTP/", "RTSP/")) and partes[1].isdigit():
+        status_code = int(partes[1])
+
+    server = None
+    for line in lines[1:]:
+        nombre, _, valor = line.partition(":")
+        if nombre.strip().lower() == "server":
+            server = valor.strip()[:MAX_FIELD_LENGTH]
+            break
+
+    return {"status_line": status_line, "status_code": status_code, "server": server}
+
+
+async def probe_service(ip_addr: str, port: int, semaphore: asyncio.Semaphore,
+                        timeout: float = PROBE_TIMEOUT, max_bytes: int = PROBE_MAX_BYTES,
+                        limiter: Optional[RateLimiter] = None, domain: Optional[str] = None) -> Optional[Dict]:
+    """
+    Sondea el servicio de un puerto abierto con una petición mínima.
+
+    Envía `HEAD /` a los puertos HTTP y `OPTIONS` a los puertos RTSP, y lee a lo
+    sumo `max_bytes` de la respuesta. Todo el intercambio (conexión, envío y
+    lectura) debe terminar dentro de `timeout`.
+
+    Args:
+        ip_addr: Dirección IP (v4) del host.
+        port: Puerto abierto a sondear.
+        semaphore: Semáforo compartido que limita las conexiones simultáneas.
+        timeout: Tiempo máximo del sondeo completo en segundos.
+        max_bytes: Bytes máximos a leer de la respuesta.
+        limiter: Límite opcional de conexiones nuevas por segundo.
+        domain: DDNS del host, para agrupar el límite por proveedor.
+
+    Returns:
+        Diccionario con 'port', 'protocol', 'status_line', 'status_code' y
+        'server'; si el servicio no respondió, 'status_line' es None y se
+        incluye 'error'. Regresa None si el puerto no tiene sondeo.
+    """
+    protocol = probe_protocol(port)
+    if protocol is None:
+        return None
+
+    resultado = {"port": port, "protocol": protocol, "status_line": None, "status_code": None, "server": None}
+
+    async def _exchange():
+        reader, writer = await asyncio.open_connection(ip_addr, port)
+        try:
+            writer.write(_build_request(protocol, ip_addr, port))
+            await writer.drain()
+            return await _read_headers(reader, max_bytes)
+        finally:
+            writer.close()
+
+    if limiter is not None:
+        await limiter.acquire(ip_addr, domain)
+    async with semaphore:
+        try:
+            data = await asyncio.wait_for(_exchange(), timeout)
+        except asyncio.TimeoutError:
+            resultado["error"] = "Sin respuesta del servicio"
+            return resultado
+        except OSError as ex:
+            resultado["error"] = f"Conexión fallida: {ex.strerror or str(ex)}"
+            return resultado
+
+    if not data:
+        resultado["error"] = "El servicio cerró la conexión sin responder"
+        return resultado
+
+    resultado.update(parse_response(data))
+    if resultado["status_code"] is None:
+        resultado["error"] = "Respuesta no reconocida"
+    return resultado
+
+
+async def fingerprint_host(ip_addr: str, open_ports: List[int], semaphore: asyncio.Semaphore,
+                           timeout: float = PROBE_TIMEOUT, max_bytes: int = PROBE_MAX_BYTES,
+                           limiter: Optional[RateLimiter] = None, domain: Optional[str] = None) -> List[Dict]:
+    """
+    Sondea de forma concurrente los puertos abiertos de un host que tienen sondeo.
+
+    Args:
+        ip_addr: Dirección IP (v4) del host.
+        open_ports: Puertos abiertos del host.
+        semaphore: Semáforo compartido que limita las conexiones simultáneas.
+        timeout: Tiempo máximo de cada sondeo en segundos.
+        max_bytes: Bytes máximos a leer de cada respuesta.
+        limiter: Límite opcional de conexiones nuevas por segundo.
+        domain: DDNS del host, para agrupar el límite por proveedor.
+
+    Returns:
+        Lista de resultados de `probe_service`, en el orden de `open_ports`.
+    """
+    puertos = [port for port in open_ports if probe_protocol(port)]
+    resultados = await asyncio.gather(*(
+        probe_service(ip_addr, port, semaphore, timeout, max_bytes, limiter, domain) for port in puertos
+    ))
+    return [resultado for resultado in resultados if resultado is not None]
+
+
+def format_services(services: Optional[List[Dict]]) -> str:
+    """
+    Texto de una línea con los servicios identificados, para tarjetas y reportes.
+
+    Args:
+        services: Lista de resultados de `probe_service`.
+
+    Returns:
+        Texto como "80: HTTP/1.1 200 OK (lighttpd); 554: sin respuesta", o "-" si no hay.
+    """
+    if not services:
+        return "-"
+    partes = []
+    for service in services:
+        if service.get("status_line") and service.get("status_code") is not None:
+            texto = service["status_line"]
+            if service.get("server"):
+                texto += f" ({service['server']})"
+        else:
+            texto = (service.get("error") or "sin respuesta").lower()
+        partes.append(f"{service['port']}: {texto}")
+    return "; ".join(partes)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Las pruebas importan `services` y `benchmarks` desde la carpeta de la aplicación
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,157 @@
+"""
+Pruebas de la creación en lote de ApiService contra la API simulada.
+
+Cubren el endpoint masivo (`bulk=True`), el respaldo con peticiones
+individuales (`bulk=False`) y las respuestas del endpoint masivo que no se
+pueden usar.
+"""
+import asyncio
+
+import pytest
+
+from benchmarks.stub_api import StubApiServer
+from services.api_service import ApiService
+
+BULK_PATH = "/sgcc-backend/api/activities/bulk"
+SINGLE_PATH = "/sgcc-backend/api/activities"
+
+
+def _actividades(n, sin_titulo=()):
+    return [
+        {"titulo": "" if i in sin_titulo else f"Actividad {i}", "descripcion": f"descripcion {i}"}
+        for i in range(n)
+    ]
+
+
+class _FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+@pytest.fixture
+def stub_api():
+    """Levanta la API simulada y apunta ApiService a ella; `bulk` se elige en cada prueba."""
+    servers = []
+    original_url = ApiService.BASE_URL
+
+    def start(bulk):
+        srv = StubApiServer([], bulk=bulk)
+        srv.start()
+        servers.append(srv)
+        ApiService.BASE_URL = srv.base_url
+        return srv
+
+    ApiService._bulk_supported = {"links": None, "activities": None}
+    ApiService.invalidate_cache()
+    ApiService._circuit.reset()
+    yield start
+
+    for srv in servers:
+        srv.stop()
+    ApiService.BASE_URL = original_url
+    ApiService._bulk_supported = {"links": None, "activities": None}
+    ApiService.invalidate_cache()
+    ApiService._circuit.reset()
+    ApiService.close_session()
+
+
+def test_bulk_endpoint_creates_all_records_in_order(stub_api):
+    srv = stub_api(bulk=True)
+    registros = _actividades(ApiService.BULK_CHUNK_SIZE + 5, sin_titulo={3})
+
+    results = ApiService.create_activities_batch(registros)
+
+    assert len(results) == len(registros)
+    assert srv.requests[("POST", BULK_PATH)] == 2
+    assert srv.requests[("POST", SINGLE_PATH)] == 0
+    assert not results[3]["success"]
+    for i, result in enumerate(results):
+        if i != 3:
+            assert result["success"]
+            assert result["data"]["title"] == f"Actividad {i}"
+    assert ApiService._bulk_supported["activities"] is True
+
+
+def test_missing_bulk_endpoint_falls_back_to_single_requests(stub_api):
+    srv = stub_api(bulk=False)
+    registros = _actividades(10, sin_titulo={7})
+
+    results = ApiService.create_activities_batch(registros)
+
+    assert srv.requests[("POST", BULK_PATH)] == 1
+    assert srv.requests[("POST", SINGLE_PATH)] == 10
+    assert [r["success"] for r in results] == [i != 7 for i in range(10)]
+    assert [r["data"]["title"] for r in results if r["success"]] == [
+        f"Actividad {i}" for i in range(10) if i != 7
+    ]
+    assert ApiService._bulk_supported["activities"] is False
+
+    # Los lotes siguientes ya no prueban el endpoint masivo
+    ApiService.create_activities_batch(_actividades(3))
+    assert srv.requests[("POST", BULK_PATH)] == 1
+
+
+@pytest.mark.parametrize("status", [400, 422, 500])
+def test_error_on_first_bulk_probe_falls_back(stub_api, monkeypatch, status):
+    srv = stub_api(bulk=True)
+    original_request = ApiService._request
+
+    def request(method, url, **kwargs):
+        if url.endswith("/bulk"):
+            return _FakeResponse(status, {"error": "sin soporte"})
+        return original_request(method, url, **kwargs)
+
+    monkeypatch.setattr(ApiService, "_request", staticmethod(request))
+
+    results = ApiService.create_activities_batch(_actividades(4))
+
+    assert all(r["success"] for r in results)
+    assert srv.requests[("POST", SINGLE_PATH)] == 4
+    assert ApiService._bulk_supported["activities"] is False
+
+
+def test_error_after_bulk_confirmed_fails_chunk(stub_api, monkeypatch):
+    srv = stub_api(bulk=True)
+    ApiService._bulk_supported["activities"] = True
+    monkeypatch.setattr(ApiService, "_request", staticmethod(lambda method, url, **kwargs: _FakeResponse(500, None)))
+
+    results = ApiService.create_activities_batch(_actividades(3))
+
+    assert [r["message"] for r in results] == ["Error HTTP 500"] * 3
+    assert srv.requests[("POST", SINGLE_PATH)] == 0
+    assert ApiService._bulk_supported["activities"] is True
+
+
+@pytest.mark.parametrize("body", [{"ok": True}, [], [{"id": 1}], "creado", [1, 2, 3]])
+def test_unrecognised_bulk_body_is_reported_as_failure(stub_api, monkeypatch, body):
+    stub_api(bulk=True)
+    monkeypatch.setattr(ApiService, "_request", staticmethod(lambda method, url, **kwargs: _FakeResponse(200, body)))
+
+    results = ApiService.create_activities_batch(_actividades(3))
+
+    assert len(results) == 3
+    assert not any(r["success"] for r in results)
+    assert ApiService._bulk_supported["activities"] is False
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_async_client_matches_sync_client(stub_api, bulk):
+    pytest.importorskip("httpx")
+    from services.api_service_async import AsyncApiService
+
+    srv = stub_api(bulk=bulk)
+    registros = _actividades(6, sin_titulo={2})
+
+    async def crear():
+        async with AsyncApiService() as api:
+            return await api.create_activities_batch(registros)
+
+    results = asyncio.run(crear())
+
+    assert [r["success"] for r in results] == [i != 2 for i in range(6)]
+    assert srv.requests[("POST", BULK_PATH)] == 1
+    assert srv.requests[("POST", SINGLE_PATH)] == (0 if bulk else 6)
@@ -0,0 +1,194 @@
+"""
+Pruebas del interruptor de circuito de api_resilience y de su uso en ApiService._request
+y AsyncApiService._request.
+"""
+import asyncio
+import time
+
+import pytest
+import requests
+
+from services import api_resilience
+from services.api_resilience import (
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, BackendUnavailableError, CircuitBreaker
+)
+from services.api_service import ApiService
+
+RESET_TIMEOUT = 0.05
+
+
+class _FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class _FakeSession:
+    """Sesión que responde con los elementos de `outcomes` en orden (excepción o código HTTP)."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else 200
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return _FakeResponse(outcome)
+
+
+@pytest.fixture
+def circuit(monkeypatch):
+    """Circuito propio de ApiService con umbral 2 y espera corta, sin reintentos ni esperas."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=RESET_TIMEOUT)
+    monkeypatch.setattr(ApiService, "_circuit", breaker)
+    monkeypatch.setattr(api_resilience, "MAX_RETRIES", 0)
+    return breaker
+
+
+def _use_session(monkeypatch, session):
+    monkeypatch.setattr(ApiService, "_get_session", staticmethod(lambda: session))
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_after() > 0
+
+
+def test_success_resets_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=RESET_TIMEOUT)
+    breaker.record_failure()
+    time.sleep(RESET_TIMEOUT * 2)
+
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_half_open_trial_success_closes_and_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=RESET_TIMEOUT)
+    breaker.record_failure()
+    time.sleep(RESET_TIMEOUT * 2)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+    time.sleep(RESET_TIMEOUT * 2)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow_request() and breaker.allow_request()
+
+
+def test_request_opens_circuit_and_rejects_without_network(monkeypatch, circuit):
+    session = _FakeSession(requests.exceptions.ConnectionError("caído"), requests.exceptions.ReadTimeout("lento"))
+    _use_session(monkeypatch, session)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        ApiService._request("GET", f"{ApiService.BASE_URL}/links.json")
+    with pytest.raises(requests.exceptions.Timeout):
+        ApiService._request("GET", f"{ApiService.BASE_URL}/links.json")
+    assert circuit.state == CIRCUIT_OPEN
+
+    with pytest.raises(BackendUnavailableError):
+        ApiService._request("GET", f"{ApiService.BASE_URL}/links.json")
+    assert session.calls == 2
+
+
+def test_server_errors_count_as_failures(monkeypatch, circuit):
+    _use_session(monkeypatch, _FakeSession(500, 500))
+
+    assert ApiService._request("POST", f"{ApiService.BASE_URL}/links").status_code == 500
+    assert ApiService._request("POST", f"{ApiService.BASE_URL}/links").status_code == 500
+    assert circuit.state == CIRCUIT_OPEN
+
+
+def test_half_open_trial_recovers_through_request(monkeypatch, circuit):
+    circuit.record_failure()
+    circuit.record_failure()
+    _use_session(monkeypatch, _FakeSession(200))
+    time.sleep(RESET_TIMEOUT * 2)
+
+    assert ApiService._request("GET", f"{ApiService.BASE_URL}/links.json").status_code == 200
+    assert circuit.state == CIRCUIT_CLOSED
+
+
+@pytest.mark.parametrize("error", [
+    requests.exceptions.ChunkedEncodingError("cuerpo cortado"),
+    requests.exceptions.TooManyRedirects("redirecciones"),
+    requests.exceptions.InvalidHeader("encabezado"),
+    ValueError("adaptador"),
+])
+def test_unexpected_error_releases_half_open_trial(monkeypatch, circuit, error):
+    circuit.record_failure()
+    circuit.record_failure()
+    session = _FakeSession(error, 200)
+    _use_session(monkeypatch, session)
+    time.sleep(RESET_TIMEOUT * 2)
+
+    with pytest.raises(type(error)):
+        ApiService._request("GET", f"{ApiService.BASE_URL}/links.json")
+    assert circuit.state == CIRCUIT_OPEN
+
+    # La siguiente petición de prueba llega a la sesión y cierra el circuito
+    time.sleep(RESET_TIMEOUT * 2)
+    assert ApiService._request("GET", f"{ApiService.BASE_URL}/links.json").status_code == 200
+    assert session.calls == 2
+    assert circuit.state == CIRCUIT_CLOSED
+
+
+class _HangingClient:
+    """Cliente httpx simulado cuya primera petición no termina nunca."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def request(self, method, url, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(3600)
+        return _FakeResponse(200)
+
+
+def test_async_cancelled_request_releases_half_open_trial(monkeypatch, circuit):
+    pytest.importorskip("httpx")
+    from services.api_service_async import AsyncApiService
+
+    circuit.record_failure()
+    circuit.record_failure()
+    time.sleep(RESET_TIMEOUT * 2)
+
+    async def run():
+        async with AsyncApiService() as api:
+            hanging = _HangingClient()
+            api._client, real_client = hanging, api._client
+            try:
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(api._request("GET", f"{ApiService.BASE_URL}/links.json"), 0.05)
+                assert circuit.state == CIRCUIT_OPEN
+
+                await asyncio.sleep(RESET_TIMEOUT * 2)
+                response = await api._request("GET", f"{ApiService.BASE_URL}/links.json")
+                assert response.status_code == 200
+                assert hanging.calls == 2
+            finally:
+                api._client = real_client
+
+    asyncio.run(run())
+    assert circuit.state == CIRCUIT_CLOSED
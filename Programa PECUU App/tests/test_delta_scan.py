@@ -0,0 +1,53 @@
+"""
+Pruebas de la planificación del escaneo delta.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.scan_history import ScanHistory, plan_delta_scan
+
+
+def _result(ddns, open_ports=(80,), status="success"):
+    return {"url": ddns, "ip": "10.0.0.1", "open_ports": list(open_ports), "closed_ports": [], "status": status}
+
+
+@pytest.fixture
+def history(tmp_path):
+    return ScanHistory(str(tmp_path / "historial.db"))
+
+
+def test_delta_reuses_only_recent_healthy_results(history):
+    ahora = datetime.now()
+    history.save_run([_result("viejo.ddns.net")], finished_at=ahora - timedelta(hours=2))
+    history.save_run([
+        _result("sano.ddns.net"),
+        _result("sin-puertos.ddns.net", open_ports=()),
+        _result("error.ddns.net", open_ports=(), status="dns_error"),
+    ], finished_at=ahora)
+
+    urls = ["nuevo.ddns.net", "sano.ddns.net", "viejo.ddns.net", "sin-puertos.ddns.net", "error.ddns.net"]
+    to_scan, reused = plan_delta_scan(urls, history, max_age=3600)
+
+    assert to_scan == ["nuevo.ddns.net", "viejo.ddns.net", "sin-puertos.ddns.net", "error.ddns.net"]
+    assert list(reused) == ["sano.ddns.net"]
+    assert reused["sano.ddns.net"]["from_history"] is True
+    assert reused["sano.ddns.net"]["open_ports"] == [80]
+
+
+def test_delta_uses_latest_result_of_each_ddns(history):
+    ahora = datetime.now()
+    history.save_run([_result("a.ddns.net", open_ports=())], finished_at=ahora - timedelta(minutes=5))
+    history.save_run([_result("a.ddns.net")], finished_at=ahora)
+    history.save_run([_result("b.ddns.net")], finished_at=ahora - timedelta(minutes=5))
+    history.save_run([_result("b.ddns.net", open_ports=())], finished_at=ahora)
+
+    to_scan, reused = plan_delta_scan(["a.ddns.net", "b.ddns.net"], history)
+
+    assert to_scan == ["b.ddns.net"]
+    assert list(reused) == ["a.ddns.net"]
+
+
+def test_delta_with_empty_history_scans_everything(history):
+    urls = ["a.ddns.net", "b.ddns.net"]
+    assert plan_delta_scan(urls, history) == (urls, {})
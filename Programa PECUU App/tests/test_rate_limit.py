@@ -0,0 +1,64 @@
+"""
+Pruebas de la cubeta de fichas y del reparto de límites de conexión.
+"""
+import asyncio
+import time
+
+import pytest
+
+from services.rate_limit import RateLimiter, TokenBucket, provider_domain
+
+
+def test_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    esperas = [bucket.reserve() for _ in range(2)]
+    assert esperas[0] == pytest.approx(0.1, abs=0.02)
+    assert esperas[1] == pytest.approx(0.2, abs=0.02)
+
+
+def test_limiter_applies_global_rate():
+    limiter = RateLimiter(host_rate=None, global_rate=50, global_burst=1)
+
+    async def run():
+        started = time.monotonic()
+        for i in range(6):
+            await limiter.acquire(f"10.0.{i}.1")
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_network_key_groups_by_prefix_or_domain():
+    assert RateLimiter().network_key("10.1.2.3") == "10.1.2.0/24"
+    assert RateLimiter(group_by="domain").network_key("10.1.2.3", "cam1.midominio.com.mx") == "midominio.com.mx"
+    assert provider_domain("camara.ddns.net") == "ddns.net"
+    assert provider_domain("10.0.0.1") is None
+    with pytest.raises(ValueError):
+        RateLimiter(group_by="pais")
+
+
+def test_share_splits_network_and_global_budgets():
+    limiter = RateLimiter(host_rate=10, host_burst=4, network_rate=20, network_burst=16,
+                          global_rate=100, global_burst=256)
+
+    share = limiter.share(4)
+
+    assert share.network_rate == 5 and share.network_burst == 4
+    assert share.global_rate == 25 and share.global_burst == 64
+    # El límite por IP no se divide: cada DDNS se escanea en un solo proceso
+    assert share.host_rate == 10 and share.host_burst == 4
+    assert limiter.global_rate == 100
+
+
+def test_share_keeps_unlimited_and_minimum_burst():
+    share = RateLimiter(network_rate=None, global_rate=8, global_burst=2).share(8)
+    assert share.network_rate is None
+    assert share.global_rate == 1 and share.global_burst == 1
+    assert RateLimiter(global_rate=8).share(0).global_rate == 8
+
+
+def test_limits_round_trip():
+    limiter = RateLimiter(global_rate=30, group_by="domain")
+    copia = RateLimiter.from_limits(dict(limiter.limits(), desconocida=1))
+    assert copia.limits() == limiter.limits()
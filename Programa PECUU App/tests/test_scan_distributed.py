@@ -0,0 +1,112 @@
+"""
+Pruebas del coordinador y los trabajadores del escaneo distribuido sobre loopback.
+
+`scan_urls` se reemplaza por un escaneo simulado para no depender de la red.
+"""
+import asyncio
+
+import pytest
+
+from services import scan_distributed
+from services.scan_distributed import ScanCoordinator, _receive, _send, run_worker
+
+URLS = [f"h{i}.ddns.net" for i in range(5)]
+TOKEN = "secreto"
+
+
+def _result(url, status="success"):
+    return {"url": url, "ip": "10.0.0.1", "open_ports": [80], "closed_ports": [81], "status": status}
+
+
+@pytest.fixture(autouse=True)
+def fake_scan(monkeypatch):
+    async def scan_urls(urls, ports=None, concurrency=None, timeout=None, fingerprint=False, rate_limiter=None):
+        return [_result(url) for url in urls]
+    monkeypatch.setattr(scan_distributed, "scan_urls", scan_urls)
+
+
+async def _start(**kwargs):
+    coordinator = ScanCoordinator(port=0, token=TOKEN, unit_size=2, **kwargs)
+    await coordinator.start()
+    host, port = coordinator.address
+    return coordinator, host, port
+
+
+async def _misbehaving_worker(host, port, reply):
+    """Recibe una unidad y responde con `reply(unidad)`, o cierra la conexión si regresa None."""
+    reader, writer = await asyncio.open_connection(host, port)
+    await _send(writer, {"type": "hello", "worker": "malo", "token": TOKEN})
+    unit = await _receive(reader, 5)
+    message = reply(unit)
+    if message is not None:
+        await _send(writer, message)
+        await _receive(reader, 5)
+    writer.close()
+
+
+def test_start_refuses_public_address_without_token():
+    with pytest.raises(ValueError):
+        asyncio.run(ScanCoordinator(host="0.0.0.0", port=0).start())
+
+
+def test_workers_complete_all_units_in_order():
+    async def run():
+        coordinator, host, port = await _start()
+        scan = asyncio.ensure_future(coordinator.run(URLS))
+        scanned = await asyncio.gather(*(run_worker(host, port, f"w{i}", TOKEN, once=True) for i in range(2)))
+        return await scan, scanned, coordinator
+
+    results, scanned, coordinator = asyncio.run(run())
+
+    assert [item['url'] for item in results] == URLS
+    assert sum(scanned) == 3
+    assert sum(coordinator.units_by_worker.values()) == 3
+
+
+def test_worker_with_wrong_token_gets_no_work():
+    async def run():
+        coordinator, host, port = await _start()
+        scan = asyncio.ensure_future(coordinator.run(URLS))
+        rejected = await run_worker(host, port, "intruso", "otro", once=True)
+        accepted = await run_worker(host, port, "bueno", TOKEN, once=True)
+        return await scan, rejected, accepted
+
+    results, rejected, accepted = asyncio.run(run())
+
+    assert rejected == 0
+    assert accepted == 3
+    assert all(item['status'] == 'success' for item in results)
+
+
+@pytest.mark.parametrize("reply", [
+    lambda unit: None,  # se desconecta a media unidad
+    lambda unit: {"type": "result", "unit_id": unit["unit_id"], "results": [_result(url, "hacked") for url in unit["urls"]]},
+    lambda unit: {"type": "result", "unit_id": unit["unit_id"], "results": [_result("otro.ddns.net")]},
+])
+def test_failed_unit_is_requeued_to_another_worker(reply):
+    async def run():
+        coordinator, host, port = await _start()
+        scan = asyncio.ensure_future(coordinator.run(URLS))
+        await _misbehaving_worker(host, port, reply)
+        await run_worker(host, port, "bueno", TOKEN, once=True)
+        return await scan
+
+    results = asyncio.run(run())
+
+    assert [item['url'] for item in results] == URLS
+    assert all(item['status'] == 'success' for item in results)
+
+
+def test_unit_reported_as_error_after_max_attempts():
+    async def run():
+        coordinator, host, port = await _start(max_attempts=2)
+        scan = asyncio.ensure_future(coordinator.run(URLS[:2]))
+        await _misbehaving_worker(host, port, lambda unit: None)
+        await _misbehaving_worker(host, port, lambda unit: None)
+        return await asyncio.wait_for(scan, 5)
+
+    results = asyncio.run(run())
+
+    assert [item['url'] for item in results] == URLS[:2]
+    assert all(item['status'] == 'error' for item in results)
+    assert all(item['error'].startswith("Escaneo distribuido fallido") for item in results)
@@ -0,0 +1,65 @@
+"""
+Pruebas del escaneo adaptativo contra los hosts simulados en loopback.
+"""
+import asyncio
+
+import pytest
+
+from benchmarks.simulated_network import BENCH_PORTS, PORT_OFFSET, SimulatedNetwork
+from services import scan_engine
+from services.scan_engine import first_wave, scan_host_adaptive
+
+TIMEOUT = 0.5
+
+
+@pytest.fixture(scope="module")
+def network():
+    net = SimulatedNetwork(open_hosts=1, refused_hosts=1, blackholed_hosts=1, partial_hosts=1)
+    net.start()
+    yield net
+    net.stop()
+
+
+def _scan(ip_addr, ports=BENCH_PORTS):
+    async def run():
+        return await scan_host_adaptive(ip_addr, asyncio.Semaphore(64), ports, TIMEOUT, retry_timeout=TIMEOUT)
+    return asyncio.run(run())
+
+
+def test_first_wave_spreads_across_port_groups():
+    assert first_wave(scan_engine.PORT_LIST, 4) == [80, 554, 1024, 81]
+    assert first_wave([80, 81], 4) == [80, 81]
+    assert first_wave([], 4) == []
+
+
+def test_open_and_refused_hosts(network):
+    abierto = _scan(network.open_hosts[0])
+    assert abierto['reachable']
+    assert abierto['open_ports'] == [80 + PORT_OFFSET, 554 + PORT_OFFSET]
+    assert abierto['filtered_ports'] == []
+
+    rechazado = _scan(network.refused_hosts[0])
+    assert rechazado['reachable']
+    assert rechazado['open_ports'] == []
+    assert rechazado['refused_ports'] == BENCH_PORTS
+
+
+def test_blackholed_host_is_unreachable(network):
+    resultado = _scan(network.blackholed_hosts[0])
+    assert not resultado['reachable']
+    assert resultado['open_ports'] == [] and resultado['closed_ports'] == []
+
+
+def test_host_dropping_http_ports_is_reachable_through_rtsp(network):
+    resultado = _scan(network.partial_hosts[0])
+    assert resultado['reachable']
+    assert resultado['open_ports'] == [554 + PORT_OFFSET]
+    assert resultado['filtered_ports'] == [port + PORT_OFFSET for port in (80, 81, 82, 83)]
+
+
+def test_silent_first_wave_still_probes_remaining_ports(network, monkeypatch):
+    # Con una ola de un solo puerto (80, descartado) el resto debe probarse antes de declarar el host caído
+    monkeypatch.setattr(scan_engine, "PROBE_WAVE", 1)
+    resultado = _scan(network.partial_hosts[0])
+    assert resultado['reachable']
+    assert resultado['open_ports'] == [554 + PORT_OFFSET]
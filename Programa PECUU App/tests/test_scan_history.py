@@ -0,0 +1,83 @@
+"""
+Pruebas del historial de escaneos en SQLite.
+"""
+import sqlite3
+
+import pytest
+
+from services import scan_history
+from services.scan_history import ScanHistory
+
+
+def _result(ddns, open_ports=(80,), status="success", **extra):
+    return dict({"url": ddns, "ip": "10.0.0.1", "open_ports": list(open_ports), "closed_ports": [81],
+                 "status": status}, **extra)
+
+
+@pytest.fixture
+def history(tmp_path):
+    return ScanHistory(str(tmp_path / "historial.db"))
+
+
+def test_database_uses_wal(history):
+    history.save_run([_result("a.ddns.net")])
+    conn = sqlite3.connect(history.db_path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        conn.close()
+
+
+def test_save_run_round_trip(history):
+    run_id = history.save_run([
+        _result("a.ddns.net", refused_ports=[81], filtered_ports=[], latency_ms={"min": 1.0, "median": 2.0, "max": 3.0},
+                services=[{"port": 80, "status_code": 200}]),
+        _result("b.ddns.net", open_ports=(), status="dns_error", error="Error al resolver DNS"),
+    ], cancelled=True)
+
+    a = history.last_results("a.ddns.net")[0]
+    assert a["run_id"] == run_id
+    assert a["open_ports"] == [80] and a["refused_ports"] == [81] and a["filtered_ports"] == []
+    assert a["services"] == [{"port": 80, "status_code": 200}]
+    b = history.last_results("b.ddns.net")[0]
+    assert b["status"] == "dns_error" and b["error"] == "Error al resolver DNS"
+    assert history.recent_runs(1)[0]["cancelled"]
+
+
+def test_old_schema_is_migrated(tmp_path):
+    path = str(tmp_path / "antiguo.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE scan_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, started_at TEXT NOT NULL,
+            finished_at TEXT NOT NULL, total_hosts INTEGER NOT NULL, cancelled INTEGER NOT NULL DEFAULT 0);
+        CREATE TABLE host_results (id INTEGER PRIMARY KEY AUTOINCREMENT, run_id INTEGER NOT NULL,
+            scanned_at TEXT NOT NULL, ddns TEXT NOT NULL, ip TEXT, status TEXT NOT NULL, open_ports TEXT NOT NULL,
+            closed_ports TEXT NOT NULL, error TEXT, is_down INTEGER NOT NULL);
+        INSERT INTO scan_runs (started_at, finished_at, total_hosts) VALUES ('2024-01-01 00:00:00', '2024-01-01 00:00:00', 1);
+        INSERT INTO host_results (run_id, scanned_at, ddns, ip, status, open_ports, closed_ports, is_down)
+            VALUES (1, '2024-01-01 00:00:00', 'viejo.ddns.net', '10.0.0.2', 'success', '[80]', '[81]', 0);
+    """)
+    conn.close()
+
+    history = ScanHistory(path)
+    history.save_run([_result("nuevo.ddns.net", refused_ports=[81], filtered_ports=[])])
+
+    columnas = {row[1] for row in sqlite3.connect(path).execute("PRAGMA table_info(host_results)")}
+    assert {column for _, column, _ in scan_history._ADDED_COLUMNS} <= columnas
+    viejo = history.last_results("viejo.ddns.net")[0]
+    assert viejo["open_ports"] == [80] and "refused_ports" not in viejo
+    assert history.last_results("nuevo.ddns.net")[0]["refused_ports"] == [81]
+
+
+def test_latest_results_returns_newest_row_per_requested_ddns(history, monkeypatch):
+    monkeypatch.setattr(scan_history, "LOOKUP_BATCH_SIZE", 3)
+    urls = [f"h{i}.ddns.net" for i in range(10)]
+    history.save_run([_result(url, open_ports=(80,)) for url in urls])
+    history.save_run([_result(url, open_ports=(554,)) for url in urls[::2]])
+
+    latest = history.latest_results(urls[:7] + ["h0.ddns.net", "sin-historial.ddns.net"])
+
+    assert sorted(latest) == sorted(urls[:7])
+    assert latest["h0.ddns.net"]["open_ports"] == [554]
+    assert latest["h1.ddns.net"]["open_ports"] == [80]
+    assert history.latest_results([]) == {}
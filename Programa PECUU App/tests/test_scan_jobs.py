@@ -0,0 +1,59 @@
+"""
+Pruebas de cancelación de ScanJob contra los hosts simulados en loopback.
+"""
+import threading
+import time
+
+import pytest
+
+from benchmarks.simulated_network import BENCH_PORTS, SimulatedNetwork
+from services.scan_jobs import ScanJob
+
+
+@pytest.fixture(scope="module")
+def network():
+    net = SimulatedNetwork(open_hosts=2, refused_hosts=0, blackholed_hosts=1)
+    net.start()
+    yield net
+    net.stop()
+
+
+def test_job_completes_in_url_order(network):
+    urls = list(reversed(network.open_hosts))
+    job = ScanJob(BENCH_PORTS, timeout=0.5)
+
+    results = job.run(urls)
+
+    assert [item['url'] for item in results] == urls
+    assert all(item['status'] == 'success' and item['open_ports'] for item in results)
+    assert job.finished and not job.cancelled
+    assert job.progress == (2, 2)
+
+
+def test_cancel_returns_partial_results_promptly(network):
+    # El host sin respuesta tarda varios segundos; el abierto termina de inmediato
+    first_result = threading.Event()
+    finished = []
+    job = ScanJob(BENCH_PORTS, timeout=3, on_result=lambda item: first_result.set())
+    urls = [network.blackholed_hosts[0], network.open_hosts[0]]
+
+    thread = job.start(urls, on_finish=finished.append)
+    assert first_result.wait(5)
+    started = time.monotonic()
+    job.cancel()
+
+    assert job.wait(5)
+    assert time.monotonic() - started < 2
+    assert job.cancelled
+    assert [item['url'] for item in job.results()] == [network.open_hosts[0]]
+    assert job.progress == (1, 2)
+    thread.join(5)
+    assert finished == [job]
+
+
+def test_cancel_before_run_scans_nothing(network):
+    job = ScanJob(BENCH_PORTS, timeout=0.5)
+    job.cancel()
+
+    assert job.run(network.open_hosts) == []
+    assert job.finished and job.cancelled
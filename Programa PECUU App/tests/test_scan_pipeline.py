@@ -0,0 +1,70 @@
+"""
+Pruebas de la creación de actividades a partir de los resultados del escaneo.
+
+El catálogo de enlaces se carga en memoria y las llamadas a la API de
+actividades se reemplazan, así que las pruebas no usan la red.
+"""
+import pytest
+
+from services import scan_pipeline
+from services.api_service import ApiService
+from services.link_catalog import LinkCatalog
+
+ENLACES = [
+    {"id": 7, "nombre": "Plantel Norte", "ddns": "norte.ddns.net"},
+    {"id": 9, "nombre": "Plantel Sur", "ddns": "sur.ddns.net"},
+]
+
+
+def _caido(url):
+    return {"url": url, "ip": "10.0.0.1", "status": "unreachable", "open_ports": []}
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    catalogo = LinkCatalog(lambda force_refresh: ENLACES)
+    catalogo.load(ENLACES)
+    monkeypatch.setattr(scan_pipeline, "LINK_CATALOG", catalogo)
+    return catalogo
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Actividades abiertas configurables y registro de las actividades creadas."""
+    estado = {"abiertas": [], "creadas": []}
+
+    def create_batch(actividades):
+        estado["creadas"].extend(actividades)
+        return [{"success": True, "message": ""} for _ in actividades]
+
+    monkeypatch.setattr(ApiService, "get_activities", staticmethod(lambda force_refresh=False: estado["abiertas"]))
+    monkeypatch.setattr(ApiService, "create_activities_batch", staticmethod(create_batch))
+    return estado
+
+
+def test_activity_uses_catalog_name_and_id(catalog):
+    actividad = scan_pipeline._activity_for(_caido("NORTE.ddns.net."))
+
+    assert actividad["titulo"] == "Revisar: Plantel Norte"
+    assert actividad["link_id"] == 7
+
+
+def test_activity_falls_back_to_ddns_when_not_in_catalog(catalog):
+    actividad = scan_pipeline._activity_for(_caido("otro.ddns.net"))
+
+    assert actividad["titulo"] == "Revisar: otro.ddns.net"
+    assert "link_id" not in actividad
+
+
+def test_open_activity_by_name_or_ddns_is_skipped(catalog, api):
+    api["abiertas"] = [
+        {"titulo": "Revisar: Plantel Norte", "activa": True},
+        {"titulo": "Revisar: sur.ddns.net", "activa": True},
+    ]
+
+    resumen = scan_pipeline.create_activities_for_down_links(
+        [_caido("norte.ddns.net"), _caido("sur.ddns.net"), _caido("otro.ddns.net")]
+    )
+
+    assert resumen == {"creadas": 1, "omitidas": 2, "fallidas": 0}
+    assert [a["titulo"] for a in api["creadas"]] == ["Revisar: otro.ddns.net"]
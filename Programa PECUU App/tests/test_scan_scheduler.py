@@ -0,0 +1,142 @@
+"""
+Pruebas del planificador del monitoreo continuo con un ScanJob simulado.
+"""
+import threading
+import time
+
+import pytest
+
+from services import scan_scheduler
+from services.scan_scheduler import ScanScheduler
+
+LINKS = [{"nombre": f"Enlace {c}", "ddns": f"{c}.ddns.net"} for c in "abc"]
+
+
+class _FakeJob:
+    """ScanJob simulado: marca los DDNS como sanos, o espera a ser cancelado si `block` está activo."""
+
+    block = threading.Event()
+    started = threading.Event()
+
+    def __init__(self, *args, **kwargs):
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self, urls):
+        _FakeJob.started.set()
+        if _FakeJob.block.is_set():
+            self._cancel.wait(5)
+            time.sleep(0.1)  # el ciclo cancelado tarda un poco en terminar
+            return [_result(urls[0])]
+        return [_result(url) for url in urls]
+
+
+def _result(url):
+    return {"url": url, "ip": "1.1.1.1", "open_ports": [80], "closed_ports": [], "status": "success"}
+
+
+@pytest.fixture
+def fake_job(monkeypatch):
+    _FakeJob.block.clear()
+    _FakeJob.started.clear()
+    monkeypatch.setattr(scan_scheduler, "ScanJob", _FakeJob)
+    return _FakeJob
+
+
+def _scheduler(calls, **kwargs):
+    return ScanScheduler(
+        on_results=lambda results, started_at, cancelled: calls.append((results, cancelled)),
+        load_links=lambda: LINKS, load_activities=lambda: [], jitter=0, **kwargs
+    )
+
+
+def _wait_for(condition, timeout=5):
+    limite = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < limite, "la condición no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+def test_pop_due_respects_due_time_and_priority():
+    scheduler = _scheduler([])
+    now = time.monotonic()
+    scheduler._known = {"stable", "activity", "failed", "later"}
+    scheduler._failed = {"failed"}
+    scheduler._open_activity = {"activity"}
+    for ddns in ("stable", "activity", "failed"):
+        scheduler._push(ddns, now)
+    scheduler._push("later", now + 60)
+
+    assert scheduler._pop_due() == ["failed", "activity", "stable"]
+    assert scheduler.pending == 1
+
+
+def test_pop_due_orders_by_due_time_first():
+    scheduler = _scheduler([])
+    now = time.monotonic()
+    scheduler._failed = {"failed"}
+    scheduler._push("failed", now - 1)
+    scheduler._push("stable", now - 5)
+
+    assert scheduler._pop_due() == ["stable", "failed"]
+
+
+def test_refresh_schedules_new_links_and_drops_removed():
+    scheduler = _scheduler([])
+    scheduler._refresh()
+    assert sorted(scheduler._pop_due()) == ["a.ddns.net", "b.ddns.net", "c.ddns.net"]
+
+    scheduler.load_links = lambda: LINKS[:1]
+    scheduler._push("b.ddns.net", time.monotonic())
+    scheduler._refresh()
+    assert scheduler.pending == 0
+
+
+def test_cycle_requeues_failed_links_sooner(fake_job, monkeypatch):
+    scheduler = _scheduler([], failed_interval=10, stable_interval=1000)
+    scheduler._refresh()
+    down = {"url": "a.ddns.net", "ip": "1.1.1.1", "open_ports": [], "closed_ports": [80], "status": "success"}
+    monkeypatch.setattr(fake_job, "run", lambda self, urls: [down if url == "a.ddns.net" else _result(url) for url in urls])
+
+    scheduler._scan_batch(scheduler._pop_due())
+
+    assert scheduler._queue[0][3] == "a.ddns.net"
+    assert scheduler._queue[0][1] == scan_scheduler.PRIORITY_FAILED
+
+
+def test_cancelled_cycle_is_reported_as_cancelled(fake_job):
+    calls = []
+    scheduler = _scheduler(calls)
+    fake_job.block.set()
+    scheduler.start()
+    _wait_for(fake_job.started.is_set)
+
+    scheduler.stop(wait=True)
+
+    assert len(calls) == 1
+    assert calls[0][1] is True
+
+
+def test_start_after_stop_leaves_a_running_loop(fake_job):
+    calls = []
+    scheduler = _scheduler(calls)
+    fake_job.block.set()
+    scheduler.start()
+    _wait_for(fake_job.started.is_set)
+
+    # El ciclo anterior sigue terminando cuando se vuelve a activar el monitoreo
+    scheduler.stop()
+    fake_job.block.clear()
+    scheduler.start()
+    try:
+        assert scheduler.running
+        _wait_for(lambda: any(not cancelled for _, cancelled in calls))
+        assert scheduler.running
+    finally:
+        scheduler.stop(wait=True)
@@ -0,0 +1,58 @@
+"""
+Pruebas del escaneo repartido entre procesos contra los hosts simulados en loopback.
+"""
+import pytest
+
+from benchmarks.simulated_network import BENCH_PORTS, SimulatedNetwork
+from services.scan_sharding import scan_urls_sharded_sync
+
+
+@pytest.fixture(scope="module")
+def network():
+    net = SimulatedNetwork(open_hosts=3, refused_hosts=3, blackholed_hosts=0)
+    net.start()
+    yield net
+    net.stop()
+
+
+def test_sharded_results_keep_url_order(network):
+    urls = [ip for pair in zip(network.open_hosts, network.refused_hosts) for ip in pair]
+    seen = []
+
+    results = scan_urls_sharded_sync(urls, BENCH_PORTS, processes=2, timeout=0.5, shard_size=1,
+                                     on_result=lambda item: seen.append(item['url']))
+
+    assert [item['url'] for item in results] == urls
+    esperado = network.expected_status()
+    assert all(item['status'] == esperado[item['url']] for item in results)
+    assert [bool(item['open_ports']) for item in results] == [ip in network.open_hosts for ip in urls]
+    assert sorted(seen) == sorted(urls)
+
+
+def test_duplicate_urls_are_scanned_once(network):
+    abierto, rechazado = network.open_hosts[0], network.refused_hosts[0]
+    urls = [abierto, rechazado, abierto, abierto, rechazado]
+    seen = []
+
+    results = scan_urls_sharded_sync(urls, BENCH_PORTS, processes=2, timeout=0.5, shard_size=1,
+                                     on_result=lambda item: seen.append(item['url']))
+
+    assert sorted(seen) == sorted([abierto, rechazado])
+    assert [item['url'] for item in results] == urls
+    assert [bool(item['open_ports']) for item in results] == [True, False, True, True, False]
+    assert results[0] is not results[2]
+
+
+def test_failed_shard_is_filled_with_error_results(network):
+    # Un argumento que no se puede enviar al proceso hace fallar cada fragmento
+    urls = network.open_hosts[:2]
+
+    results = scan_urls_sharded_sync(urls, [lambda: 80], processes=2, timeout=0.5, shard_size=1)
+
+    assert [item['url'] for item in results] == urls
+    assert all(item['status'] == 'error' for item in results)
+    assert all(item['error'].startswith("Error en el proceso de escaneo") for item in results)
+
+
+def test_empty_url_list():
+    assert scan_urls_sharded_sync([], BENCH_PORTS, processes=2) == []
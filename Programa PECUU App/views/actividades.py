@@ -128,12 +128,13 @@ class Actividades(ft.Container):
         """Crea una tarjeta de actividad basada en los datos proporcionados."""
         return _create_activity_card(self, actividad_data)
     
-    def load_actividades_from_api(self):
+    def load_actividades_from_api(self, force_refresh=False):
         """
         Carga las actividades desde la API y las muestra en la vista.
+        Con force_refresh=True se revalida con la API aunque la caché esté vigente.
         """
         try:
-            actividades = ApiService.get_activities()
+            actividades = ApiService.get_activities(force_refresh=force_refresh)
             if actividades:
                 # Limpiar la lista actual
                 self.actividades.clear()
@@ -155,6 +156,6 @@ class Actividades(ft.Container):
         """
         Refresca las actividades desde la API.
         """
-        self.load_actividades_from_api()
+        self.load_actividades_from_api(force_refresh=True)
         if self.flet_page:
             self.flet_page.update()
\ No newline at end of file
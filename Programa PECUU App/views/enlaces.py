@@ -107,13 +107,14 @@ class Enlaces(ft.Container):
         """Delegar en EnlacesManager para eliminar una fila."""
         EnlacesManager.delete_row(self, enlace_data)
     
-    def load_enlaces_from_api(self):
+    def load_enlaces_from_api(self, force_refresh=False):
         """
         Carga los enlaces desde la API y los muestra en la tabla.
         Este método se llama cuando se inicializa la vista.
+        Con force_refresh=True se revalida con la API aunque la caché esté vigente.
         """
         try:
-            enlaces = ApiService.get_links()
+            enlaces = ApiService.get_links(force_refresh=force_refresh)
             if enlaces:
                 # Limpiar la tabla actual
                 self.data_table.rows.clear()
@@ -133,6 +134,6 @@ class Enlaces(ft.Container):
         Refresca los enlaces desde la API.
         Puede ser llamado por un botón de actualización.
         """
-        self.load_enlaces_from_api()
+        self.load_enlaces_from_api(force_refresh=True)
         if self.page:
             self.page.update()
\ No newline at end of file
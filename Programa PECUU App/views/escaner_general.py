@@ -1,5 +1,8 @@
 import flet as ft
-from components.escaner_general import scan_urls_handler, last_excel_file
+from components.escaner_general import scan_urls_handler, process_scan_results, last_excel_file
+from services.scan_history import is_down
+from services.scan_export import parquet_available
+from services.scan_scheduler import ScanScheduler
 from components.inner_header import InnerHeader
 import webbrowser
 import os
@@ -66,6 +69,68 @@ class EscanerGeneral(ft.Container):
             visible=False
         )
 
+        # --- Botón de Cancelar Escaneo ---
+        # Solo es visible mientras hay un trabajo de escaneo en curso
+        self.cancel_button = ft.FilledButton(
+            text="CANCELAR",
+            width=200,
+            height=40,
+            bgcolor=ft.Colors.RED_600,
+            color=ft.Colors.WHITE,
+            icon=ft.Icons.CANCEL,
+            style=ft.ButtonStyle(text_style=ft.TextStyle(size=18, weight="bold"), icon_size=26),
+            disabled=True,
+            visible=False
+        )
+
+        # --- Modo Delta ---
+        # Si está activo, solo se escanean los DDNS fallidos, nuevos o con
+        # resultado vencido; el resto reutiliza su último resultado del historial
+        self.delta_checkbox = ft.Checkbox(
+            label="Escaneo delta (solo fallidos, nuevos y vencidos)",
+            value=False
+        )
+
+        # --- Identificación de Servicios ---
+        # Segunda etapa opcional: sondea HTTP/RTSP en los puertos abiertos para
+        # distinguir un DVR que responde de un módem o un servicio caído
+        self.fingerprint_checkbox = ft.Checkbox(
+            label="Identificar servicios (HTTP/RTSP) en puertos abiertos",
+            value=False
+        )
+
+        # --- Formato de Exportación Adicional ---
+        # El Excel siempre se genera; opcionalmente también un formato legible por máquina.
+        # Parquet solo se ofrece si está instalado el paquete opcional pyarrow.
+        export_options = [
+            ft.dropdown.Option("ninguno", "Solo Excel"),
+            ft.dropdown.Option("csv", "CSV"),
+            ft.dropdown.Option("jsonl", "JSON Lines"),
+        ]
+        if parquet_available():
+            export_options.append(ft.dropdown.Option("parquet", "Parquet (columnar comprimido)"))
+        self.export_format_dropdown = ft.Dropdown(
+            label="Exportar también como",
+            width=300,
+            value="ninguno",
+            options=export_options
+        )
+
+        # --- Monitoreo Continuo ---
+        # Ejecuta el escaneo en segundo plano de forma periódica, priorizando
+        # los enlaces caídos y los que tienen actividades abiertas
+        self.monitor_switch = ft.Switch(
+            label="Monitoreo continuo",
+            value=False,
+            on_change=self.toggle_monitoring
+        )
+        self.monitor_status_text = ft.Text(
+            value="",
+            size=12,
+            color=ft.Colors.GREY_600
+        )
+        self.scheduler = ScanScheduler(on_results=self._on_scheduled_results)
+
         # --- Área de Resultados ---
         # Columna donde se insertarán dinámicamente los ft.Card con los resultados
         self.results_column = ft.Column(
@@ -89,27 +154,80 @@ class EscanerGeneral(ft.Container):
             controls=[
                 InnerHeader("ESCANEO GENERAL", icon=ft.Icons.WIFI_TETHERING),
                 self.scan_button,
+                self.delta_checkbox,
+                self.fingerprint_checkbox,
+                self.export_format_dropdown,
+                self.monitor_switch,
+                self.monitor_status_text,
+                self.cancel_button,
                 self.download_button,
                 self.results_column,
                 self.loading_row
             ]
         )
 
+        # Trabajo de escaneo en curso (o el último ejecutado)
+        self.scan_job = None
+
         # --- Conexión del Evento de Clic ---
-        # Al hacer clic, llama a la función externa 'scan_urls_handler' 
-        # y le pasa las referencias de los controles que debe actualizar.
-        self.scan_button.on_click = lambda e: scan_urls_handler(
+        # Al hacer clic, llama a la función externa 'scan_urls_handler', que lanza
+        # el escaneo en segundo plano y regresa el trabajo para poder consultarlo.
+        self.scan_button.on_click = self.start_scan
+        
+        # Evento del botón de descarga
+        self.download_button.on_click = self.download_excel
+    
+    def start_scan(self, e):
+        """
+        Lanza un Escaneo General en segundo plano y guarda la referencia al trabajo.
+        """
+        self.scan_job = scan_urls_handler(
             e,
             self.results_column,
             self.loading_row,
             self.scan_button,
-            page,
-            self.download_button
+            self.page,
+            self.download_button,
+            self.cancel_button,
+            delta_mode=bool(self.delta_checkbox.value),
+            fingerprint=bool(self.fingerprint_checkbox.value),
+            extra_formats=[] if self.export_format_dropdown.value in (None, "ninguno") else [self.export_format_dropdown.value]
         )
-        
-        # Evento del botón de descarga
-        self.download_button.on_click = self.download_excel
-    
+
+    def toggle_monitoring(self, e):
+        """
+        Inicia o detiene el monitoreo continuo según el estado del interruptor.
+        """
+        if self.monitor_switch.value:
+            self.scheduler.start()
+            self.monitor_status_text.value = "Monitoreo activo. Esperando el primer ciclo..."
+        else:
+            self.scheduler.stop()
+            self.monitor_status_text.value = ""
+        self.page.update()
+
+    def _on_scheduled_results(self, scan_results, started_at, cancelled=False):
+        """
+        Recibe los resultados de cada ciclo del monitoreo continuo, los procesa
+        por el mismo camino que el escaneo manual y actualiza el resumen.
+
+        Un ciclo cancelado al detener el monitoreo se guarda como ejecución
+        cancelada, sin crear actividades ni actualizar el resumen.
+        """
+        process_scan_results(scan_results, started_at, cancelled=cancelled)
+        if cancelled:
+            return
+
+        caidos = sum(1 for item in scan_results if is_down(item))
+        self.monitor_status_text.value = (
+            f"Último ciclo: {started_at.strftime('%H:%M:%S')} - "
+            f"{len(scan_results)} DDNS escaneados, {caidos} sin puertos abiertos"
+        )
+        try:
+            self.page.update()
+        except Exception:
+            pass
+
     def download_excel(self, e):
         """
         Abre el archivo Excel generado en el explorador de archivos